@@ -0,0 +1,95 @@
+# Login and registration latency with a large users.csv.
+#
+#   python -m benchmarks.bench_auth
+#   python -m benchmarks.bench_auth --users 1000000 --logins 20
+#
+# "legacy" is what app3.py used to do per login / registration: read the whole
+# file, scan the username column, mask out the password; registration
+# rewrote the file with pd.concat.  "UserStore" keeps the hash index in
+# memory and appends registrations; its login time is dominated, on purpose,
+# by one PBKDF2 verification.
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import pandas as pd
+
+from brewmate.auth import UserStore, hash_password
+from brewmate.storage import USER_COLUMNS, CsvStorage
+
+
+def write_users(path, users, password_hash):
+    with open(path, "w") as f:
+        f.write(",".join(USER_COLUMNS) + "\n")
+        for i in range(users):
+            f.write(f"user{i},{password_hash}\n")
+
+
+def legacy_find(path, username):
+    users_df = pd.read_csv(path)
+    if username in users_df["username"].values:
+        return users_df[users_df["username"] == username]["password"].values[0]
+    return None
+
+
+def legacy_register(path, username, password):
+    users_df = pd.read_csv(path)
+    new_user = pd.DataFrame([[username, password]], columns=USER_COLUMNS)
+    pd.concat([users_df, new_user], ignore_index=True).to_csv(path, index=False)
+
+
+def percentile(samples, fraction):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+def timed(action):
+    start = time.perf_counter()
+    action()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Login/registration latency benchmark")
+    parser.add_argument("--users", type=int, default=1000000)
+    parser.add_argument("--logins", type=int, default=20)
+    parser.add_argument("--lookups", type=int, default=100000)
+    args = parser.parse_args()
+
+    password_hash = hash_password("secret")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "users.csv")
+        write_users(path, args.users, password_hash)
+        storage = CsvStorage(*(os.path.join(directory, name) for name in
+                               ("order_history.csv", "loyalty_points.csv", "ratings.csv")), path,
+                             os.path.join(directory, "inventory_ledger.csv"))
+        names = [f"user{random.randrange(args.users)}" for _ in range(max(args.logins, args.lookups))]
+
+        legacy_login = [timed(lambda: legacy_find(path, name)) for name in names[:3]]
+        legacy_registration = timed(lambda: legacy_register(path, "legacy_new_user", "secret"))
+
+        users = None
+
+        def build():
+            nonlocal users
+            users = UserStore(storage)
+        load_time = timed(build)
+        lookups = [timed(lambda: users.find(name)) for name in names[:args.lookups]]
+        logins = [timed(lambda: users.authenticate(name, "secret")) for name in names[:args.logins]]
+        registrations = [timed(lambda: users.register(f"new_user{i}", "secret")) for i in range(args.logins)]
+        miss = [timed(lambda: users.find(f"missing{i}")) for i in range(1000)]
+
+    print(f"{args.users} users")
+    print(f"legacy login lookup:      {sum(legacy_login) / len(legacy_login) * 1000:9.1f} ms (full read + scan per login)")
+    print(f"legacy registration:      {legacy_registration * 1000:9.1f} ms (full rewrite)")
+    print(f"UserStore index build:    {load_time * 1000:9.1f} ms (once per server process)")
+    print(f"UserStore lookup:         p50 {percentile(lookups, 0.5) * 1e6:.1f} us, p99 {percentile(lookups, 0.99) * 1e6:.1f} us")
+    print(f"UserStore miss (refresh): p50 {percentile(miss, 0.5) * 1e6:.1f} us")
+    print(f"UserStore login (PBKDF2): p50 {percentile(logins, 0.5) * 1000:.1f} ms, p99 {percentile(logins, 0.99) * 1000:.1f} ms")
+    print(f"UserStore registration:   p50 {percentile(registrations, 0.5) * 1000:.1f} ms (hash + fsync'd append)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# Sales export: building the whole file in memory vs. streaming it.
+#
+#   python -m benchmarks.bench_export
+#   python -m benchmarks.bench_export --rows 1000000 --xlsx-rows 200000
+#
+# "in memory" is the straightforward export: one DataFrame of the whole
+# range, then DataFrame.to_csv() / to_excel() into a string or BytesIO.
+# "streamed" is brewmate.export: chunks of rows into a spooled temp file
+# (openpyxl write-only mode for Excel).  Each run happens in a fresh process
+# over the memory-mapped order archive; "peak MB" is how far the process's
+# peak RSS rose during the export.
+import argparse
+import io
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.bench_order_table import write_history
+from brewmate.archive import OrderArchive
+from brewmate.export import export_orders_csv, export_xlsx
+
+
+def in_memory_csv(parts):
+    frames = [table.to_frame() for table, _ in parts]
+    return pd.concat(frames, ignore_index=True).to_csv(index=False).encode("utf-8")
+
+
+def in_memory_xlsx(parts):
+    buffer = io.BytesIO()
+    frames = [table.to_frame() for table, _ in parts]
+    pd.concat(frames, ignore_index=True).to_excel(buffer, index=False, engine="openpyxl")
+    return buffer.getvalue()
+
+
+def streamed(export):
+    def run(parts):
+        with export(parts) as f:
+            f.seek(0, os.SEEK_END)
+            return f.tell()
+    return run
+
+
+VARIANTS = {
+    "csv in memory": in_memory_csv,
+    "csv streamed": streamed(export_orders_csv),
+    "xlsx in memory": in_memory_xlsx,
+    "xlsx streamed": streamed(export_xlsx),
+}
+
+
+def child(directory, variant, results):
+    archive = OrderArchive(directory)
+    parts = [(archive.partition(month), True) for month in archive.months()]
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    output = VARIANTS[variant](parts)
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline
+    results.put((elapsed, peak / 1024, (output if isinstance(output, int) else len(output)) / 2 ** 20))
+
+
+def measure(directory, variant):
+    results = multiprocessing.Queue()
+    process = multiprocessing.Process(target=child, args=(directory, variant, results))
+    process.start()
+    result = results.get()
+    process.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sales export benchmark")
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--xlsx-rows", type=int, default=100000)
+    args = parser.parse_args()
+
+    print(f"{'rows':>9} {'export':<16} {'seconds':>8} {'peak MB':>8} {'file MB':>8}")
+    with tempfile.TemporaryDirectory() as directory:
+        for rows, variants in ((args.rows, ("csv in memory", "csv streamed")),
+                               (args.xlsx_rows, ("xlsx in memory", "xlsx streamed"))):
+            history = os.path.join(directory, f"history_{rows}.csv")
+            write_history(history, rows)
+            archive_dir = os.path.join(directory, f"archive_{rows}")
+            OrderArchive(archive_dir).add(pd.read_csv(history))
+            for variant in variants:
+                elapsed, peak, size = measure(archive_dir, variant)
+                print(f"{rows:>9} {variant:<16} {elapsed:>8.1f} {peak:>8.0f} {size:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# Fitting the demand forecast on a year of orders.
+#
+#   python -m benchmarks.bench_forecast
+#   python -m benchmarks.bench_forecast --orders 2000000
+#
+# The history holds one order every 30 s (1M orders is ~347 days); the whole
+# history is used as the lookback window, and the timing covers the fit plus
+# one stock outlook.
+import argparse
+import os
+import tempfile
+import time
+from datetime import timedelta
+
+import pandas as pd
+
+from benchmarks.bench_order_table import write_history
+from brewmate.forecast import DemandForecast
+from brewmate.orders import OrderTable, from_epoch_us
+from brewmate.recipes import RecipeBook
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DemandForecast fit benchmark")
+    parser.add_argument("--orders", type=int, default=1000000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "order_history.csv")
+        write_history(path, args.orders)
+        table = OrderTable.from_frame(pd.read_csv(path))
+    recipes = RecipeBook()
+    order_time = table.column("order_time")
+    now = from_epoch_us(order_time[-1]) + timedelta(hours=1)
+    lookback = now - from_epoch_us(order_time[0])
+    levels = {"coffee_beans": 50000, "milk": 200000, "sugar": 10000, "cups": 5000}
+
+    timings = []
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        forecast = DemandForecast.fit([table], recipes, lookback=lookback, now=now)
+        outlook = forecast.outlook(levels, now=now)
+        timings.append(time.perf_counter() - start)
+
+    print(f"{args.orders} orders over {lookback.days} days")
+    print(outlook.to_string(index=False))
+    print(f"fit + outlook: best {min(timings) * 1000:.0f} ms, mean {sum(timings) / len(timings) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# Cold import time of the app entry point, checked against a startup budget.
+#
+#   python -m benchmarks.bench_import
+#   python -m benchmarks.bench_import --budget 2.0 --repeat 9
+#
+# Every run starts a fresh interpreter that executes only the script's
+# top-level import statements (read from the script with ast), under
+# `-X importtime`, which is what each server start pays before the first
+# page renders.  Prints the median time, the heaviest top-level imports and
+# any --forbid module that was loaded; the exit status is 1 when the median
+# is over --budget or a forbidden module was imported.
+import argparse
+import ast
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Loaded only by the features that use them (Excel exports, report workers)
+HEAVY_MODULES = ("matplotlib", "altair", "openpyxl")
+
+PROBE = """import json, sys, time
+start = time.perf_counter()
+{imports}
+print(time.perf_counter() - start)
+print(json.dumps(sorted(sys.modules)))
+"""
+
+
+def import_block(script):
+    with open(script) as f:
+        tree = ast.parse(f.read(), script)
+    return "\n".join(ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+
+# (seconds, loaded module names, {top-level module: cumulative seconds}) of one cold import
+def measure(imports):
+    probe = PROBE.format(imports=imports)
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", probe], cwd=ROOT, capture_output=True,
+                            text=True, check=True)
+    seconds, modules = result.stdout.splitlines()[-2:]
+    top_level = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit() and len(name) - len(name.lstrip()) == 1:
+            top_level[name.strip()] = int(cumulative) / 1e6
+    return float(seconds), json.loads(modules), top_level
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold import time of a BrewMate entry point")
+    parser.add_argument("--script", default="brewmate_app.py")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget", type=float, default=1.2, help="seconds the median cold import may take")
+    parser.add_argument("--forbid", nargs="*", default=list(HEAVY_MODULES),
+                        help="modules the entry point must not import at start")
+    parser.add_argument("--top", type=int, default=10, help="heaviest top-level imports to list")
+    args = parser.parse_args()
+
+    imports = import_block(os.path.join(ROOT, args.script))
+    runs = [measure(imports) for _ in range(args.repeat)]
+    median = statistics.median(seconds for seconds, _, _ in runs)
+    _, modules, top_level = runs[-1]
+
+    print(f"{args.script}: cold import {median * 1000:.0f} ms median of {args.repeat} "
+          f"(min {min(r[0] for r in runs) * 1000:.0f} ms, budget {args.budget * 1000:.0f} ms), {len(modules)} modules")
+    print(f"  {'module':<40} {'cumulative ms':>13}")
+    for name, seconds in sorted(top_level.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {name:<40} {seconds * 1000:>13.1f}")
+
+    loaded = sorted(name for name in args.forbid if name in modules)
+    for name in loaded:
+        print(f"FORBIDDEN {name} is imported at start")
+    if median > args.budget:
+        print(f"OVER BUDGET by {(median - args.budget) * 1000:.0f} ms")
+    if loaded or median > args.budget:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
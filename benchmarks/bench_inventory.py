@@ -0,0 +1,86 @@
+# Concurrent orders against the shared inventory ledger.
+#
+#   python -m benchmarks.bench_inventory
+#   python -m benchmarks.bench_inventory --processes 8 --threads 4 --cups 2000
+#
+# Every worker (processes x threads) reserves and commits one order's
+# ingredients until the ledger runs out of cups.  The run checks that exactly
+# `--cups` orders went through (nothing oversold, nothing lost) and reports
+# the throughput and latency of reserve + commit for each backend.
+import argparse
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+
+from brewmate.inventory import OutOfStock
+from brewmate.storage import CsvStorage, SqliteStorage
+
+ORDER = {"coffee_beans": 10, "cups": 1}
+
+
+def open_backend(backend, directory):
+    if backend == "csv":
+        return CsvStorage(*(os.path.join(directory, name) for name in
+                            ("order_history.csv", "loyalty_points.csv", "ratings.csv", "users.csv", "inventory_ledger.csv")))
+    return SqliteStorage(os.path.join(directory, "brewmate.db"))
+
+
+def worker(backend, directory, threads, results):
+    ledger = open_backend(backend, directory).inventory
+    latencies = []
+
+    def run():
+        while True:
+            start = time.perf_counter()
+            try:
+                reservation = ledger.reserve(ORDER)
+            except OutOfStock:
+                return
+            ledger.commit(reservation)
+            latencies.append(time.perf_counter() - start)
+
+    pool = [threading.Thread(target=run) for _ in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    results.put(latencies)
+
+
+def bench(backend, processes, threads, cups):
+    with tempfile.TemporaryDirectory() as directory:
+        ledger = open_backend(backend, directory).inventory
+        ledger.stock_defaults({"coffee_beans": cups * 10, "cups": cups})
+        results = multiprocessing.Queue()
+        start = time.perf_counter()
+        pool = [multiprocessing.Process(target=worker, args=(backend, directory, threads, results))
+                for _ in range(processes)]
+        for process in pool:
+            process.start()
+        latencies = sorted(latency for _ in pool for latency in results.get())
+        for process in pool:
+            process.join()
+        elapsed = time.perf_counter() - start
+        levels = ledger.levels()
+    assert len(latencies) == cups and levels == {"coffee_beans": 0, "cups": 0}, (len(latencies), levels)
+    return len(latencies) / elapsed, latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.99)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inventory ledger under concurrent orders")
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--cups", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{args.processes} processes x {args.threads} threads, {args.cups} orders, stock checked after the run")
+    print(f"{'backend':>8} {'orders/s':>9} {'p50 ms':>7} {'p99 ms':>7}")
+    for backend in ("csv", "sqlite"):
+        throughput, p50, p99 = bench(backend, args.processes, args.threads, args.cups)
+        print(f"{backend:>8} {throughput:>9.0f} {p50 * 1000:>7.2f} {p99 * 1000:>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# Loyalty leaderboard and customer search with a large member base.
+#
+#   python -m benchmarks.bench_leaderboard
+#   python -m benchmarks.bench_leaderboard --customers 100000 1000000 --updates 10000
+#
+# "full table" is what the Admin Panel used to do: copy every total into a
+# DataFrame (and, to rank or search it, sort or scan that frame).  The ledger
+# answers top-k from a lazily-pruned heap and prefix search from a sorted
+# name index; both are checked against the full-table answer after a stream
+# of point updates.
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.bench_loyalty import write_loyalty
+from brewmate.loyalty import FileLoyaltyLedger
+from brewmate.storage import SqliteStorage
+
+
+def timed(action, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = action()
+    return result, (time.perf_counter() - start) / repeat
+
+
+def full_table_top(ledger, k):
+    loyalty_points_df = pd.DataFrame(ledger.totals().items(), columns=["Customer", "Points"])
+    return loyalty_points_df.sort_values(["Points", "Customer"], ascending=[False, True]).head(k)
+
+
+def full_table_search(ledger, prefix, limit):
+    loyalty_points_df = pd.DataFrame(ledger.totals().items(), columns=["Customer", "Points"])
+    matches = loyalty_points_df[loyalty_points_df["Customer"].str.casefold().str.startswith(prefix.casefold())]
+    return matches.sort_values("Customer").head(limit)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Loyalty leaderboard / customer search benchmark")
+    parser.add_argument("--customers", type=int, nargs="+", default=[100000, 1000000])
+    parser.add_argument("--updates", type=int, default=10000)
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    print(f"{'customers':>10} {'full top ms':>12} {'full find ms':>13} {'build ms':>9} "
+          f"{'top ms':>7} {'find ms':>8} {'add us':>7} {'sqlite top ms':>14} {'sqlite find ms':>15}")
+    with tempfile.TemporaryDirectory() as directory:
+        for customers in args.customers:
+            path = os.path.join(directory, f"loyalty_{customers}.csv")
+            write_loyalty(path, customers)
+            ledger = FileLoyaltyLedger(path, compact_rows=10 ** 9)
+            ledger.totals()
+            full_top = timed(lambda: full_table_top(ledger, args.top))[1]
+            full_find = timed(lambda: full_table_search(ledger, "customer12", 20))[1]
+
+            build = timed(lambda: (ledger.top(args.top), ledger.search("x")))[1]
+            start = time.perf_counter()
+            for i in range(args.updates):
+                ledger.add(f"customer{rng.randrange(customers)}" if i % 10 else f"new{i}", rng.randrange(1, 50))
+            add = (time.perf_counter() - start) / args.updates
+
+            top, top_time = timed(lambda: ledger.top(args.top), 100)
+            found, find_time = timed(lambda: ledger.search("customer12", 20), 100)
+            assert top == list(full_table_top(ledger, args.top).itertuples(index=False, name=None)), "wrong top-k"
+            assert found == list(full_table_search(ledger, "customer12", 20).itertuples(index=False, name=None)), "wrong matches"
+
+            sqlite = SqliteStorage(os.path.join(directory, f"loyalty_{customers}.db"))
+            with sqlite._connect() as conn:
+                conn.executemany("INSERT INTO loyalty_points (customer, points) VALUES (?, ?)", ledger.totals().items())
+            sqlite_top, sqlite_top_time = timed(lambda: sqlite.loyalty.top(args.top), 100)
+            sqlite_found, sqlite_find_time = timed(lambda: sqlite.loyalty.search("customer12", 20), 100)
+            assert sqlite_top == top and sqlite_found == found, "sqlite disagrees with the file ledger"
+
+            print(f"{customers:>10} {full_top * 1000:>12.1f} {full_find * 1000:>13.1f} {build * 1000:>9.1f} "
+                  f"{top_time * 1000:>7.3f} {find_time * 1000:>8.3f} {add * 1e6:>7.1f} "
+                  f"{sqlite_top_time * 1000:>14.3f} {sqlite_find_time * 1000:>15.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# Loyalty point updates: full-file rewrite vs. the loyalty ledger.
+#
+#   python -m benchmarks.bench_loyalty
+#   python -m benchmarks.bench_loyalty --customers 10000 100000 1000000 --processes 4
+#
+# "rewrite" is what add_loyalty_points() used to cost: read loyalty_points.csv,
+# update one total, write the whole file back.  "ledger" appends one delta
+# row (FileLoyaltyLedger) or runs one UPSERT (SQLite).  The concurrent run
+# adds points from several processes at once and checks every total.
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from brewmate.loyalty import LOYALTY_COLUMNS, FileLoyaltyLedger
+from brewmate.storage import SqliteStorage
+
+
+def write_loyalty(path, customers):
+    pd.DataFrame({"Customer": [f"customer{i}" for i in range(customers)], "Points": 10}).to_csv(path, index=False)
+
+
+def legacy_add(path, customer, points):
+    loyalty_points = pd.read_csv(path, index_col=0).to_dict()["Points"]
+    loyalty_points[customer] = loyalty_points.get(customer, 0) + points
+    pd.DataFrame(list(loyalty_points.items()), columns=LOYALTY_COLUMNS).to_csv(path, index=False)
+
+
+def per_update(action, updates):
+    start = time.perf_counter()
+    for i in range(updates):
+        action(i)
+    return (time.perf_counter() - start) / updates
+
+
+def worker(path, customers, updates, seed):
+    ledger = FileLoyaltyLedger(path)
+    for i in range(updates):
+        ledger.add(f"customer{(seed + i * 7) % customers}", 1)
+
+
+def concurrent(directory, customers, processes, updates):
+    path = os.path.join(directory, "concurrent.csv")
+    write_loyalty(path, customers)
+    pool = [multiprocessing.Process(target=worker, args=(path, customers, updates, seed)) for seed in range(processes)]
+    start = time.perf_counter()
+    for process in pool:
+        process.start()
+    for process in pool:
+        process.join()
+    elapsed = time.perf_counter() - start
+    totals = FileLoyaltyLedger(path).totals()
+    assert sum(totals.values()) == customers * 10 + processes * updates, "lost or duplicated updates"
+    return processes * updates / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Loyalty points update benchmark")
+    parser.add_argument("--customers", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--updates", type=int, default=2000)
+    parser.add_argument("--processes", type=int, default=4)
+    args = parser.parse_args()
+
+    print(f"{'customers':>10} {'rewrite ms':>11} {'ledger ms':>10} {'sqlite ms':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        for customers in args.customers:
+            path = os.path.join(directory, f"loyalty_{customers}.csv")
+            write_loyalty(path, customers)
+            rewrite = per_update(lambda i: legacy_add(path, f"customer{i}", 5), 3)
+
+            write_loyalty(path, customers)
+            ledger = FileLoyaltyLedger(path)
+            ledger.totals()
+            appended = per_update(lambda i: ledger.add(f"customer{i * 7919 % customers}", 5), args.updates)
+
+            sqlite = SqliteStorage(os.path.join(directory, f"loyalty_{customers}.db"))
+            with sqlite._connect() as conn:
+                conn.executemany("INSERT INTO loyalty_points (customer, points) VALUES (?, 10)",
+                                 ((f"customer{i}",) for i in range(customers)))
+            upsert = per_update(lambda i: sqlite.loyalty.add(f"customer{i * 7919 % customers}", 5), args.updates)
+            print(f"{customers:>10} {rewrite * 1000:>11.1f} {appended * 1000:>10.3f} {upsert * 1000:>10.3f}")
+
+        throughput = concurrent(directory, 10000, args.processes, args.updates)
+    print(f"{args.processes} processes adding to a shared CSV ledger: {throughput:.0f} updates/s, every total correct")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# Per-order write cost of the order journal vs. the old full-file rewrite.
+#
+#   python -m benchmarks.bench_order_journal
+#   python -m benchmarks.bench_order_journal --sizes 1000 100000 1000000 --orders 500
+#
+# For every history size the base order_history.csv is pre-filled with that many
+# orders, then `--orders` new orders are written one at a time.  The journal cost
+# should stay flat as the history grows; the legacy rewrite grows linearly.
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from brewmate.journal import ORDER_COLUMNS, OrderJournal, format_order_row
+
+SAMPLE_ORDER = {
+    "customer_name": "azhar",
+    "coffee_type": "Caramel Macchiato",
+    "size": "Medium",
+    "add_ons": ["Milk"],
+    "price": 7.75,
+    "order_time": datetime(2024, 11, 23, 22, 2, 55, 138433),
+}
+
+
+def prefill(path, rows):
+    line = format_order_row(SAMPLE_ORDER)
+    with open(path, "w", newline="") as f:
+        f.write(",".join(ORDER_COLUMNS) + "\n")
+        chunk = line * 10000
+        for _ in range(rows // 10000):
+            f.write(chunk)
+        f.write(line * (rows % 10000))
+
+
+def summarize(samples):
+    samples = sorted(samples)
+    return {
+        "mean_ms": statistics.fmean(samples) * 1000,
+        "p99_ms": samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1000,
+    }
+
+
+def bench_journal(directory, rows, orders):
+    path = os.path.join(directory, "order_history.csv")
+    prefill(path, rows)
+    journal = OrderJournal(path)
+    samples = []
+    for _ in range(orders):
+        start = time.perf_counter()
+        journal.append(SAMPLE_ORDER)
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def bench_legacy(directory, rows, orders):
+    path = os.path.join(directory, "order_history.csv")
+    prefill(path, rows)
+    history = pd.read_csv(path).to_dict(orient="records")
+    samples = []
+    for _ in range(orders):
+        start = time.perf_counter()
+        history.append(SAMPLE_ORDER)
+        pd.DataFrame(history).to_csv(path, index=False)
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Order journal write benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000, 1000000])
+    parser.add_argument("--orders", type=int, default=4000, help="orders written per history size")
+    parser.add_argument("--legacy-max", type=int, default=100000,
+                        help="skip the full-rewrite baseline above this history size")
+    args = parser.parse_args()
+
+    print(f"{'history':>10} {'journal mean':>13} {'journal p99':>12} {'rewrite mean':>13}")
+    for rows in args.sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            journal = bench_journal(directory, rows, args.orders)
+        legacy = None
+        if rows <= args.legacy_max:
+            with tempfile.TemporaryDirectory() as directory:
+                legacy = bench_legacy(directory, rows, max(1, args.orders // 20))
+        legacy_text = f"{legacy['mean_ms']:>10.3f} ms" if legacy else f"{'skipped':>13}"
+        print(f"{rows:>10} {journal['mean_ms']:>10.3f} ms {journal['p99_ms']:>9.3f} ms {legacy_text}")
+
+
+if __name__ == "__main__":
+    main()
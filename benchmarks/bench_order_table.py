@@ -0,0 +1,87 @@
+# Memory and parse time: list of order dicts vs. the columnar OrderTable.
+#
+#   python -m benchmarks.bench_order_table
+#   python -m benchmarks.bench_order_table --orders 1000000
+#
+# "dicts" is what app3.py used to keep per session:
+# pd.read_csv(ORDER_HISTORY_FILE).to_dict(orient='records').
+import argparse
+import gc
+import itertools
+import os
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from brewmate.journal import ORDER_COLUMNS, format_order_row
+from brewmate.menu import add_on_prices, menu, order_price, size_prices
+from brewmate.orders import OrderTable
+
+
+def write_history(path, rows, customers=5000):
+    combos = list(itertools.product(menu, size_prices, ([], ["Milk"], ["Extra sugar"], list(add_on_prices))))
+    start = datetime(2024, 1, 1)
+    with open(path, "w", newline="") as f:
+        f.write(",".join(ORDER_COLUMNS) + "\n")
+        for i in range(rows):
+            coffee_type, size, add_ons = combos[i % len(combos)]
+            f.write(format_order_row({
+                "customer_name": f"customer{i * 7919 % customers}",
+                "coffee_type": coffee_type,
+                "size": size,
+                "add_ons": add_ons,
+                "price": order_price(coffee_type, size, add_ons),
+                "order_time": start + timedelta(seconds=30 * i),
+            }))
+
+
+# Time one build, then repeat it under tracemalloc (which slows it down) for the memory figure
+def measure(build):
+    gc.collect()
+    start = time.perf_counter()
+    build()
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OrderTable vs list-of-dicts benchmark")
+    parser.add_argument("--orders", type=int, default=1000000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "order_history.csv")
+        write_history(path, args.orders)
+
+        dicts, dicts_bytes, dicts_time = measure(lambda: pd.read_csv(path).to_dict(orient="records"))
+        start = time.perf_counter()
+        revenue = {}
+        for order in dicts:
+            revenue[order["coffee_type"]] = revenue.get(order["coffee_type"], 0) + order["price"]
+        dicts_report = time.perf_counter() - start
+        del dicts
+        gc.collect()
+
+        table, table_bytes, table_time = measure(lambda: OrderTable.from_frame(pd.read_csv(path)))
+        start = time.perf_counter()
+        np.bincount(table.column("coffee"), weights=table.column("price_cents")) / 100
+        table_report = time.perf_counter() - start
+
+    print(f"{args.orders} orders")
+    print(f"{'':>14} {'memory MB':>10} {'parse s':>8} {'revenue by coffee s':>20}")
+    print(f"{'list of dicts':>14} {dicts_bytes / 2 ** 20:>10.1f} {dicts_time:>8.2f} {dicts_report:>20.4f}")
+    print(f"{'OrderTable':>14} {table_bytes / 2 ** 20:>10.1f} {table_time:>8.2f} {table_report:>20.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+# Ingredient consumption of the whole order history: per-order loop vs. RecipeBook replay.
+#
+#   python -m benchmarks.bench_recipes
+#   python -m benchmarks.bench_recipes --orders 1000000 --loop-max 100000
+#
+# "loop" looks every order up in the recipe table one by one (what deducting
+# per order adds up to); "replay" is RecipeBook.consumption(): one bincount
+# over the combination codes times the precomputed matrix.
+import argparse
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.bench_order_table import write_history
+from brewmate.orders import OrderTable
+from brewmate.recipes import RecipeBook
+
+
+def loop_consumption(recipes, orders):
+    totals = {}
+    for order in orders:
+        for item, quantity in recipes.ingredients_for(order["coffee_type"], order["size"], order["add_ons"]).items():
+            totals[item] = totals.get(item, 0) + quantity
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RecipeBook consumption replay benchmark")
+    parser.add_argument("--orders", type=int, default=1000000)
+    parser.add_argument("--loop-max", type=int, default=100000, help="orders timed with the per-order loop")
+    args = parser.parse_args()
+
+    recipes = RecipeBook()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "order_history.csv")
+        write_history(path, args.orders)
+        table = OrderTable.from_frame(pd.read_csv(path))
+
+    start = time.perf_counter()
+    replay = recipes.consumption(table)
+    replay_time = time.perf_counter() - start
+
+    looped = min(args.loop_max, args.orders)
+    orders = table.to_dicts(0, looped)
+    start = time.perf_counter()
+    loop_consumption(recipes, orders)
+    loop_time = (time.perf_counter() - start) * args.orders / looped
+
+    print(f"{args.orders} orders ({', '.join(f'{item} {quantity:,.0f}' for item, quantity in replay.items())})")
+    print(f"loop   {loop_time:>8.3f} s" + (f" (extrapolated from {looped} orders)" if looped < args.orders else ""))
+    print(f"replay {replay_time:>8.3f} s ({loop_time / replay_time:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
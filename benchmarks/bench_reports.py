@@ -0,0 +1,77 @@
+# Admin reports: built inline on the script thread vs. the report job pool.
+#
+#   python -m benchmarks.bench_reports
+#   python -m benchmarks.bench_reports --rows 1000000 --months 6 --workers 4
+#
+# "inline" builds each month's Excel workbook one after another in the
+# calling thread, which is what a Streamlit rerun would wait for.  "pool"
+# submits them all to ReportJobs: the script thread only waits for submit(),
+# the builds run in parallel on worker processes, and asking again for the
+# same months is served from the on-disk cache.
+import argparse
+import io
+import os
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks.bench_order_table import write_history
+from benchmarks.bench_startup import write_side_files
+from brewmate.archive import OrderArchive, next_month, roll_over
+from brewmate.datastore import DataStore
+from brewmate.reports import DONE, FAILED, ReportJobs, build_sales_workbook
+from brewmate.storage import open_storage
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Background report generation benchmark")
+    parser.add_argument("--rows", type=int, default=500000)
+    parser.add_argument("--months", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        write_history("order_history.csv", args.rows)
+        write_side_files(directory)
+        storage_args = ("csv", "order_history.csv", "loyalty_points.csv", "ratings.csv", "users.csv", "brewmate.db",
+                        "inventory_ledger.csv")
+        storage = open_storage(*storage_args)
+        roll_over(storage, OrderArchive("order_archive"))
+        store = DataStore(storage, OrderArchive("order_archive"))
+        months = [datetime.strptime(month, "%Y-%m") for month in store.archive.months()[:args.months]]
+        ranges = [{"start": month, "end": next_month(month)} for month in months]
+
+        start = time.perf_counter()
+        for params in ranges:
+            build_sales_workbook(storage, "order_archive", params, io.BytesIO())
+        inline = time.perf_counter() - start
+
+        jobs = ReportJobs(store, "report_cache", storage_args, "order_archive", workers=args.workers)
+        warm_up = jobs.submit("ratings_summary")  # start the worker processes outside the timings
+        while jobs.status(warm_up)["status"] not in (DONE, FAILED):
+            time.sleep(0.05)
+        start = time.perf_counter()
+        job_ids = [jobs.submit("sales_workbook", **params) for params in ranges]
+        submitted = time.perf_counter() - start
+        while any(jobs.status(job_id)["status"] not in (DONE, FAILED) for job_id in job_ids):
+            time.sleep(0.05)
+        pooled = time.perf_counter() - start
+        assert all(jobs.status(job_id)["status"] == DONE for job_id in job_ids), "a report failed"
+
+        cold = ReportJobs(store, "report_cache", storage_args, "order_archive")  # as after a server restart
+        start = time.perf_counter()
+        cached_ids = [cold.submit("sales_workbook", **params) for params in ranges]
+        cached = time.perf_counter() - start
+        assert cached_ids == job_ids and all(cold.status(job_id)["status"] == DONE for job_id in cached_ids)
+        assert cold._executor is None, "cache hit started a build"
+
+    print(f"{len(ranges)} monthly workbooks from {args.rows} orders, {jobs.workers} workers")
+    print(f"inline (blocks the script):  {inline:8.2f} s")
+    print(f"pool, script thread waits:   {submitted * 1000:8.1f} ms")
+    print(f"pool, all reports ready:     {pooled:8.2f} s")
+    print(f"cached, after a restart:     {cached * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
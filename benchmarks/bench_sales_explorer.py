@@ -0,0 +1,90 @@
+# Admin sales table: whole date range vs. one server-side page.
+#
+#   python -m benchmarks.bench_sales_explorer
+#   python -m benchmarks.bench_sales_explorer --sizes 100000 1000000 5000000
+#
+# "full range" is what the Admin Panel used to send: every order in the
+# chosen dates, as the Arrow payload st.dataframe() ships to the browser.
+# "page" asks DataStore.order_page() for 50 rows with the same range, with
+# filters, with another sort key and deep into the result.  The history is
+# first rolled into the month-partitioned archive, as `python -m
+# brewmate.archive` does in production.
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+from streamlit import dataframe_util
+
+from benchmarks.bench_order_table import write_history
+from benchmarks.bench_startup import write_side_files
+from brewmate.archive import OrderArchive, roll_over
+from brewmate.datastore import DataStore
+from brewmate.journal import format_order_row
+from brewmate.storage import CsvStorage
+
+
+def timed(action, repeat=5):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = action()
+    return result, (time.perf_counter() - start) / repeat
+
+
+# Every order in the range as one DataFrame, as the Admin Panel used to build it
+def full_range(store, start, end):
+    tables = store.order_tables(start)
+    orders = pd.concat([table.to_frame() for table in tables[1:] + tables[:1]], ignore_index=True)
+    return orders[(orders["order_time"] >= start) & (orders["order_time"] < end)]
+
+
+def payload(frame):
+    return len(dataframe_util.convert_pandas_df_to_arrow_bytes(frame))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Paginated sales explorer benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100000, 1000000])
+    parser.add_argument("--page-size", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'orders':>9} {'query':<28} {'matches':>9} {'ms':>9} {'payload KB':>11}")
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            history = os.path.join(directory, "order_history.csv")
+            write_history(history, size)
+            now = datetime.now()
+            with open(history, "a", newline="") as f:  # a few hot orders in the current month
+                for i in range(1000):
+                    f.write(format_order_row({
+                        "customer_name": f"customer{i % 50}", "coffee_type": "Latte", "size": "Medium",
+                        "add_ons": ["Milk"], "price": 8.25, "order_time": now - timedelta(seconds=i),
+                    }))
+            write_side_files(directory)
+            storage = CsvStorage(*(os.path.join(directory, name) for name in
+                                   ("order_history.csv", "loyalty_points.csv", "ratings.csv", "users.csv",
+                                    "inventory_ledger.csv")))
+            archive = OrderArchive(os.path.join(directory, "order_archive"))
+            roll_over(storage, archive)
+            store = DataStore(storage, archive)
+            start, end = datetime(2024, 1, 1), now + timedelta(days=1)
+
+            full, full_time = timed(lambda: full_range(store, start, end), 1)
+            print(f"{size:>9} {'full range (legacy)':<28} {len(full):>9} {full_time * 1000:>9.1f} {payload(full) / 1024:>11.0f}")
+            queries = {
+                "page, newest first": {},
+                "page, customer + coffee": {"customer": "customer42", "coffee_type": "Latte"},
+                "page, sorted by price": {"sort_by": "price"},
+                "page, sorted by customer": {"sort_by": "customer_name", "descending": False},
+                "page 1000, newest first": {"offset": 999 * args.page_size},
+            }
+            for label, query in queries.items():
+                query = {"limit": args.page_size, **query}
+                (page, matching), page_time = timed(lambda: store.order_page(start, end, **query))
+                print(f"{'':>9} {label:<28} {matching:>9} {page_time * 1000:>9.2f} {payload(page) / 1024:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
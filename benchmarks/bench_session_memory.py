@@ -0,0 +1,65 @@
+# Memory held per browser session: private history copies vs. the shared DataStore.
+#
+#   python -m benchmarks.bench_session_memory
+#   python -m benchmarks.bench_session_memory --orders 100000 --sessions 10
+#
+# The old app3.py ran pd.read_csv(ORDER_HISTORY_FILE).to_dict(orient='records')
+# in every new session; with the DataStore the history is parsed once per process.
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+from benchmarks.bench_order_journal import prefill
+from brewmate.datastore import DataStore
+from brewmate.storage import CsvStorage
+
+
+def measure(build, sessions):
+    tracemalloc.start()
+    kept = []
+    start = time.perf_counter()
+    for _ in range(sessions):
+        kept.append(build())
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-session memory benchmark")
+    parser.add_argument("--orders", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--sessions", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'orders':>9} {'private MB/session':>19} {'shared MB/session':>18} {'saved MB/session':>17} {'private s':>10} {'shared s':>9}")
+    for rows in args.orders:
+        with tempfile.TemporaryDirectory() as directory:
+            orders_file = os.path.join(directory, "order_history.csv")
+            prefill(orders_file, rows)
+            storage = CsvStorage(orders_file, *(os.path.join(directory, name) for name in
+                                                ("loyalty_points.csv", "ratings.csv", "users.csv")))
+
+            private, private_time = measure(lambda: pd.read_csv(orders_file).to_dict(orient="records"), args.sessions)
+            shared_store = {}
+
+            # What get_data_store() does: build once, hand the same store to every session
+            def shared_session():
+                if "store" not in shared_store:
+                    shared_store["store"] = DataStore(storage)
+                return shared_store["store"]
+
+            shared, shared_time = measure(shared_session, args.sessions)
+
+        private_mb = private / args.sessions / 2 ** 20
+        shared_mb = shared / args.sessions / 2 ** 20
+        print(f"{rows:>9} {private_mb:>19.2f} {shared_mb:>18.2f} {private_mb - shared_mb:>17.2f} "
+              f"{private_time:>10.2f} {shared_time:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
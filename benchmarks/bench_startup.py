@@ -0,0 +1,81 @@
+# Cold start of the DataStore: parsing the CSV files vs. loading a state snapshot.
+#
+#   python -m benchmarks.bench_startup
+#   python -m benchmarks.bench_startup --sizes 100000 1000000 --tail 0.01
+#
+# "csv" is what every server start did before snapshots: parse the whole
+# order history.  "snapshot" loads brewmate_state.snapshot and parses only the
+# orders written after it (`--tail` of the history, 1% by default).
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from benchmarks.bench_order_table import write_history
+from brewmate.datastore import DataStore
+from brewmate.journal import format_order_row
+from brewmate.snapshot import StateSnapshot
+from brewmate.storage import CsvStorage
+
+
+def write_side_files(directory, customers=5000):
+    names = [f"customer{i}" for i in range(customers)]
+    pd.DataFrame({"Customer": names, "Points": 5}).to_csv(os.path.join(directory, "loyalty_points.csv"), index=False)
+    pd.DataFrame({"Customer": names, "Rating": 5, "Feedback": "Great"}).to_csv(os.path.join(directory, "ratings.csv"),
+                                                                                  index=False)
+    pd.DataFrame({"username": names, "password": "secret"}).to_csv(os.path.join(directory, "users.csv"), index=False)
+
+
+def append_orders(path, count):
+    start = datetime(2025, 1, 1)
+    with open(path, "a", newline="") as f:
+        for i in range(count):
+            f.write(format_order_row({
+                "customer_name": f"late{i % 100}", "coffee_type": "Latte", "size": "Medium",
+                "add_ons": ["Milk"], "price": 8.25, "order_time": start + timedelta(seconds=i),
+            }))
+
+
+def timed(build):
+    start = time.perf_counter()
+    result = build()
+    return result, time.perf_counter() - start
+
+
+def bench(rows, tail):
+    with tempfile.TemporaryDirectory() as directory:
+        orders_file = os.path.join(directory, "order_history.csv")
+        write_history(orders_file, rows)
+        write_side_files(directory)
+        storage = CsvStorage(orders_file, *(os.path.join(directory, name)
+                                            for name in ("loyalty_points.csv", "ratings.csv", "users.csv")))
+        snapshot = StateSnapshot(os.path.join(directory, "brewmate_state.snapshot"))
+
+        _, csv_time = timed(lambda: DataStore(storage))
+        _, write_time = timed(lambda: snapshot.refresh(storage))
+        snapshot_mb = os.path.getsize(snapshot.path) / 2 ** 20
+        added = int(rows * tail)
+        append_orders(orders_file, added)
+        store, snapshot_time = timed(lambda: DataStore(storage, snapshot=snapshot, snapshot_every=rows + added + 1))
+        assert len(store.orders) == rows + added
+    return csv_time, snapshot_time, write_time, snapshot_mb, added
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DataStore cold start: CSV parse vs. state snapshot")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100000, 1000000])
+    parser.add_argument("--tail", type=float, default=0.01, help="fraction of orders written after the snapshot")
+    args = parser.parse_args()
+
+    print(f"{'orders':>9} {'csv s':>7} {'snapshot s':>11} {'new orders':>11} {'speedup':>8} {'write s':>8} {'file MB':>8}")
+    for rows in args.sizes:
+        csv_time, snapshot_time, write_time, snapshot_mb, added = bench(rows, args.tail)
+        print(f"{rows:>9} {csv_time:>7.2f} {snapshot_time:>11.3f} {added:>11} {csv_time / snapshot_time:>7.1f}x "
+              f"{write_time:>8.2f} {snapshot_mb:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
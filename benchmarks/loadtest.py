@@ -0,0 +1,405 @@
+# Load test: many scripted browser sessions against one brewmate_app.py server.
+#
+#   python -m benchmarks.loadtest
+#   python -m benchmarks.loadtest --sessions 1 4 16 32 --admins 1 --iterations 5 --json load.json
+#   python -m benchmarks.loadtest --mode processes --sessions 4 --backend sqlite
+#   python -m benchmarks.loadtest --sessions 4 --profile sample --profile-dir profiles
+#
+# Each session drives brewmate_app.py through streamlit.testing's AppTest, the way a
+# browser would: customers open the app, register, log in, go to Order Now,
+# pay for a random drink (`--iterations` times), wait for it and rate it;
+# admins log in and page, sort and search the Admin Panel.  Nothing is
+# served over the network and nothing is fetched, so the run is fully
+# offline.  Every click is one script rerun, timed from the click to the
+# end of the rerun.
+#
+# "threads" runs all sessions on threads of this process, which is exactly
+# one Streamlit server (shared st.cache_resource objects, one GIL);
+# "processes" runs each session in its own process, like several servers
+# sharing the data files.  Each `--sessions` level runs on the same data,
+# so the table shows where checkout latency starts to climb.  Lock waits
+# are the contended flock acquisitions on the CSV backend's lock files
+# (brewmate.locking); SQLite's own busy waits show up only in the latencies.
+# With --profile every measured rerun is profiled by page (brewmate.profiling)
+# and the profiles are written to --profile-dir when the run ends.
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from benchmarks.suite import metadata
+from benchmarks.workload import Workload
+from brewmate import profiling
+from brewmate.locking import lock_stats, reset_lock_stats
+from brewmate.menu import add_on_prices, menu, size_prices
+from brewmate.recipes import RecipeBook
+from brewmate.storage import open_storage
+
+APP_SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "brewmate_app.py")
+# The workload's users all have this password
+PASSWORD = "secret"
+RERUN_TIMEOUT = 120
+# Stock put in the generated data's inventory, so sessions never run out
+STOCK = 10 ** 9
+
+
+class SessionError(Exception):
+    pass
+
+
+# Latencies of one session's interactions, by interaction name
+class Timings:
+    def __init__(self):
+        self.samples = {}
+        self.errors = {}
+        self.checkouts = 0
+
+    def run(self, name, at):
+        start = time.perf_counter()
+        at.run(timeout=RERUN_TIMEOUT)
+        self.samples.setdefault(name, []).append(time.perf_counter() - start)
+        if at.exception:
+            self.errors[name] = self.errors.get(name, 0) + 1
+            raise SessionError(f"{name}: {at.exception[0].value}")
+        return at
+
+    def merge(self, other):
+        for name, samples in other.samples.items():
+            self.samples.setdefault(name, []).extend(samples)
+        for name, count in other.errors.items():
+            self.errors[name] = self.errors.get(name, 0) + count
+        self.checkouts += other.checkouts
+
+
+def _widget(widgets, label):
+    for widget in widgets:
+        if widget.label == label:
+            return widget
+    raise SessionError(f"no widget labelled {label!r}")
+
+
+# The last button with this label (a form's submit button comes after the
+# sidebar button that opened the form)
+def _button(at, label):
+    buttons = [button for button in at.button if button.label == label]
+    if not buttons:
+        raise SessionError(f"no button labelled {label!r}")
+    return buttons[-1]
+
+
+def customer_session(username, iterations, think, seed, timings):
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(seed)
+    at = AppTest.from_file(APP_SCRIPT, default_timeout=RERUN_TIMEOUT)
+    timings.run("home", at)
+    _button(at, "Register New User").click()
+    timings.run("open_register", at)
+    at.text_input(key="register_username").input(username)
+    at.text_input(key="register_password").input(PASSWORD)
+    _button(at, "Register").click()
+    timings.run("register", at)
+    _button(at, "Login").click()
+    timings.run("open_login", at)
+    at.text_input(key="login_username").input(username)
+    at.text_input(key="login_password").input(PASSWORD)
+    _button(at, "Login").click()
+    timings.run("login", at)
+    if not at.session_state["logged_in"]:
+        raise SessionError(f"login failed for {username}")
+    _widget(at.radio, "Go to").set_value("Order Now")
+    timings.run("order_page", at)
+    for _ in range(iterations):
+        time.sleep(think)
+        _widget(at.selectbox, "Select Coffee Type").set_value(rng.choice(list(menu)))
+        _widget(at.radio, "Choose Size").set_value(rng.choice(list(size_prices)))
+        _widget(at.multiselect, "Add-ons").set_value(rng.sample(list(add_on_prices), rng.randint(0, len(add_on_prices))))
+        _button(at, "Confirm Payment").click()
+        timings.run("checkout", at)
+        if not any(message.value == "Payment successful!" for message in at.success):
+            raise SessionError("checkout did not go through: " + "; ".join(error.value for error in at.error))
+        timings.checkouts += 1
+        # What the order status box does while the kitchen works on the order
+        deadline = time.monotonic() + RERUN_TIMEOUT
+        while not any(button.label == "Submit Rating" for button in at.button):
+            if time.monotonic() > deadline:
+                raise SessionError("order was never ready")
+            time.sleep(0.05)
+            timings.run("order_status", at)
+        time.sleep(think)
+        at.slider(key="rating_slider").set_value(rng.randint(1, 5))
+        at.text_area(key="feedback_area").input(rng.choice(["Great", "Loved it", "Too sweet", ""]))
+        _button(at, "Submit Rating").click()
+        timings.run("rate", at)
+
+
+def admin_session(iterations, think, seed, timings):
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(seed)
+    at = AppTest.from_file(APP_SCRIPT, default_timeout=RERUN_TIMEOUT)
+    timings.run("home", at)
+    _button(at, "Admin").click()
+    timings.run("open_admin_login", at)
+    at.text_input(key="admin_username").input("admin")
+    at.text_input(key="admin_password").input("admin123")
+    _button(at, "Login as Admin").click()
+    timings.run("admin_login", at)
+    _widget(at.radio, "Go to").set_value("Admin Panel")
+    timings.run("admin_panel", at)
+    for _ in range(iterations):
+        time.sleep(think)
+        at.number_input(key="sales_page").set_value(rng.randint(1, 20))
+        timings.run("admin_sales_page", at)
+        at.selectbox(key="sales_sort_by").set_value(rng.choice(["Order Time", "Customer", "Price"]))
+        timings.run("admin_sales_sort", at)
+        at.text_input(key="loyalty_search").input(rng.choice("abcdefghijklmnopqrstuvwxyz"))
+        timings.run("admin_loyalty_search", at)
+
+
+# Run one session, keeping its timings even when it fails part way
+def run_session(kind, name, iterations, think, seed, timings, failures):
+    try:
+        if kind == "admin":
+            admin_session(iterations, think, seed, timings)
+        else:
+            customer_session(name, iterations, think, seed, timings)
+    except Exception as error:  # a failed session is reported, the others keep going
+        failures.append(f"{name}: {error}")
+
+
+def session_plan(level, customers, admins, seed):
+    tag = f"{os.getpid()}_{int(time.time() * 1000) % 10 ** 8}"
+    plan = [("customer", f"load{level}_{tag}_{i}", seed + i) for i in range(customers)]
+    plan += [("admin", f"admin{i}", seed + customers + i) for i in range(admins)]
+    return plan
+
+
+def run_threads(plan, iterations, think):
+    timings, failures, threads = [Timings() for _ in plan], [], []
+    for (kind, name, seed), session_timings in zip(plan, timings):
+        threads.append(threading.Thread(target=run_session, name=f"session-{name}",
+                                        args=(kind, name, iterations, think, seed, session_timings, failures)))
+    reset_lock_stats()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - start
+    return timings, failures, wall, {path: list(stats) for path, stats in lock_stats.items()}
+
+
+def _process_worker(data_dir, kind, name, iterations, think, seed, profile, barrier, results):
+    os.chdir(data_dir)
+    quiet_streamlit()
+    share_server_state()
+    timings, failures = Timings(), []
+    try:
+        warm_up()
+    except SystemExit as error:  # still meet the others at the barrier
+        failures.append(f"{name}: {error}")
+    barrier.wait()
+    if not failures:
+        reset_lock_stats()
+        profiling.set_mode(profile)
+        run_session(kind, name, iterations, think, seed, timings, failures)
+        profiling.set_mode("off")
+        profiling.write_all()  # multiprocessing workers exit without running atexit handlers
+    results.put((timings, failures, dict(lock_stats)))
+
+
+def run_processes(data_dir, plan, iterations, think, profile):
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(len(plan) + 1)
+    results = context.Queue()
+    workers = [context.Process(target=_process_worker, args=(data_dir, kind, name, iterations, think, seed, profile, barrier,
+                                                                  results))
+               for kind, name, seed in plan]
+    for worker in workers:
+        worker.start()
+    barrier.wait()  # every worker has started its server
+    start = time.perf_counter()
+    collected = [results.get() for _ in workers]
+    wall = time.perf_counter() - start
+    for worker in workers:
+        worker.join()
+    timings, failures, locks = [], [], {}
+    for session_timings, session_failures, session_locks in collected:
+        timings.append(session_timings)
+        failures.extend(session_failures)
+        for path, (count, contended, waited, longest) in session_locks.items():
+            merged = locks.setdefault(path, [0, 0, 0.0, 0.0])
+            merged[0] += count
+            merged[1] += contended
+            merged[2] += waited
+            merged[3] = max(merged[3], longest)
+    return timings, failures, wall, locks
+
+
+# AppTest builds a mock Runtime and compiles the script afresh for every run,
+# and removes the Runtime when the run ends, which pulls it out from under
+# runs overlapping on other threads (and concurrent compiles can trip over
+# each other).  A real server has one Runtime and one script cache for all
+# sessions, so keep the last Runtime installed in place and share one cache.
+def share_server_state():
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.testing.v1 import app_test, local_script_runner
+
+    last = []
+
+    def instance(cls):
+        if cls._instance is not None:
+            last[:] = [cls._instance]
+            return cls._instance
+        if not last:
+            raise RuntimeError("Runtime hasn't been created!")
+        return last[0]
+
+    Runtime.instance = classmethod(instance)
+    Runtime.exists = classmethod(lambda cls: cls._instance is not None or bool(last))
+    script_cache = ScriptCache()
+    app_test.ScriptCache = local_script_runner.ScriptCache = lambda: script_cache
+
+
+# Drop Streamlit's per-rerun deprecation warnings and the "missing
+# ScriptRunContext" notes from session threads (AppTest resets log levels on
+# every run, so the loggers are switched off instead)
+def quiet_streamlit():
+    for name in ("streamlit.deprecation_util", "streamlit.runtime.scriptrunner_utils.script_run_context"):
+        logging.getLogger(name).disabled = True
+
+
+# One unmeasured admin visit, so the server's shared objects (storage, data
+# store, queues) are built and the page modules imported before the clock
+# starts, as on a server already up
+def warm_up():
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APP_SCRIPT, default_timeout=RERUN_TIMEOUT).run()
+    if not at.exception:
+        _button(at, "Admin").click().run()
+        at.text_input(key="admin_username").input("admin")
+        at.text_input(key="admin_password").input("admin123")
+        _button(at, "Login as Admin").click().run()
+        _widget(at.radio, "Go to").set_value("Order Now").run()
+        _widget(at.radio, "Go to").set_value("Admin Panel").run()
+    if at.exception:
+        raise SystemExit(f"brewmate_app.py failed to start: {at.exception[0].value}")
+
+
+def summarize(level, timings, failures, wall, locks):
+    total = Timings()
+    for session_timings in timings:
+        total.merge(session_timings)
+    interactions = {}
+    for name, samples in total.samples.items():
+        p50, p95, p99 = np.percentile(samples, [50, 95, 99]) * 1000
+        interactions[name] = {"count": len(samples), "errors": total.errors.get(name, 0),
+                              "p50_ms": round(p50, 2), "p95_ms": round(p95, 2), "p99_ms": round(p99, 2)}
+    reruns = sum(len(samples) for samples in total.samples.values())
+    return {
+        "sessions": level, "wall_seconds": round(wall, 3), "checkouts": total.checkouts,
+        "checkouts_per_second": round(total.checkouts / wall, 3), "reruns_per_second": round(reruns / wall, 3),
+        "interactions": interactions, "failures": failures,
+        "locks": {os.path.basename(path): {"acquisitions": count, "contended": contended,
+                                           "wait_ms": round(waited * 1000, 2), "max_wait_ms": round(longest * 1000, 2)}
+                  for path, (count, contended, waited, longest) in sorted(locks.items())},
+    }
+
+
+def report(result):
+    print(f"\n{result['sessions']} concurrent sessions: {result['checkouts']} checkouts in {result['wall_seconds']:.1f} s "
+          f"({result['checkouts_per_second']:.2f} checkouts/s, {result['reruns_per_second']:.1f} reruns/s)")
+    print(f"  {'interaction':<22} {'count':>6} {'errors':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for name, stats in result["interactions"].items():
+        print(f"  {name:<22} {stats['count']:>6} {stats['errors']:>6} {stats['p50_ms']:>8.1f} {stats['p95_ms']:>8.1f} "
+              f"{stats['p99_ms']:>8.1f}")
+    if result["locks"]:
+        print(f"  {'lock file':<28} {'acquired':>9} {'contended':>10} {'wait ms':>9} {'max ms':>8}")
+        for path, stats in result["locks"].items():
+            print(f"  {path:<28} {stats['acquisitions']:>9} {stats['contended']:>10} {stats['wait_ms']:>9.1f} "
+                  f"{stats['max_wait_ms']:>8.1f}")
+    for failure in result["failures"]:
+        print(f"  FAILED {failure}")
+
+
+def prepare_data(directory, orders, backend):
+    Workload(orders).write(directory)
+    files = [os.path.join(directory, name) for name in ("order_history.csv", "loyalty_points.csv", "ratings.csv",
+                                                        "users.csv", "brewmate.db", "inventory_ledger.csv")]
+    storage = open_storage(backend, *files)
+    if backend == "sqlite":
+        from brewmate.migrate import migrate
+
+        migrate(open_storage("csv", *files), storage)
+    storage.inventory.stock_defaults({item: STOCK for item in RecipeBook().ingredients})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent-session load test for brewmate_app.py")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 4, 8],
+                        help="concurrent customer sessions; one run per value")
+    parser.add_argument("--admins", type=int, default=1, help="admin sessions running alongside the customers")
+    parser.add_argument("--iterations", type=int, default=3, help="orders per customer / dashboard rounds per admin")
+    parser.add_argument("--think", type=float, default=0.0, help="seconds a user waits between actions")
+    parser.add_argument("--mode", choices=["threads", "processes"], default="threads")
+    parser.add_argument("--backend", choices=["csv", "sqlite"], default="csv")
+    parser.add_argument("--orders", type=int, default=100000, help="orders in the generated history")
+    parser.add_argument("--data", help="run against this data directory instead of a generated one")
+    parser.add_argument("--kitchen-time-scale", type=float, default=0.001)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--profile", choices=profiling.MODES, default="off",
+                        help="profile the measured reruns by page (cprofile or sample)")
+    parser.add_argument("--profile-dir", default="profiles", help="where --profile writes its .prof / .collapsed files")
+    args = parser.parse_args()
+
+    os.environ["BREWMATE_STORAGE"] = args.backend
+    os.environ["BREWMATE_KITCHEN_TIME_SCALE"] = str(args.kitchen_time_scale)
+    profiling.DIRECTORY = os.environ["BREWMATE_PROFILE_DIR"] = os.path.abspath(args.profile_dir)
+    with tempfile.TemporaryDirectory() as scratch:
+        data_dir = os.path.abspath(args.data or scratch)
+        if not args.data:
+            prepare_data(data_dir, args.orders, args.backend)
+        os.chdir(data_dir)
+        quiet_streamlit()
+        if args.mode == "threads":
+            share_server_state()
+            warm_up()
+        results = []
+        for level in args.sessions:
+            plan = session_plan(level, level, args.admins, args.seed)
+            if args.mode == "threads":
+                profiling.set_mode(args.profile)
+                outcome = run_threads(plan, args.iterations, args.think)
+                profiling.set_mode("off")
+            else:
+                outcome = run_processes(data_dir, plan, args.iterations, args.think, args.profile)
+            results.append(summarize(level, *outcome))
+            report(results[-1])
+        os.chdir(os.path.dirname(APP_SCRIPT))
+    if args.profile != "off":
+        profiling.write_all()
+        print(f"\nProfiles by page written to {profiling.DIRECTORY}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"meta": dict(metadata(), mode=args.mode, backend=args.backend, admins=args.admins,
+                                    iterations=args.iterations, think=args.think, orders=args.orders),
+                       "levels": results}, f, indent=1)
+    if any(result["failures"] for result in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
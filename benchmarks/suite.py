@@ -0,0 +1,231 @@
+# Benchmark suite: times each BrewMate hot path on synthetic data and writes
+# machine-readable results, so regressions can be tracked across versions.
+#
+#   python -m benchmarks.suite
+#   python -m benchmarks.suite --sizes 1000 100000 1000000 --backends csv sqlite --json results.json
+#   python -m benchmarks.suite --json new.json --compare baseline.json --threshold 0.25
+#
+# For every size and storage backend a seeded data set is written with
+# benchmarks.workload (ending yesterday, so the current month's orders are
+# hot and the rest are moved to the archive) and each case is timed as the app runs
+# it.  Every result is one record {"case", "backend", "size", "metric",
+# "value", "unit"}; all metrics are lower-is-better.  With --compare, p50
+# latencies and fastest one-shot runs more than --threshold slower than the
+# matching baseline record are listed and the exit status is 1; p99 and
+# median records are reported but not gated.
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.workload import Workload
+from brewmate.archive import OrderArchive, roll_over
+from brewmate.auth import UserStore
+from brewmate.datastore import DataStore
+from brewmate.export import export_orders_csv
+from brewmate.forecast import DEFAULT_LOOKBACK, DemandForecast
+from brewmate.menu import order_price
+from brewmate.migrate import migrate
+from brewmate.recipes import RecipeBook
+from brewmate.snapshot import StateSnapshot
+from brewmate.storage import open_storage
+
+FILES = ("order_history.csv", "loyalty_points.csv", "ratings.csv", "users.csv", "brewmate.db", "inventory_ledger.csv")
+# Per-operation cases run REPEAT times; one-shot cases (startup, forecast,
+# export) run ONCE_REPEAT times and record their fastest and median run
+REPEAT = 200
+ONCE_REPEAT = 5
+# --compare gates only these metrics: p99 over a few hundred samples and
+# medians of five runs move by more than the threshold between identical runs
+GATED_METRICS = ("p50", "min")
+# Differences smaller than this are run-to-run jitter, not regressions
+MIN_DELTA = {"ms": 0.1, "s": 0.01}
+
+
+class Recorder:
+    def __init__(self):
+        self.results = []
+
+    def add(self, case, backend, size, metric, value, unit):
+        self.results.append({"case": case, "backend": backend, "size": size, "metric": metric,
+                             "value": round(value, 6), "unit": unit})
+
+    # Run setup() and then action() `repeat` times and record the fastest and
+    # median wall time in seconds (just "seconds" when repeat is 1); returns
+    # the last action()'s result
+    def once(self, case, backend, size, action, repeat=ONCE_REPEAT, setup=None):
+        samples = []
+        for _ in range(repeat):
+            if setup is not None:
+                setup()
+            start = time.perf_counter()
+            result = action()
+            samples.append(time.perf_counter() - start)
+        if repeat == 1:
+            self.add(case, backend, size, "seconds", samples[0], "s")
+        else:
+            self.add(case, backend, size, "min", min(samples), "s")
+            self.add(case, backend, size, "median", float(np.median(samples)), "s")
+        return result
+
+    # Run action() `repeat` times and record the p50 and p99 latency in milliseconds
+    def latency(self, case, backend, size, action, repeat=REPEAT):
+        samples = []
+        for i in range(repeat):
+            start = time.perf_counter()
+            action(i)
+            samples.append(time.perf_counter() - start)
+        p50, p99 = np.percentile(samples, [50, 99]) * 1000
+        self.add(case, backend, size, "p50", p50, "ms")
+        self.add(case, backend, size, "p99", p99, "ms")
+
+
+def open_backend(backend, directory):
+    return open_storage(backend, *(os.path.join(directory, name) for name in FILES))
+
+
+def wait_for_snapshot(store):
+    if store._snapshot_thread is not None:
+        store._snapshot_thread.join()
+
+
+def bench(recorder, backend, size, directory):
+    today = datetime.combine(datetime.now().date(), datetime.min.time())
+    workload = Workload(size)
+    workload.start = today - timedelta(days=workload.days)
+    workload.write(directory)
+    storage = open_backend(backend, directory)
+    if backend == "sqlite":
+        migrate(open_backend("csv", directory), storage)
+    archive = OrderArchive(os.path.join(directory, "order_archive"))
+    snapshot = StateSnapshot(os.path.join(directory, "brewmate_state.snapshot"))
+    recipes = RecipeBook()
+
+    # Startup: parsing everything, the archive CLI moving old months out of
+    # storage, the first start (writes the snapshot) and a restart from
+    # archive + snapshot
+    recorder.once("startup.full_parse", backend, size, lambda: DataStore(storage))
+    # Only the first run has months to move
+    recorder.once("archive.roll_over", backend, size, lambda: roll_over(storage, archive), repeat=1)
+    stores = []
+
+    def first_start():
+        stores.append(DataStore(storage, archive, snapshot, recipes=recipes))
+        return stores[-1]
+
+    def drop_snapshot():
+        if stores:
+            wait_for_snapshot(stores[-1])
+        for path in (snapshot.path, snapshot.path + ".prev"):
+            if os.path.exists(path):
+                os.remove(path)
+    store = recorder.once("startup.first", backend, size, first_start, setup=drop_snapshot)
+    wait_for_snapshot(store)
+    snapshot.refresh(storage)
+    store = recorder.once("startup.restart", backend, size,
+                          lambda: DataStore(storage, archive, snapshot, snapshot_every=10 ** 9, recipes=recipes))
+    recorder.once("users.load", backend, size, lambda: UserStore(storage))
+
+    # Customer pages
+    names = workload.customer_names()
+    recorder.latency("users.lookup", backend, size, lambda i: store.users.exists(names[i * 7919 % len(names)]))
+    order = {"customer_name": names[0], "coffee_type": "Latte", "size": "Medium", "add_ons": ["Milk"],
+             "price": order_price("Latte", "Medium", ["Milk"])}
+    recorder.latency("order.append", backend, size,
+                     lambda i: store.append_order(dict(order, order_time=datetime.now())))
+    recorder.latency("loyalty.add", backend, size, lambda i: store.add_loyalty_points(names[i % len(names)], 6))
+    inventory = storage.inventory
+    inventory.stock_defaults({item: 10 ** 9 for item in recipes.ingredients_for("Latte", "Medium", ["Milk"])})
+    recorder.latency("inventory.reserve_commit", backend, size,
+                     lambda i: inventory.commit(inventory.reserve(recipes.ingredients_for("Latte", "Medium", ["Milk"]))))
+
+    # Admin Panel
+    month_ago = today - timedelta(days=30)
+    recorder.latency("admin.sales_rollup", backend, size,
+                     lambda i: (store.sales.totals_since(today), store.sales.coffee_counts()), repeat=50)
+    recorder.latency("admin.order_page", backend, size, lambda i: store.order_page(offset=(i % 10) * 50), repeat=50)
+    recorder.latency("admin.order_page_sorted", backend, size,
+                     lambda i: store.order_page(month_ago, None, sort_by="customer_name", descending=False), repeat=20)
+    recorder.latency("admin.loyalty_top", backend, size, lambda i: store.loyalty.top(10), repeat=50)
+    recorder.latency("admin.loyalty_search", backend, size,
+                     lambda i: store.loyalty.search(names[i % len(names)][:3], limit=50), repeat=50)
+    recorder.once("admin.forecast_fit", backend, size,
+                  lambda: DemandForecast.fit(store.order_tables(datetime.now() - DEFAULT_LOOKBACK), recipes))
+
+    def export_month():
+        with export_orders_csv(store.order_parts(month_ago), month_ago, None):
+            pass
+    recorder.once("admin.export_month_csv", backend, size, export_month)
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def metadata():
+    return {"revision": git_revision(), "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(), "numpy": np.__version__, "pandas": pd.__version__,
+            "platform": platform.platform(), "cpus": os.cpu_count()}
+
+
+# GATED_METRICS records more than `threshold` (and MIN_DELTA) slower than
+# their baseline as (record, baseline value)
+def regressions(results, baseline, threshold):
+    previous = {(r["case"], r["backend"], r["size"], r["metric"]): r["value"] for r in baseline["results"]}
+    slower = []
+    for record in results:
+        if record["metric"] not in GATED_METRICS:
+            continue
+        before = previous.get((record["case"], record["backend"], record["size"], record["metric"]))
+        if before and record["value"] > max(before * (1 + threshold), before + MIN_DELTA[record["unit"]]):
+            slower.append((record, before))
+    return slower
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BrewMate hot path benchmark suite")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100000, 1000000])
+    parser.add_argument("--backends", nargs="+", choices=["csv", "sqlite"], default=["csv"])
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--compare", help="results file from an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown before a result counts as a regression")
+    args = parser.parse_args()
+
+    recorder = Recorder()
+    for size in args.sizes:
+        for backend in args.backends:
+            with tempfile.TemporaryDirectory() as directory:
+                bench(recorder, backend, size, directory)
+
+    print(f"{'case':<28} {'backend':<7} {'size':>9} {'metric':<7} {'value':>11}")
+    for r in recorder.results:
+        print(f"{r['case']:<28} {r['backend']:<7} {r['size']:>9} {r['metric']:<7} {r['value']:>9.3f} {r['unit']}")
+    output = {"meta": metadata(), "results": recorder.results}
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(output, f, indent=1)
+
+    if args.compare:
+        with open(args.compare) as f:
+            slower = regressions(recorder.results, json.load(f), args.threshold)
+        for record, before in slower:
+            print(f"REGRESSION {record['case']} {record['backend']} {record['size']} {record['metric']}: "
+                  f"{before:.3f} -> {record['value']:.3f} {record['unit']}")
+        if slower:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+# Seeded synthetic BrewMate data: orders, users, ratings and loyalty points.
+#
+#   python -m benchmarks.workload --orders 1000000 --out /tmp/brewmate-1m
+#   python -m benchmarks.workload --orders 10000000 --customers 500000 --seed 7 --out /tmp/brewmate-10m
+#
+# The same seed and sizes always give byte-identical files.  Orders use the
+# real menu, size surcharges and add-on prices (brewmate/menu.py) and are
+# written in the app's CSV format, time-ordered, a chunk at a time, so 10M
+# rows take a few hundred MB of memory at most.  Customers follow a skewed
+# popularity (a few regulars place most orders), drinks and sizes have fixed
+# mix weights, and order times cluster around the morning and lunch rushes.
+import argparse
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from brewmate.auth import hash_password
+from brewmate.journal import ORDER_COLUMNS
+from brewmate.loyalty import LOYALTY_COLUMNS
+from brewmate.menu import add_on_prices, menu, size_prices
+from brewmate.orders import ADD_ON_LABELS, ADD_ONS, COFFEE_TYPES, SIZES
+from brewmate.storage import RATING_COLUMNS, USER_COLUMNS
+
+COFFEE_MIX = {"Americano": 0.30, "Cappuccino": 0.25, "Latte": 0.30, "Caramel Macchiato": 0.15}
+SIZE_MIX = {"Small": 0.35, "Medium": 0.45, "Large": 0.20}
+ADD_ON_RATES = {"Extra sugar": 0.20, "Milk": 0.35}
+# Share of the day's orders per hour; the shop is open 06:00-21:00
+HOUR_MIX = np.array([0, 0, 0, 0, 0, 0, 3, 9, 14, 11, 7, 6, 10, 9, 5, 4, 4, 3, 2, 2, 1, 0, 0, 0], dtype=float)
+RATING_MIX = {1: 0.03, 2: 0.05, 3: 0.12, 4: 0.35, 5: 0.45}
+FEEDBACK = ["Great", "Loved it", "Too sweet", "Could be hotter", "Perfect as always", "Slow service", ""]
+FIRST_NAMES = ["aisha", "ben", "chen", "diego", "elena", "farah", "george", "hana", "ivan", "julia", "kofi", "lena",
+               "mateo", "nadia", "omar", "priya", "quinn", "rosa", "sam", "tariq", "uma", "victor", "wei", "yusuf", "zoe"]
+# Customer ids are drawn as customers * u ** CUSTOMER_SKEW, so low ids order most often
+CUSTOMER_SKEW = 1.5
+ORDERS_PER_DAY = 2000
+CHUNK_ROWS = 500_000
+CSV_DATE_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+
+
+class Workload:
+    def __init__(self, orders, customers=None, seed=42, start=datetime(2024, 1, 1), days=None):
+        self.orders = orders
+        self.customers = customers or max(10, orders // 20)
+        self.seed = seed
+        self.start = start
+        self.days = days or max(1, -(-orders // ORDERS_PER_DAY))
+
+    def _rng(self, *stream):
+        return np.random.default_rng([self.seed, *stream])
+
+    def customer_names(self):
+        return [f"{FIRST_NAMES[i % len(FIRST_NAMES)]}{i}" for i in range(self.customers)]
+
+    # Orders as DataFrames with the CSV columns (order_time as datetime64),
+    # oldest first; chunk k covers the k-th slice of the date range
+    def order_chunks(self, chunk_rows=CHUNK_ROWS):
+        names = np.array(self.customer_names(), dtype=object)
+        coffee_p = np.array([COFFEE_MIX[name] for name in COFFEE_TYPES])
+        size_p = np.array([SIZE_MIX[name] for name in SIZES])
+        coffee_price = np.array([menu[name] for name in COFFEE_TYPES])
+        size_price = np.array([size_prices[name] for name in SIZES])
+        add_on_price = np.array([sum(add_on_prices[add_on] for bit, add_on in enumerate(ADD_ONS) if mask & (1 << bit))
+                                 for mask in range(1 << len(ADD_ONS))])
+        start_us = np.datetime64(self.start, "us")
+        chunks = max(1, -(-self.orders // chunk_rows))
+        for chunk in range(chunks):
+            rows = min(chunk_rows, self.orders - chunk * chunk_rows)
+            rng = self._rng(0, chunk)
+            first_day = self.days * chunk // chunks
+            last_day = max(first_day + 1, self.days * (chunk + 1) // chunks)
+            day = rng.integers(first_day, last_day, rows)
+            hour = rng.choice(24, rows, p=HOUR_MIX / HOUR_MIX.sum())
+            offset = (day * 86400 + hour * 3600) * 1_000_000 + rng.integers(0, 3_600_000_000, rows)
+            offset.sort()
+            coffee = rng.choice(len(COFFEE_TYPES), rows, p=coffee_p)
+            size = rng.choice(len(SIZES), rows, p=size_p)
+            mask = np.zeros(rows, np.int64)
+            for bit, add_on in enumerate(ADD_ONS):
+                mask |= (rng.random(rows) < ADD_ON_RATES[add_on]).astype(np.int64) << bit
+            customer = (self.customers * rng.random(rows) ** CUSTOMER_SKEW).astype(np.int64)  # low ids are the regulars
+            yield pd.DataFrame({
+                "customer_name": names[customer],
+                "coffee_type": np.asarray(COFFEE_TYPES, dtype=object)[coffee],
+                "size": np.asarray(SIZES, dtype=object)[size],
+                "add_ons": ADD_ON_LABELS[mask],
+                "price": np.round(coffee_price[coffee] + size_price[size] + add_on_price[mask], 2),
+                "order_time": start_us + offset.astype("timedelta64[us]"),
+            }, columns=ORDER_COLUMNS)
+
+    # Every order in one DataFrame (for the smaller sizes)
+    def orders_frame(self):
+        return pd.concat(self.order_chunks(), ignore_index=True)
+
+    def ratings_frame(self, count=None):
+        count = max(1, self.orders // 10) if count is None else count
+        rng = self._rng(1)
+        ratings = list(RATING_MIX)
+        names = np.array(self.customer_names(), dtype=object)
+        return pd.DataFrame({
+            "Customer": names[(self.customers * rng.random(count) ** CUSTOMER_SKEW).astype(np.int64)],
+            "Rating": np.asarray(ratings)[rng.choice(len(ratings), count, p=list(RATING_MIX.values()))],
+            "Feedback": np.asarray(FEEDBACK, dtype=object)[rng.integers(0, len(FEEDBACK), count)],
+        }, columns=RATING_COLUMNS)
+
+    # Write order_history.csv, users.csv, ratings.csv and loyalty_points.csv
+    # (one point per whole dollar of each order, as the app awards them)
+    def write(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        customer_index = {name: i for i, name in enumerate(self.customer_names())}
+        points = np.zeros(self.customers, np.int64)
+        with open(os.path.join(directory, "order_history.csv"), "w", newline="") as f:
+            f.write(",".join(ORDER_COLUMNS) + "\n")
+            for chunk in self.order_chunks():
+                chunk.to_csv(f, index=False, header=False, date_format=CSV_DATE_FORMAT)
+                codes = pd.Series(customer_index).reindex(chunk["customer_name"]).to_numpy()
+                np.add.at(points, codes, np.floor(chunk["price"].to_numpy()).astype(np.int64))
+        names = self.customer_names()
+        # Every user shares one salted hash: hashing millions of passwords would dominate the run
+        password_hash = hash_password("secret", iterations=1000, salt=b"brewmate-workload")
+        pd.DataFrame({"username": names, "password": password_hash}, columns=USER_COLUMNS).to_csv(
+            os.path.join(directory, "users.csv"), index=False)
+        self.ratings_frame().to_csv(os.path.join(directory, "ratings.csv"), index=False)
+        earned = np.flatnonzero(points)
+        pd.DataFrame({"Customer": np.asarray(names, dtype=object)[earned], "Points": points[earned]},
+                     columns=LOYALTY_COLUMNS).to_csv(os.path.join(directory, "loyalty_points.csv"), index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a seeded synthetic BrewMate data set")
+    parser.add_argument("--orders", type=int, default=100000)
+    parser.add_argument("--customers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", required=True)
+    args = parser.parse_args()
+    workload = Workload(args.orders, args.customers, args.seed)
+    workload.write(args.out)
+    print(f"{args.orders} orders, {workload.customers} customers over {workload.days} days written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+# Support modules for the BrewMate Streamlit app (storage, caching, kitchen, reporting)
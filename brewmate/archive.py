@@ -0,0 +1,181 @@
+import json
+import os
+import shutil
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from brewmate.locking import file_lock
+from brewmate.orders import OrderTable, from_epoch_us
+from brewmate.rollups import summarize_table
+
+
+def month_start(moment):
+    return datetime(moment.year, moment.month, 1)
+
+
+def next_month(moment):
+    return datetime(moment.year + moment.month // 12, moment.month % 12 + 1, 1)
+
+
+# Columnar, month-partitioned archive of old orders.
+#
+# Each month lives in its own directory (e.g. order_archive/2024-11/) holding
+# one .npy file per OrderTable column, sorted by order_time, plus meta.json
+# (customer/coffee/size dictionaries and the time range) and summary.npz (the
+# month's sales rollup buckets).  Columns are opened memory-mapped, so
+# startup reads only the small summaries, and a date-range query touches only
+# the partitions, and within them only the rows, that fall in the range.
+class OrderArchive:
+    def __init__(self, directory):
+        self.directory = directory
+        self._partitions = {}
+
+    def _path(self, month):
+        return os.path.join(self.directory, month)
+
+    # Months in the archive, oldest first ("YYYY-MM")
+    def months(self):
+        if not os.path.isdir(self.directory):
+            return []
+        self._recover()
+        return sorted(name for name in os.listdir(self.directory)
+                      if len(name) == 7 and os.path.exists(os.path.join(self._path(name), "meta.json")))
+
+    # A half-written partition replacement leaves "<month>.old" behind; put it back
+    def _recover(self):
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.endswith(".old"):
+                month = name[:-4]
+                if os.path.exists(os.path.join(self._path(month), "meta.json")):
+                    shutil.rmtree(path)
+                else:
+                    shutil.rmtree(self._path(month), ignore_errors=True)
+                    os.replace(path, self._path(month))
+            elif ".tmp" in name:
+                shutil.rmtree(path)
+
+    def meta(self, month):
+        with open(os.path.join(self._path(month), "meta.json")) as f:
+            return json.load(f)
+
+    def summary(self, month):
+        with np.load(os.path.join(self._path(month), "summary.npz"), allow_pickle=False) as summary:
+            return dict(summary)
+
+    # One month as a read-only OrderTable over memory-mapped columns
+    def partition(self, month):
+        cached = self._partitions.get(month)
+        meta_mtime = os.path.getmtime(os.path.join(self._path(month), "meta.json"))
+        if cached is not None and cached[0] == meta_mtime:
+            return cached[1]
+        meta = self.meta(month)
+        columns = {
+            name: np.load(os.path.join(self._path(month), f"{name}.npy"), mmap_mode="r")
+            for name in OrderTable.FIELDS
+        }
+        table = OrderTable.from_columns(columns, meta["customers"], meta["coffee_types"], meta["sizes"])
+        self._partitions[month] = (meta_mtime, table)
+        return table
+
+    # Add orders (a DataFrame with the CSV columns) to their month partitions.
+    # Rows at or before a partition's newest archived order_time are skipped,
+    # so repeating an interrupted archive run does not duplicate orders.
+    def add(self, orders_df):
+        if orders_df.empty:
+            return 0
+        months = pd.to_datetime(orders_df["order_time"], format="ISO8601").dt.strftime("%Y-%m")
+        added = 0
+        for month, rows in orders_df.groupby(months.to_numpy()):
+            added += self._write_month(month, rows)
+        return added
+
+    def _write_month(self, month, rows):
+        new = OrderTable.from_frame(rows)
+        frames = []
+        if month in self.months():
+            existing = self.partition(month)
+            latest = int(existing.column("order_time")[-1])
+            keep = new.column("order_time") > latest
+            if not keep.any():
+                return 0
+            frames.append(existing.to_frame())
+            new = OrderTable.from_frame(rows[keep])
+        frames.append(new.to_frame())
+        merged = OrderTable.from_frame(pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0])
+        order = np.argsort(merged.column("order_time"), kind="stable")
+
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = self._path(f"{month}.tmp")
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        for name in OrderTable.FIELDS:
+            np.save(os.path.join(tmp, f"{name}.npy"), np.ascontiguousarray(merged.column(name)[order]))
+        sorted_table = OrderTable.from_columns(
+            {name: merged.column(name)[order] for name in OrderTable.FIELDS},
+            merged.customers, merged.coffee_types, merged.sizes,
+        )
+        np.savez(os.path.join(tmp, "summary.npz"), **summarize_table(sorted_table))
+        order_time = sorted_table.column("order_time")
+        with open(os.path.join(tmp, "meta.json"), "w") as f:
+            json.dump({
+                "month": month,
+                "count": len(sorted_table),
+                "first_order_time": str(from_epoch_us(order_time[0])),
+                "last_order_time": str(from_epoch_us(order_time[-1])),
+                "customers": sorted_table.customers,
+                "coffee_types": sorted_table.coffee_types,
+                "sizes": sorted_table.sizes,
+            }, f)
+
+        # Swap the new partition in; _recover() finishes this if interrupted
+        path = self._path(month)
+        if os.path.exists(path):
+            os.replace(path, path + ".old")
+        os.replace(tmp, path)
+        shutil.rmtree(path + ".old", ignore_errors=True)
+        self._partitions.pop(month, None)
+        return len(new)
+
+
+# Move every order placed before the current month from the storage backend
+# into the archive; returns the orders that stay in the hot store.  Runs
+# under the archive's lock file, so server processes starting together take
+# turns and the later ones find the months already moved.
+def roll_over(storage, archive, now=None):
+    cutoff = month_start(now or datetime.now())
+    with file_lock(os.path.abspath(archive.directory) + ".lock"):
+        orders_df = storage.load_orders_frame()
+        if orders_df.empty:
+            return orders_df
+        order_time = pd.to_datetime(orders_df["order_time"], format="ISO8601")
+        old = (order_time < cutoff).to_numpy()
+        if not old.any():
+            return orders_df
+        archive.add(orders_df[old])
+        storage.remove_orders_before(cutoff)
+        return orders_df[~old].reset_index(drop=True)
+
+
+def main():
+    import argparse
+    from brewmate.storage import open_storage
+
+    parser = argparse.ArgumentParser(description="Move orders from past months into the columnar order archive")
+    parser.add_argument("--storage", default=os.environ.get("BREWMATE_STORAGE", "csv"))
+    parser.add_argument("--archive", default="order_archive")
+    parser.add_argument("--db", default=os.environ.get("BREWMATE_DB", "brewmate.db"))
+    args = parser.parse_args()
+
+    storage = open_storage(args.storage, "order_history.csv", "loyalty_points.csv", "ratings.csv", "users.csv", args.db)
+    archive = OrderArchive(args.archive)
+    hot = roll_over(storage, archive)
+    for month in archive.months():
+        print(f"{month}: {archive.meta(month)['count']} orders")
+    print(f"{len(hot)} orders remain in the hot store")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+import hashlib
+import hmac
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Stored passwords look like "pbkdf2_sha256$<iterations>$<salt hex>$<hash hex>".
+# Anything else in the users file is a legacy plaintext password, which is
+# replaced by a hash the next time that user logs in, or for every user at
+# once by `python -m brewmate.auth`.
+HASH_SCHEME = "pbkdf2_sha256"
+PBKDF2_ITERATIONS = 200_000
+SALT_BYTES = 16
+# Longer passwords are rejected rather than hashed, so one request cannot
+# make a verification arbitrarily expensive
+MAX_PASSWORD_LENGTH = 1024
+
+
+def hash_password(password, iterations=PBKDF2_ITERATIONS, salt=None):
+    salt = os.urandom(SALT_BYTES) if salt is None else salt
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations)
+    return f"{HASH_SCHEME}${iterations}${salt.hex()}${digest.hex()}"
+
+
+def is_hashed(stored):
+    return stored.startswith(HASH_SCHEME + "$")
+
+
+# True if `password` matches the stored hash (or legacy plaintext), compared in constant time
+def verify_password(password, stored):
+    if len(password) > MAX_PASSWORD_LENGTH:
+        return False
+    if not is_hashed(stored):
+        return hmac.compare_digest(password.encode("utf-8"), stored.encode("utf-8"))
+    _, iterations, salt, digest = stored.split("$")
+    candidate = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), bytes.fromhex(salt), int(iterations))
+    return hmac.compare_digest(candidate, bytes.fromhex(digest))
+
+
+# Users and their stored password hashes, indexed in memory.
+#
+# Lookups are dict hits.  A miss (e.g. a name registered by another server
+# process) first pulls what storage appended since the index was last read,
+# which for the CSV backend is a stat and a read of the new lines only.
+# Hashing and verifying go through a small thread pool that caps how many
+# PBKDF2 computations run at once however many sessions log in together;
+# the calling script thread still waits for its result.
+class UserStore:
+    def __init__(self, storage, users=None, position=None, workers=2, iterations=PBKDF2_ITERATIONS):
+        self.storage = storage
+        self.iterations = iterations
+        self._lock = threading.Lock()
+        self._register_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="brewmate-auth")
+        self.version = 0
+        if users is None:
+            users, position, _ = storage.load_users_since(None)
+        self._users = users
+        self.position = position
+
+    def __len__(self):
+        return len(self._users)
+
+    # Apply the users storage gained since the last read; True if any changed
+    def refresh(self):
+        with self._lock:
+            users, position, full = self.storage.load_users_since(self.position)
+            if full:
+                self._users = users
+            else:
+                self._users.update(users)
+            self.position = position
+            if users or full:
+                self.version += 1
+            return bool(users) or full
+
+    # Stored password hash for `username`, or None
+    def find(self, username):
+        stored = self._users.get(username)
+        if stored is None and self.refresh():
+            stored = self._users.get(username)
+        return stored
+
+    def exists(self, username):
+        return self.find(username) is not None
+
+    # Add a user; returns False if the name is taken and raises ValueError
+    # for a password over MAX_PASSWORD_LENGTH.  Registrations in this process
+    # take turns; storage checks the name again as it writes the row, which
+    # catches one taken by another process while the password was hashed.
+    def register(self, username, password):
+        if len(password) > MAX_PASSWORD_LENGTH:
+            raise ValueError(f"Passwords can be at most {MAX_PASSWORD_LENGTH} characters long.")
+        with self._register_lock:
+            if self.exists(username):
+                return False
+            stored = self._executor.submit(hash_password, password, self.iterations).result()
+            if not self.storage.add_user(username, stored):
+                self.refresh()
+                return False
+            with self._lock:
+                self._users[username] = stored
+                self.version += 1
+        return True
+
+    # True if the password is right.  Legacy plaintext passwords and hashes
+    # with fewer iterations than configured are re-hashed on success.
+    def authenticate(self, username, password):
+        stored = self.find(username)
+        if stored is None:
+            return False
+        if not self._executor.submit(verify_password, password, stored).result():
+            return False
+        if not is_hashed(stored) or int(stored.split("$")[1]) < self.iterations:
+            upgraded = self._executor.submit(hash_password, password, self.iterations).result()
+            self.storage.set_password(username, upgraded)
+            with self._lock:
+                self._users[username] = upgraded
+                self.version += 1
+        return True
+
+
+# Hash every legacy plaintext password in storage, keeping one row per user;
+# returns how many were hashed.  (Hashes with fewer iterations than
+# configured still wait for the user's next login, as the password is unknown.)
+def hash_stored_passwords(storage, iterations=PBKDF2_ITERATIONS):
+    users, _, _ = storage.load_users_since(None)
+    changes = {username: (stored, hash_password(stored, iterations))
+               for username, stored in users.items() if not is_hashed(stored)}
+    return storage.rewrite_users(changes)
+
+
+def main():
+    import argparse
+    from brewmate.storage import open_storage
+
+    parser = argparse.ArgumentParser(description="Replace legacy plaintext passwords with salted hashes")
+    parser.add_argument("--storage", default=os.environ.get("BREWMATE_STORAGE", "csv"))
+    parser.add_argument("--db", default=os.environ.get("BREWMATE_DB", "brewmate.db"))
+    args = parser.parse_args()
+
+    storage = open_storage(args.storage, "order_history.csv", "loyalty_points.csv", "ratings.csv", "users.csv", args.db)
+    print(f"{hash_stored_passwords(storage)} passwords hashed")
+
+
+if __name__ == "__main__":
+    main()
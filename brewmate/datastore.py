@@ -0,0 +1,192 @@
+import threading
+from datetime import datetime
+
+import numpy as np
+
+from brewmate.archive import month_start, next_month
+from brewmate.auth import UserStore
+from brewmate.explorer import query_page
+from brewmate.orders import from_epoch_us
+from brewmate.rollups import SalesRollup
+from brewmate.snapshot import load_state
+
+
+# Process-wide, read-mostly copy of the app data shared by every session.
+#
+# The data is loaded from storage once per server process instead of once per
+# browser session.  Each dataset carries a version number that is bumped on
+# every write; values derived from a dataset (e.g. the sales DataFrame) are
+# memoized per version, so readers see new orders without re-parsing anything.
+# Readers must treat the returned lists, dicts and frames as read-only.
+#
+# With an OrderArchive, `orders` holds the orders still in the storage backend
+# (the hot partition, from `hot_month` on) and the sales rollup merges the
+# archived months' stored summaries instead of reading their rows.  Orders
+# are moved into the archive only by `python -m brewmate.archive`, never by
+# the app; archive months from `hot_month` on are already in the hot table
+# (the CLI ran after this store loaded) and are skipped until the next start.
+#
+# With a StateSnapshot, startup loads the snapshot and only the orders added
+# after it; the snapshot is refreshed in the background every
+# `snapshot_every` orders (and at startup when it was missing or far behind).
+#
+# With a RecipeBook, `consumption` holds the ingredients used by every order
+# ever placed: replayed over the hot table and each archive partition at
+# startup, then kept current with one recipe lookup per new order.
+#
+# With a UserStore already loaded (the sidebar's login needs one before any
+# page loads the orders), that store is shared instead of building another.
+class DataStore:
+    def __init__(self, storage, archive=None, snapshot=None, snapshot_every=1000, recipes=None, users=None):
+        self.storage = storage
+        self.archive = archive
+        self.snapshot = snapshot
+        self.snapshot_every = snapshot_every
+        self._snapshot_thread = None
+        self._lock = threading.RLock()
+        state, fresh_orders = load_state(storage, snapshot)
+        self.orders = state["orders"]
+        oldest = from_epoch_us(self.orders.column("order_time").min()) if len(self.orders) else datetime.now()
+        self.hot_month = month_start(oldest)
+        self.loyalty = storage.loyalty
+        self.loyalty.restore(state["loyalty_points"], state["loyalty_points_position"])
+        self.ratings = state["ratings"]
+        self.users = users if users is not None else UserStore(storage, state["users"], state["users_position"])
+        self.sales = SalesRollup.from_table(self.orders)
+        for month in self.archived_months():
+            self.sales.add_summary(archive.summary(month))
+        self.recipes = recipes
+        self.consumption = {}
+        if recipes is not None:
+            for table in self.order_tables():
+                for item, quantity in recipes.consumption(table).items():
+                    self.consumption[item] = self.consumption.get(item, 0) + quantity
+        self.versions = {"orders": 0, "ratings": 0}
+        self._derived = {}
+        self._orders_since_snapshot = fresh_orders
+        if fresh_orders >= snapshot_every:
+            self._start_snapshot()
+
+    # Refresh the snapshot on a background thread, unless one is already running
+    def _start_snapshot(self):
+        if self.snapshot is None or (self._snapshot_thread is not None and self._snapshot_thread.is_alive()):
+            return
+        self._orders_since_snapshot = 0
+        self._snapshot_thread = threading.Thread(target=self.snapshot.refresh, args=(self.storage,),
+                                                 name="brewmate-snapshot", daemon=True)
+        self._snapshot_thread.start()
+
+    def version(self, dataset):
+        return self.versions[dataset]
+
+    def _bump(self, dataset):
+        self.versions[dataset] += 1
+
+    # Value of build() for the current version of `dataset`, built at most once per version
+    def derived(self, dataset, name, build):
+        key = (dataset, name)
+        version = self.versions[dataset]
+        cached = self._derived.get(key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        with self._lock:
+            version = self.versions[dataset]
+            cached = self._derived.get(key)
+            if cached is None or cached[0] != version:
+                cached = (version, build())
+                self._derived[key] = cached
+            return cached[1]
+
+    # Orders (kept in a columnar OrderTable)
+    def append_order(self, order):
+        with self._lock:
+            self.storage.append_order(order)
+            self.orders.append(order)
+            self.sales.add(order["coffee_type"], order["price"], order["order_time"])
+            if self.recipes is not None:
+                for item, quantity in self.recipes.ingredients_for(order["coffee_type"], order["size"], order["add_ons"]).items():
+                    self.consumption[item] = self.consumption.get(item, 0) + quantity
+            self._bump("orders")
+            self._orders_since_snapshot += 1
+            if self._orders_since_snapshot >= self.snapshot_every:
+                self._start_snapshot()
+
+    # Archive months this store reads from the archive ("YYYY-MM", oldest first)
+    def archived_months(self):
+        if self.archive is None:
+            return []
+        return [month for month in self.archive.months() if datetime.strptime(month, "%Y-%m") < self.hot_month]
+
+    # Every month with orders, archived or hot, oldest first ("YYYY-MM")
+    def months(self):
+        months = self.archived_months()
+        month = self.hot_month
+        while month <= datetime.now():
+            months.append(month.strftime("%Y-%m"))
+            month = next_month(month)
+        return months
+
+    # The hot OrderTable plus the archive partitions with orders from `start` on
+    def order_tables(self, start=None):
+        tables = [self.orders]
+        for month in self.archived_months():
+            if start is None or next_month(datetime.strptime(month, "%Y-%m")) > start:
+                tables.append(self.archive.partition(month))
+        return tables
+
+    # The tables holding orders from `start` on as (OrderTable, time_sorted),
+    # oldest first: archive partitions, then the hot table
+    def order_parts(self, start=None):
+        hot_sorted = self.derived("orders", "hot_time_sorted",
+                                  lambda: bool(np.all(np.diff(self.orders.column("order_time")) >= 0)))
+        return [(table, True) for table in self.order_tables(start)[1:]] + [(self.orders, hot_sorted)]
+
+    # One page of the orders from `start` to `end` that match the filters, and
+    # how many match (see brewmate.explorer.query_page for the other arguments)
+    def order_page(self, start=None, end=None, **query):
+        return query_page(self.order_parts(start), start, end, **query)
+
+    # Loyalty points: shared by every process through the storage ledger
+    # (store.loyalty, whose `version` counts every change it has seen)
+    def add_loyalty_points(self, customer_name, points):
+        return self.loyalty.add(customer_name, points)
+
+    # Ratings.  A new rating replaces the list instead of appending to it, so
+    # a session still building a frame from the old list never sees it change
+    def add_rating(self, rating):
+        self.storage.add_rating(rating)
+        with self._lock:
+            self.ratings = [*self.ratings, rating]
+            self._bump("ratings")
+
+
+# Write-only front of the app data for pages that only add to it (Order Now).
+#
+# Until a page builds the process's DataStore, orders, loyalty points and
+# ratings go straight to storage, so placing an order never loads the order
+# history, the archive or the snapshot; a DataStore built later reads them
+# back from storage.  attach() builds the DataStore under the same lock the
+# writes take, so no write falls between its load and the switch, and from
+# then on writes go through it and its in-memory copy stays current.
+class OrderWriter:
+    def __init__(self, storage):
+        self.storage = storage
+        self.store = None
+        self._lock = threading.Lock()
+
+    # Build the DataStore with build() and send every later write through it
+    def attach(self, build):
+        with self._lock:
+            self.store = build()
+            return self.store
+
+    def append_order(self, order):
+        with self._lock:
+            (self.store or self.storage).append_order(order)
+
+    def add_loyalty_points(self, customer_name, points):
+        return self.storage.loyalty.add(customer_name, points)
+
+    def add_rating(self, rating):
+        with self._lock:
+            (self.store or self.storage).add_rating(rating)
@@ -0,0 +1,128 @@
+import numpy as np
+import pandas as pd
+
+from brewmate.journal import ORDER_COLUMNS
+from brewmate.orders import to_epoch_us
+
+SORT_COLUMNS = ("order_time", "customer_name", "coffee_type", "size", "price")
+# Sort columns holding names: the OrderTable code column and its dictionary
+NAME_COLUMNS = {"customer_name": ("customer", "customers"), "coffee_type": ("coffee", "coffee_types"),
+                "size": ("size", "sizes")}
+
+
+# Positions of the rows of `table` that match the filters, in table order:
+# a range when only the date range applies, otherwise an index array.
+# A time-sorted table narrows the date range with two binary searches;
+# customer, coffee and size filters compare dictionary codes, so a name
+# the table never saw rules the whole table out without reading it.
+def _matching_rows(table, time_sorted, start, end, customer, coffee_type, size):
+    order_time = table.column("order_time")
+    lo, hi = 0, len(table)
+    mask = None
+    if time_sorted:
+        if start is not None:
+            lo = int(np.searchsorted(order_time, to_epoch_us(start), "left"))
+        if end is not None:
+            hi = int(np.searchsorted(order_time, to_epoch_us(end), "left"))
+    else:
+        if start is not None:
+            mask = order_time >= to_epoch_us(start)
+        if end is not None:
+            mask = (order_time < to_epoch_us(end)) if mask is None else mask & (order_time < to_epoch_us(end))
+    if hi <= lo:
+        return np.empty(0, np.intp)
+    for field, value, codes in (("customer", customer, None), ("coffee", coffee_type, table.coffee_types),
+                                ("size", size, table.sizes)):
+        if value is None:
+            continue
+        code = table.customer_code(value) if codes is None else (codes.index(value) if value in codes else None)
+        if code is None:
+            return np.empty(0, np.intp)
+        matches = table.column(field)[lo:hi] == code
+        mask = matches if mask is None else mask & matches  # an unsorted table's mask already spans [lo, hi)
+    if mask is None:
+        return range(lo, hi)
+    return np.flatnonzero(mask) + lo
+
+
+# Index for selecting `rows` from a column (a slice for a range)
+def _index(rows):
+    return slice(rows.start, rows.stop) if isinstance(rows, range) else rows
+
+
+# Sort key for every matched row, in the order the matches are concatenated.
+# Names (customer, coffee type, size) become their rank among the names that
+# occur in the matches, so every key is a small non-negative integer.
+def _sort_key(matches, sort_by):
+    if sort_by in ("order_time", "price"):
+        column = "price_cents" if sort_by == "price" else "order_time"
+        return np.concatenate([table.column(column)[_index(rows)] for table, _, rows in matches]).astype(np.int64)
+    field, dictionary = NAME_COLUMNS[sort_by]
+    names = [getattr(table, dictionary) for table, _, _ in matches]
+    codes = [np.flatnonzero(np.bincount(table.column(field)[_index(rows)], minlength=len(table_names)))
+             for (table, _, rows), table_names in zip(matches, names)]
+    ordered = sorted({table_names[code] for table_names, part_codes in zip(names, codes) for code in part_codes.tolist()})
+    rank = {name: i for i, name in enumerate(ordered)}
+    keys = []
+    for (table, _, rows), table_names, part_codes in zip(matches, names, codes):
+        rank_of_code = np.zeros(len(table_names), np.int64)
+        rank_of_code[part_codes] = [rank[table_names[code]] for code in part_codes.tolist()]
+        keys.append(rank_of_code[table.column(field)[_index(rows)]])
+    return np.concatenate(keys)
+
+
+# One page of the orders matching the filters, and how many orders match.
+#
+# `parts` lists (OrderTable, time_sorted) oldest first, e.g. the archive
+# partitions and then the hot table.  Filters are applied column at a time
+# to each table (see _matching_rows) and only the rows on the page are
+# turned into a DataFrame, so the response is `limit` rows however long the
+# history is.  Sorting by order_time over time-sorted tables needs no sort
+# at all; other keys pick the page with a partial sort (argpartition).
+# Ties keep time order, newest first when descending.
+def query_page(parts, start=None, end=None, customer=None, coffee_type=None, size=None,
+               sort_by="order_time", descending=True, offset=0, limit=50):
+    if sort_by not in SORT_COLUMNS:
+        raise ValueError(f"cannot sort orders by {sort_by!r}")
+    matches = []
+    for table, time_sorted in parts:
+        rows = _matching_rows(table, time_sorted, start, end, customer, coffee_type, size)
+        if len(rows):
+            matches.append((table, time_sorted, rows))
+    total = sum(len(rows) for _, _, rows in matches)
+    offset = max(0, min(offset, total))
+    stop = min(total, offset + limit)
+    if stop <= offset:
+        return pd.DataFrame(columns=ORDER_COLUMNS), total
+
+    # positions index the concatenation of every part's matched rows
+    if sort_by == "order_time" and all(time_sorted for _, time_sorted, _ in matches):
+        positions = np.arange(offset, stop)
+        if descending:
+            positions = total - 1 - positions
+    elif sort_by == "order_time":
+        order = np.argsort(_sort_key(matches, sort_by), kind="stable")
+        positions = (order[::-1] if descending else order)[offset:stop]
+    else:
+        key = _sort_key(matches, sort_by) * total + np.arange(total)  # ties broken by position
+        if descending:
+            key = -key
+        if stop < total:
+            candidates = np.argpartition(key, stop - 1)[:stop]
+            positions = candidates[np.argsort(key[candidates])][offset:stop]
+        else:
+            positions = np.argsort(key)[offset:stop]
+
+    # gather the page's rows table by table, then put them back in page order
+    bounds = np.cumsum([0] + [len(rows) for _, _, rows in matches])
+    part_of = np.searchsorted(bounds, positions, "right") - 1
+    gathered, page_order = [], []
+    for i in np.unique(part_of):
+        on_page = np.flatnonzero(part_of == i)
+        table, _, rows = matches[i]
+        at = positions[on_page] - bounds[i]
+        gathered.append(table.values(at + rows.start if isinstance(rows, range) else rows[at]))
+        page_order.append(on_page)
+    order = np.argsort(np.concatenate(page_order))
+    return pd.DataFrame({column: np.concatenate([values[column] for values in gathered])[order]
+                         for column in ORDER_COLUMNS}), total
@@ -0,0 +1,142 @@
+import tempfile
+
+import pandas as pd
+
+from brewmate.explorer import _matching_rows
+from brewmate.journal import ORDER_COLUMNS
+
+EXPORT_CHUNK_ROWS = 50_000
+# Excel's row limit; longer exports continue on "Orders 2", "Orders 3", ...
+EXCEL_MAX_ROWS = 1_048_576
+# Exports up to this size stay in memory, bigger ones spill to a temp file
+SPOOL_MAX_BYTES = 8 * 1024 * 1024
+CSV_DATE_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+SUMMARY_COLUMNS = ["Date", "Coffee Type", "Orders", "Revenue"]
+
+
+# Orders with start <= order_time < end as DataFrames of at most `chunk_rows`
+# rows, read table by table from `parts` (see DataStore.order_parts), so only
+# one chunk of rows is ever materialized
+def order_chunks(parts, start=None, end=None, chunk_rows=EXPORT_CHUNK_ROWS):
+    for table, time_sorted in parts:
+        rows = _matching_rows(table, time_sorted, start, end, None, None, None)
+        for i in range(0, len(rows), chunk_rows):
+            chunk = rows[i:i + chunk_rows]
+            if isinstance(chunk, range):
+                yield table.to_frame(chunk.start, chunk.stop)
+            else:
+                yield pd.DataFrame(table.values(chunk), columns=ORDER_COLUMNS)
+
+
+# Orders and revenue per day and coffee type, accumulated one chunk at a time
+class SalesSummary:
+    def __init__(self):
+        self.buckets = {}  # (date, coffee type) -> [orders, revenue]
+
+    def add(self, chunk):
+        grouped = pd.DataFrame({
+            "day": chunk["order_time"].to_numpy().astype("datetime64[D]"),
+            "coffee_type": chunk["coffee_type"].astype(str),
+            "price": chunk["price"],
+        }).groupby(["day", "coffee_type"])["price"].agg(["count", "sum"])
+        for key, count, revenue in zip(grouped.index.tolist(), grouped["count"].tolist(), grouped["sum"].tolist()):
+            bucket = self.buckets.setdefault((key[0].date(), key[1]), [0, 0.0])
+            bucket[0] += count
+            bucket[1] += revenue
+
+    # One row per day and coffee type, oldest first
+    def frame(self):
+        rows = [(day, coffee_type, count, round(revenue, 2))
+                for (day, coffee_type), (count, revenue) in sorted(self.buckets.items())]
+        return pd.DataFrame(rows, columns=SUMMARY_COLUMNS)
+
+    # Orders and revenue per coffee type, most sold first
+    def by_coffee(self):
+        totals = self.frame().groupby("Coffee Type")[["Orders", "Revenue"]].sum()
+        return totals.sort_values("Orders", ascending=False).reset_index()
+
+    # Orders and revenue per day
+    def by_day(self):
+        return self.frame().groupby("Date")[["Orders", "Revenue"]].sum().reset_index()
+
+
+# The orders export as CSV, one encoded chunk at a time (header first)
+def csv_chunks(parts, start=None, end=None, summary=None, chunk_rows=EXPORT_CHUNK_ROWS):
+    yield (",".join(ORDER_COLUMNS) + "\n").encode("utf-8")
+    for chunk in order_chunks(parts, start, end, chunk_rows):
+        if summary is not None:
+            summary.add(chunk)
+        yield chunk.to_csv(index=False, header=False, date_format=CSV_DATE_FORMAT).encode("utf-8")
+
+
+def _spool():
+    return tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+
+
+# Orders from `start` to `end` as CSV in a spooled temp file, rewound for reading
+def export_orders_csv(parts, start=None, end=None, chunk_rows=EXPORT_CHUNK_ROWS):
+    f = _spool()
+    for data in csv_chunks(parts, start, end, chunk_rows=chunk_rows):
+        f.write(data)
+    f.seek(0)
+    return f
+
+
+# Orders and revenue per day and coffee type from `start` to `end` as CSV
+def export_summary_csv(parts, start=None, end=None, chunk_rows=EXPORT_CHUNK_ROWS):
+    summary = SalesSummary()
+    for chunk in order_chunks(parts, start, end, chunk_rows):
+        summary.add(chunk)
+    f = _spool()
+    f.write(summary.frame().to_csv(index=False).encode("utf-8"))
+    f.seek(0)
+    return f
+
+
+# Excel workbook with a Summary sheet (sales per coffee type with a bar
+# chart, and per day) and the orders on "Orders" sheets.  openpyxl's
+# write-only mode streams each sheet's rows to disk as they are appended,
+# so memory stays at one chunk of orders however long the range is.
+def export_xlsx(parts, start=None, end=None, chunk_rows=EXPORT_CHUNK_ROWS):
+    from openpyxl import Workbook  # loaded by the first Excel export, not at app start
+    from openpyxl.chart import BarChart, Reference
+
+    workbook = Workbook(write_only=True)
+    summary_sheet = workbook.create_sheet("Summary")
+    orders_sheet = workbook.create_sheet("Orders")
+    orders_sheet.append(ORDER_COLUMNS)
+    sheet_rows, sheets = 1, 1
+    summary = SalesSummary()
+    for chunk in order_chunks(parts, start, end, chunk_rows):
+        summary.add(chunk)
+        chunk = chunk.assign(coffee_type=chunk["coffee_type"].astype(str), size=chunk["size"].astype(str),
+                             order_time=chunk["order_time"].dt.to_pydatetime())
+        for row in chunk.itertuples(index=False, name=None):
+            if sheet_rows == EXCEL_MAX_ROWS:
+                sheets += 1
+                orders_sheet = workbook.create_sheet(f"Orders {sheets}")
+                orders_sheet.append(ORDER_COLUMNS)
+                sheet_rows = 1
+            orders_sheet.append(row)
+            sheet_rows += 1
+
+    by_coffee = summary.by_coffee()
+    summary_sheet.append(["Coffee Type", "Orders", "Revenue"])
+    for row in by_coffee.itertuples(index=False, name=None):
+        summary_sheet.append(row)
+    summary_sheet.append([])
+    summary_sheet.append(["Date", "Orders", "Revenue"])
+    for row in summary.by_day().itertuples(index=False, name=None):
+        summary_sheet.append(row)
+    if len(by_coffee):
+        chart = BarChart()
+        chart.title = "Sales by Coffee Type"
+        chart.y_axis.title = "Orders"
+        chart.add_data(Reference(summary_sheet, min_col=2, min_row=1, max_row=len(by_coffee) + 1), titles_from_data=True)
+        chart.set_categories(Reference(summary_sheet, min_col=1, min_row=2, max_row=len(by_coffee) + 1))
+        summary_sheet.add_chart(chart, "E2")
+
+    f = _spool()
+    workbook.save(f)
+    f.seek(0)
+    return f
@@ -0,0 +1,115 @@
+import math
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from brewmate.orders import to_epoch_us
+from brewmate.rollups import BUCKET_WIDTHS
+
+HOUR = BUCKET_WIDTHS["hour"]
+HOURS_PER_WEEK = 168
+# 1970-01-01 (epoch hour 0) was a Thursday; shift so hour-of-week 0 is Monday 00:00
+EPOCH_HOUR_OF_WEEK = 72
+DEFAULT_LOOKBACK = timedelta(weeks=8)
+
+
+# Ingredient use per hour for the orders in `tables` with start <= order_time
+# < end: returns the hour keys (epoch hours) and an (hours x ingredients)
+# array.  Orders are bucketed by hour and recipe combination with a single
+# bincount, and the counts are turned into ingredients with the recipe matrix.
+def hourly_demand(tables, recipes, start, end):
+    first_hour = to_epoch_us(start) // HOUR
+    hours = to_epoch_us(end) // HOUR - first_hour + 1
+    combos = len(recipes.matrix)
+    counts = np.zeros(hours * combos, dtype=np.int64)
+    for table in tables:
+        order_time = table.column("order_time")
+        in_window = (order_time >= to_epoch_us(start)) & (order_time < to_epoch_us(end))
+        codes = recipes.combo_codes(table)
+        in_window &= codes >= 0
+        if not in_window.any():
+            continue
+        keys = (order_time[in_window] // HOUR - first_hour) * combos + codes[in_window]
+        counts += np.bincount(keys, minlength=len(counts))
+    return np.arange(first_hour, first_hour + hours), counts.reshape(hours, combos) @ recipes.matrix
+
+
+# Expected ingredient use for the coming weeks, from recent order history.
+#
+# Demand is modelled per hour of the week (Monday 8-9am is busier than
+# Sunday 3am): each of the 168 slots averages the hours of that slot seen in
+# the lookback window.  Projecting that profile forward from now gives each
+# item's time to depletion, and the projected use over the supplier lead
+# time plus the cover period, plus safety stock for day-to-day variation,
+# gives the suggested reorder quantity.
+class DemandForecast:
+    def __init__(self, ingredients, profile, daily_std, lead_time=timedelta(days=2), cover=timedelta(days=7),
+                 service_z=1.65):
+        self.ingredients = list(ingredients)
+        self.profile = profile      # (168 x ingredients) expected use per hour of the week
+        self.daily_std = daily_std  # standard deviation of daily use per ingredient
+        self.lead_time = lead_time
+        self.cover = cover
+        self.service_z = service_z
+
+    # Fit on `tables` (OrderTables, e.g. the hot table and archive partitions)
+    # over the `lookback` before `now`
+    @classmethod
+    def fit(cls, tables, recipes, lookback=DEFAULT_LOOKBACK, now=None, **options):
+        now = now or datetime.now()
+        start = now - lookback
+        first = [int(table.column("order_time").min()) for table in tables if len(table)]
+        if first:
+            # Do not count the hours before the first order as quiet hours
+            start = max(start, datetime(1970, 1, 1) + timedelta(microseconds=min(first)))
+        hours, demand = hourly_demand(tables, recipes, start, now)
+        slots = (hours + EPOCH_HOUR_OF_WEEK) % HOURS_PER_WEEK
+        seen = np.bincount(slots, minlength=HOURS_PER_WEEK)
+        profile = np.zeros((HOURS_PER_WEEK, len(recipes.ingredients)))
+        np.add.at(profile, slots, demand)
+        profile /= np.maximum(seen, 1)[:, None]
+        days = len(demand) // 24
+        daily = demand[len(demand) - days * 24:].reshape(days, 24, -1).sum(axis=1) if days else demand[:0]
+        daily_std = daily.std(axis=0) if days > 1 else np.zeros(len(recipes.ingredients))
+        return cls(recipes.ingredients, profile, daily_std, **options)
+
+    # Expected use per hour for the next `hours` hours, starting with the current hour
+    def project(self, hours, now=None):
+        first = to_epoch_us(now or datetime.now()) // HOUR
+        slots = (np.arange(first, first + hours) + EPOCH_HOUR_OF_WEEK) % HOURS_PER_WEEK
+        return self.profile[slots]
+
+    # Per item: stock, expected use per day, hours until it runs out (None if
+    # not within `horizon`) and the suggested reorder quantity, as a DataFrame
+    def outlook(self, levels, horizon=timedelta(weeks=4), now=None):
+        horizon_hours = int(horizon.total_seconds() // 3600)
+        cumulative = np.cumsum(self.project(horizon_hours, now), axis=0)
+        order_hours = int((self.lead_time + self.cover).total_seconds() // 3600)
+        lead_days = self.lead_time.total_seconds() / 86400
+        rows = []
+        for item in dict.fromkeys([*levels, *self.ingredients]):
+            stock = levels.get(item, 0)
+            if item in self.ingredients:
+                column = self.ingredients.index(item)
+                use = cumulative[:, column]
+                hours_left = int(np.searchsorted(use, stock, "right")) if use[-1] > stock else None
+                per_day = self.profile[:, column].sum() / 7
+                needed = use[min(order_hours, horizon_hours) - 1] + self.service_z * self.daily_std[column] * math.sqrt(lead_days)
+            else:
+                hours_left, per_day, needed = None, 0.0, 0.0
+            rows.append({
+                "Item": item,
+                "In Stock": stock,
+                "Use per Day": round(per_day, 1),
+                "Runs Out In (hours)": 0 if stock <= 0 else hours_left,
+                "Reorder": max(0, math.ceil(needed - stock)),
+            })
+        return pd.DataFrame(rows)
+
+    # Items that need reordering now: out of stock, or running out before a
+    # new delivery (ordered now) would arrive plus one day of margin
+    def alerts(self, outlook):
+        alert_hours = (self.lead_time + timedelta(days=1)).total_seconds() / 3600
+        hours_left = outlook["Runs Out In (hours)"]
+        return outlook[hours_left.notna() & (hours_left <= alert_hours)]
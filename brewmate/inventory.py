@@ -0,0 +1,283 @@
+import csv
+import io
+import os
+import threading
+import time
+import uuid
+
+from brewmate.journal import _fsync_dir
+from brewmate.locking import file_lock
+
+LEDGER_COLUMNS = ["event", "reservation", "item", "quantity", "expires"]
+
+
+# Raised by reserve() when an ingredient does not have enough stock left;
+# `items` maps each short ingredient to the quantity still available
+class OutOfStock(Exception):
+    def __init__(self, items):
+        super().__init__("Not enough " + ", ".join(items))
+        self.items = items
+
+
+# Raised by commit() for a reservation that expired (or was released) before
+# it was committed: its stock may since have been reserved by another
+# session, so nothing is taken off the shelf and the caller reserves again
+class ReservationExpired(Exception):
+    def __init__(self, reservation):
+        super().__init__(f"Reservation {reservation} has expired")
+        self.reservation = reservation
+
+
+def _number(text):
+    value = float(text)
+    return int(value) if value.is_integer() else value
+
+
+# Shared stock levels in a CSV event ledger, safe across sessions and server processes.
+#
+# Every change is one fsync'd line appended under an exclusive flock:
+#   restock,,milk,250,             set,,milk,750,        (set: written by compaction)
+#   reserve,<id>,milk,20,<expires> commit,<id>,,,        release,<id>,,,
+# Each process keeps the levels in memory and, under the lock, first applies
+# the lines other processes appended since its last read, so a reservation
+# is checked against every reservation made anywhere.  Reservations that are
+# neither committed nor released (e.g. a session that died mid-order) stop
+# counting after `reservation_ttl` seconds and can no longer be committed
+# (commit() checks the expiry under the lock before appending).  Once
+# `compact_events` lines have been appended the ledger is rewritten as one
+# `set` line per item plus the open reservations; other processes see the
+# new file and re-read it.
+class FileInventoryLedger:
+    def __init__(self, path, reservation_ttl=900, compact_events=10000):
+        self.path = path
+        self.lock_path = path + ".lock"
+        self.reservation_ttl = reservation_ttl
+        self.compact_events = compact_events
+        self._lock = threading.Lock()
+        self._reset(None)
+
+    def _reset(self, inode):
+        self._inode = inode
+        self._offset = 0
+        self._events = 0
+        self._on_hand = {}
+        self._reservations = {}  # id -> (expires, {item: quantity})
+
+    # Apply the lines appended since the last read (call with both locks held)
+    def _sync_locked(self):
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            self._reset(None)
+            return
+        with f:
+            stat = os.fstat(f.fileno())
+            if stat.st_ino != self._inode or stat.st_size < self._offset:
+                self._reset(stat.st_ino)
+            f.seek(self._offset)
+            data = f.read(stat.st_size - self._offset)
+        complete = data[:data.rfind(b"\n") + 1]  # a torn last line is not applied
+        self._offset += len(complete)
+        for row in csv.reader(io.StringIO(complete.decode("utf-8"))):
+            if len(row) == len(LEDGER_COLUMNS) and row[0] != "event":
+                self._apply(*row)
+                self._events += 1
+
+    def _apply(self, event, reservation, item, quantity, expires):
+        if event == "restock":
+            self._on_hand[item] = self._on_hand.get(item, 0) + _number(quantity)
+        elif event == "set":
+            self._on_hand[item] = _number(quantity)
+        elif event == "reserve":
+            self._reservations.setdefault(reservation, (float(expires), {}))[1][item] = _number(quantity)
+        elif event == "commit":
+            _, items = self._reservations.pop(reservation, (0, {}))
+            for item, quantity in items.items():
+                self._on_hand[item] = self._on_hand.get(item, 0) - quantity
+        elif event == "release":
+            self._reservations.pop(reservation, None)
+
+    def _append_locked(self, rows):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        if not os.path.exists(self.path):
+            writer.writerow(LEDGER_COLUMNS)
+        writer.writerows(rows)
+        data = buffer.getvalue().encode("utf-8")
+        fd = os.open(self.path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            size = os.fstat(fd).st_size
+            if size:
+                os.lseek(fd, size - 1, os.SEEK_SET)
+                if os.read(fd, 1) != b"\n":
+                    data = b"\n" + data
+            os.write(fd, data)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        self._sync_locked()
+        if self._events >= self.compact_events:
+            self._compact_locked()
+
+    def _compact_locked(self):
+        now = time.time()
+        rows = [["set", "", item, quantity, ""] for item, quantity in self._on_hand.items()]
+        for reservation, (expires, items) in self._reservations.items():
+            if expires > now:
+                rows.extend(["reserve", reservation, item, quantity, expires] for item, quantity in items.items())
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", newline="") as f:
+            writer = csv.writer(f, lineterminator="\n")
+            writer.writerow(LEDGER_COLUMNS)
+            writer.writerows(rows)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        _fsync_dir(self.path)
+        self._sync_locked()
+
+    def _reserved(self, now):
+        reserved = {}
+        for expires, items in self._reservations.values():
+            if expires > now:
+                for item, quantity in items.items():
+                    reserved[item] = reserved.get(item, 0) + quantity
+        return reserved
+
+    # Stock on hand per item (reserved stock is still on hand until committed)
+    def levels(self):
+        with self._lock, file_lock(self.lock_path, exclusive=False):
+            self._sync_locked()
+            return dict(self._on_hand)
+
+    # Stock on hand minus the open reservations
+    def available(self):
+        with self._lock, file_lock(self.lock_path, exclusive=False):
+            self._sync_locked()
+            reserved = self._reserved(time.time())
+            return {item: quantity - reserved.get(item, 0) for item, quantity in self._on_hand.items()}
+
+    # Set aside `quantities` ({item: quantity}) for one order and return the
+    # reservation id; raises OutOfStock without reserving anything if any item is short
+    def reserve(self, quantities):
+        with self._lock, file_lock(self.lock_path):
+            self._sync_locked()
+            now = time.time()
+            reserved = self._reserved(now)
+            short = {}
+            for item, quantity in quantities.items():
+                available = self._on_hand.get(item, 0) - reserved.get(item, 0)
+                if quantity > available:
+                    short[item] = available
+            if short:
+                raise OutOfStock(short)
+            reservation = uuid.uuid4().hex
+            expires = now + self.reservation_ttl
+            self._append_locked([["reserve", reservation, item, quantity, expires]
+                                 for item, quantity in quantities.items() if quantity])
+            return reservation
+
+    # Take the reserved stock off the shelf; raises ReservationExpired if the
+    # reservation is no longer held
+    def commit(self, reservation):
+        with self._lock, file_lock(self.lock_path):
+            self._sync_locked()
+            expires, _ = self._reservations.get(reservation, (0, None))
+            if expires <= time.time():
+                raise ReservationExpired(reservation)
+            self._append_locked([["commit", reservation, "", "", ""]])
+
+    # Give the reserved stock back (the order was not placed)
+    def release(self, reservation):
+        with self._lock, file_lock(self.lock_path):
+            self._append_locked([["release", reservation, "", "", ""]])
+
+    def restock(self, item, quantity):
+        with self._lock, file_lock(self.lock_path):
+            self._append_locked([["restock", "", item, quantity, ""]])
+
+    # Add any item of `defaults` the ledger has never seen, at its default level
+    def stock_defaults(self, defaults):
+        with self._lock, file_lock(self.lock_path):
+            self._sync_locked()
+            missing = [["restock", "", item, quantity, ""] for item, quantity in defaults.items() if item not in self._on_hand]
+            if missing:
+                self._append_locked(missing)
+
+
+# The same ledger in the SQLite backend: levels in `inventory`, open
+# reservations in `inventory_reservations`.  reserve() and commit() run in
+# BEGIN IMMEDIATE transactions, so the availability check and the write are
+# atomic across every connection and process using the database.  Expired
+# reservations follow the same rule as in the file ledger: they stop
+# counting and commit() raises ReservationExpired for them.
+class SqliteInventoryLedger:
+    def __init__(self, storage, reservation_ttl=900):
+        self.storage = storage
+        self.reservation_ttl = reservation_ttl
+
+    def _available(self, conn, now):
+        rows = conn.execute(
+            "SELECT item, on_hand - COALESCE((SELECT SUM(quantity) FROM inventory_reservations r "
+            "WHERE r.item = inventory.item AND r.expires > ?), 0) FROM inventory",
+            (now,),
+        ).fetchall()
+        return {item: _number(quantity) for item, quantity in rows}
+
+    def levels(self):
+        rows = self.storage._connect().execute("SELECT item, on_hand FROM inventory").fetchall()
+        return {item: _number(quantity) for item, quantity in rows}
+
+    def available(self):
+        return self._available(self.storage._connect(), time.time())
+
+    def reserve(self, quantities):
+        conn = self.storage._connect()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        with conn:
+            conn.execute("DELETE FROM inventory_reservations WHERE expires <= ?", (now,))
+            available = self._available(conn, now)
+            short = {item: available.get(item, 0) for item, quantity in quantities.items()
+                     if quantity > available.get(item, 0)}
+            if short:
+                raise OutOfStock(short)
+            reservation = uuid.uuid4().hex
+            conn.executemany(
+                "INSERT INTO inventory_reservations (reservation, item, quantity, expires) VALUES (?, ?, ?, ?)",
+                [(reservation, item, quantity, now + self.reservation_ttl) for item, quantity in quantities.items() if quantity],
+            )
+        return reservation
+
+    def commit(self, reservation):
+        conn = self.storage._connect()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        with conn:
+            held = conn.execute("SELECT COUNT(*) FROM inventory_reservations WHERE reservation = ? AND expires > ?",
+                                (reservation, now)).fetchone()[0]
+            if not held:
+                raise ReservationExpired(reservation)
+            conn.execute(
+                "UPDATE inventory SET on_hand = on_hand - (SELECT quantity FROM inventory_reservations r "
+                "WHERE r.reservation = ? AND r.item = inventory.item) "
+                "WHERE item IN (SELECT item FROM inventory_reservations WHERE reservation = ?)",
+                (reservation, reservation),
+            )
+            conn.execute("DELETE FROM inventory_reservations WHERE reservation = ?", (reservation,))
+
+    def release(self, reservation):
+        with self.storage._connect() as conn:
+            conn.execute("DELETE FROM inventory_reservations WHERE reservation = ?", (reservation,))
+
+    def restock(self, item, quantity):
+        with self.storage._connect() as conn:
+            conn.execute(
+                "INSERT INTO inventory (item, on_hand) VALUES (?, ?) "
+                "ON CONFLICT (item) DO UPDATE SET on_hand = on_hand + excluded.on_hand",
+                (item, quantity),
+            )
+
+    def stock_defaults(self, defaults):
+        with self.storage._connect() as conn:
+            conn.executemany("INSERT OR IGNORE INTO inventory (item, on_hand) VALUES (?, ?)", list(defaults.items()))
@@ -0,0 +1,242 @@
+import csv
+import hashlib
+import io
+import os
+from datetime import datetime
+
+import pandas as pd
+
+from brewmate.locking import file_lock
+
+ORDER_COLUMNS = ["customer_name", "coffee_type", "size", "add_ons", "price", "order_time"]
+
+
+# Field values of an order as they appear in order_history.csv
+def order_fields(order):
+    add_ons = order["add_ons"]
+    if not isinstance(add_ons, str):
+        add_ons = str(list(add_ons))
+    order_time = order["order_time"]
+    if isinstance(order_time, datetime):
+        # Always keep the microseconds so every row parses with the same format
+        order_time = order_time.isoformat(sep=" ", timespec="microseconds")
+    return [
+        order["customer_name"],
+        order["coffee_type"],
+        order["size"],
+        add_ons,
+        float(order["price"]),
+        str(order_time),
+    ]
+
+
+# Render an order the same way pandas.to_csv writes it, so journal rows can be
+# appended verbatim to order_history.csv during compaction
+def format_order_row(order):
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerow(order_fields(order))
+    return buffer.getvalue()
+
+
+# Keep only complete, well-formed lines; a crash mid-append can leave a torn
+# last line (or, after later appends, a torn line in the middle)
+def _complete_rows(data, columns):
+    text = data.decode("utf-8", errors="replace")
+    if not text.endswith("\n"):
+        text = text[:text.rfind("\n") + 1]
+    lines = []
+    for line in text.splitlines(keepends=True):
+        if not line.strip():
+            continue
+        row = next(csv.reader([line]), [])
+        if len(row) == len(columns):
+            lines.append(line)
+    return "".join(lines)
+
+
+def _read_bytes(path):
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        return b""
+
+
+# Identifies the first `size` bytes of an open file: its inode plus a hash of
+# the bytes just before `size`.  A file that was only appended to since keeps
+# the fingerprint; one that was replaced or rewritten does not.
+def file_fingerprint(f, size):
+    f.seek(max(0, size - 4096))
+    tail = f.read(min(size, 4096))
+    return {"inode": os.fstat(f.fileno()).st_ino, "size": size, "tail": hashlib.sha1(tail).hexdigest()}
+
+
+def _fsync_dir(path):
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+# Append-only journal in front of order_history.csv.
+#
+# Each order is written as one fsync'd CSV line to `<base>.journal`, so the
+# cost of placing an order does not depend on how many orders came before it.
+# Compaction seals the journal into a segment and appends that segment to the
+# base CSV, again without rewriting it.  A marker file holding the base size
+# makes the fold repeatable: after a crash the base is truncated back to the
+# marker and the segment is folded again.
+class OrderJournal:
+    def __init__(self, path, columns=ORDER_COLUMNS, compact_bytes=256 * 1024):
+        self.path = path
+        self.columns = list(columns)
+        self.compact_bytes = compact_bytes
+        self.journal_path = path + ".journal"
+        self.segment_path = path + ".journal.compacting"
+        self.marker_path = path + ".compact"
+        self.lock_path = path + ".lock"
+
+    # Durably record one order; returns once the line is on disk
+    def append(self, order):
+        line = format_order_row(order).encode("utf-8")
+        with file_lock(self.lock_path, exclusive=False):
+            fd = os.open(self.journal_path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                size = os.fstat(fd).st_size
+                if size:
+                    os.lseek(fd, size - 1, os.SEEK_SET)
+                    if os.read(fd, 1) != b"\n":
+                        line = b"\n" + line
+                os.write(fd, line)
+                os.fsync(fd)
+                size = os.fstat(fd).st_size
+            finally:
+                os.close(fd)
+        if self.compact_bytes and size >= self.compact_bytes:
+            self.compact()
+
+    # All orders, compacted and journaled, as a list of dicts (same shape as
+    # pd.read_csv(ORDER_HISTORY_FILE).to_dict(orient="records"))
+    def load(self):
+        return self.load_frame().to_dict(orient="records")
+
+    def load_frame(self):
+        self.recover()
+        with file_lock(self.lock_path, exclusive=False):
+            frames = []
+            if os.path.exists(self.path):
+                frames.append(pd.read_csv(self.path))
+            pending = _complete_rows(_read_bytes(self.journal_path), self.columns)
+            if pending:
+                header = ",".join(self.columns) + "\n"
+                frames.append(pd.read_csv(io.StringIO(header + pending)))
+        frames = [frame for frame in frames if not frame.empty]
+        if not frames:
+            return pd.DataFrame(columns=self.columns)
+        if len(frames) == 1:
+            return frames[0]
+        return pd.concat(frames, ignore_index=True)
+
+    # Orders added after `position` (returned by an earlier call) as a
+    # DataFrame, plus the new position and whether the whole history was read.
+    # The journal is folded first, so a position is an offset into the base
+    # CSV; if the base was rewritten since (remove_before), everything is read.
+    def load_since(self, position=None):
+        with file_lock(self.lock_path, exclusive=True):
+            self._compact_locked()
+            if not os.path.exists(self.path):
+                return pd.DataFrame(columns=self.columns), None, True
+            with open(self.path, "rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                full = position is None or position["size"] > size or file_fingerprint(f, position["size"]) != position
+                f.seek(0 if full else position["size"])
+                data = f.read(size - f.tell())
+                position = file_fingerprint(f, size)
+        if full:
+            frame = pd.read_csv(io.BytesIO(data)) if data.strip() else pd.DataFrame(columns=self.columns)
+        else:
+            rows = _complete_rows(data, self.columns)
+            header = ",".join(self.columns) + "\n"
+            frame = pd.read_csv(io.StringIO(header + rows)) if rows else pd.DataFrame(columns=self.columns)
+        return frame, position, full
+
+    # Fold the journal into the base CSV
+    def compact(self):
+        with file_lock(self.lock_path, exclusive=True):
+            self._compact_locked()
+
+    def _compact_locked(self):
+        self._recover_locked()
+        if not os.path.exists(self.journal_path) or os.path.getsize(self.journal_path) == 0:
+            return
+        os.replace(self.journal_path, self.segment_path)
+        _fsync_dir(self.segment_path)
+        self._fold_segment()
+
+    # Drop orders placed before `cutoff` (used once they are archived).  This is
+    # the one operation that rewrites the base CSV; it replaces it atomically.
+    def remove_before(self, cutoff):
+        with file_lock(self.lock_path, exclusive=True):
+            self._compact_locked()
+            if not os.path.exists(self.path):
+                return 0
+            orders_df = pd.read_csv(self.path, dtype={"order_time": str})
+            keep = pd.to_datetime(orders_df["order_time"], format="ISO8601") >= cutoff
+            tmp = self.path + ".tmp"
+            orders_df[keep].to_csv(tmp, index=False)
+            with open(tmp, "rb+") as f:
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+            _fsync_dir(self.path)
+            return int((~keep).sum())
+
+    # Finish a compaction interrupted by a crash, if any
+    def recover(self):
+        if os.path.exists(self.marker_path) or os.path.exists(self.segment_path):
+            with file_lock(self.lock_path, exclusive=True):
+                self._recover_locked()
+
+    def _recover_locked(self):
+        if os.path.exists(self.segment_path):
+            if os.path.exists(self.marker_path):
+                with open(self.marker_path) as f:
+                    base_size = int(f.read().strip() or 0)
+                with open(self.path, "r+b") as f:
+                    f.truncate(base_size)
+            self._fold_segment()
+        elif os.path.exists(self.marker_path):
+            os.remove(self.marker_path)
+
+    def _fold_segment(self):
+        if not os.path.exists(self.path):
+            with open(self.path, "w", newline="") as f:
+                f.write(",".join(self.columns) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+        base_size = os.path.getsize(self.path)
+
+        marker_tmp = self.marker_path + ".tmp"
+        with open(marker_tmp, "w") as f:
+            f.write(str(base_size))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(marker_tmp, self.marker_path)
+        _fsync_dir(self.marker_path)
+
+        rows = _complete_rows(_read_bytes(self.segment_path), self.columns).encode("utf-8")
+        with open(self.path, "r+b") as f:
+            if base_size:
+                f.seek(base_size - 1)
+                if f.read(1) != b"\n":
+                    rows = b"\n" + rows
+            f.seek(base_size)
+            f.write(rows)
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.remove(self.segment_path)
+        _fsync_dir(self.segment_path)
+        os.remove(self.marker_path)
@@ -0,0 +1,66 @@
+import heapq
+import threading
+
+from brewmate.menu import menu
+
+# Preparation time in seconds for each drink, plus extra time per size and add-on
+prep_seconds = {
+    "Americano": 60,
+    "Cappuccino": 150,
+    "Latte": 120,
+    "Caramel Macchiato": 180
+}
+
+size_prep_seconds = {
+    "Small": 0,
+    "Medium": 15,
+    "Large": 30
+}
+
+add_on_prep_seconds = {
+    "Extra sugar": 5,
+    "Milk": 20
+}
+
+DEFAULT_PREP_SECONDS = 120
+
+
+# Ready-time estimates for N parallel baristas.
+#
+# Orders are served first come, first served by whichever barista frees up
+# first.  The baristas are kept in a min-heap keyed on the time they become
+# free, so scheduling an order is one heap pop/push (O(log N)) and never
+# replays the rest of the queue.  `time_scale` shrinks every prep time, which
+# is handy for demos and load tests.
+class KitchenScheduler:
+    def __init__(self, baristas=2, time_scale=1.0, prep_times=None):
+        self.baristas = baristas
+        self.time_scale = time_scale
+        self.prep_times = dict(prep_seconds if prep_times is None else prep_times)
+        missing = set(menu) - set(self.prep_times)
+        for coffee_type in missing:
+            self.prep_times[coffee_type] = DEFAULT_PREP_SECONDS
+        self._free_at = [(0.0, barista) for barista in range(baristas)]
+        self._lock = threading.Lock()
+
+    # Seconds needed to make one drink
+    def prep_time(self, order):
+        seconds = self.prep_times.get(order["coffee_type"], DEFAULT_PREP_SECONDS)
+        seconds += size_prep_seconds.get(order["size"], 0)
+        seconds += sum(add_on_prep_seconds.get(add_on, 0) for add_on in order["add_ons"])
+        return seconds * self.time_scale
+
+    # Reserve the next free barista for `order`; returns (barista, start, ready) times
+    def schedule(self, order, now):
+        duration = self.prep_time(order)
+        with self._lock:
+            free_at, barista = heapq.heappop(self._free_at)
+            start = max(now, free_at)
+            ready = start + duration
+            heapq.heappush(self._free_at, (ready, barista))
+        return barista, start, ready
+
+    # Seconds until every barista is free again
+    def backlog(self, now):
+        with self._lock:
+            return max(0.0, max(free_at for free_at, _ in self._free_at) - now)
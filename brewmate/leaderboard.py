@@ -0,0 +1,82 @@
+import heapq
+from bisect import bisect_left
+
+
+# Customers with the most loyalty points, kept up to date one change at a time.
+#
+# `totals` is the caller's {customer: points} dict, read but never copied.
+# After changing a total the caller calls changed(), which pushes
+# (-points, customer) onto a heap; the entry it replaces stays behind and is
+# dropped when top() meets it (lazy deletion), so an update is O(log n) and
+# top(k) pops only about k entries plus the stale ones above them.  The heap
+# is rebuilt once stale entries outnumber live ones.
+class Leaderboard:
+    def __init__(self, totals):
+        self._points = totals
+        self.rebuild()
+
+    def rebuild(self):
+        self._heap = [(-points, customer) for customer, points in self._points.items()]
+        heapq.heapify(self._heap)
+
+    def __len__(self):
+        return len(self._points)
+
+    def changed(self, customer):
+        heapq.heappush(self._heap, (-self._points[customer], customer))
+        if len(self._heap) > 2 * len(self._points) + 1024:
+            self.rebuild()
+
+    # The k customers with the most points as [(customer, points)], ties by name
+    def top(self, k):
+        result, kept = [], []
+        while self._heap and len(result) < k:
+            entry = heapq.heappop(self._heap)
+            points, customer = -entry[0], entry[1]
+            if self._points.get(customer) != points or (result and result[-1][0] == customer):
+                continue  # stale (the customer has a newer entry) or a duplicate
+            result.append((customer, points))
+            kept.append(entry)
+        for entry in kept:
+            heapq.heappush(self._heap, entry)
+        return result
+
+
+# Case-insensitive prefix search over customer names.
+#
+# Names are kept sorted by their casefolded form in two parallel lists; a
+# search is a bisect to the first key at or after the prefix and a walk
+# while keys still match, so it touches only the names it returns.
+class CustomerIndex:
+    def __init__(self, names=()):
+        pairs = sorted((self._key(name), name) for name in names)
+        self._keys = [key for key, _ in pairs]
+        self._names = [name for _, name in pairs]
+
+    @staticmethod
+    def _key(name):
+        key = name.casefold()
+        return name if key == name else key  # share the string when it is already folded
+
+    def __len__(self):
+        return len(self._names)
+
+    def add(self, name):
+        key = self._key(name)
+        i = bisect_left(self._keys, key)
+        while i < len(self._keys) and self._keys[i] == key:
+            if self._names[i] == name:
+                return
+            i += 1
+        self._keys.insert(i, key)
+        self._names.insert(i, name)
+
+    # Up to `limit` names starting with `prefix` (ignoring case), in name order
+    def search(self, prefix, limit=20):
+        prefix = prefix.casefold()
+        i = bisect_left(self._keys, prefix)
+        found = []
+        while i < len(self._keys) and len(found) < limit and self._keys[i].startswith(prefix):
+            found.append(self._names[i])
+            i += 1
+        return found
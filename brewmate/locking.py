@@ -0,0 +1,81 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to an in-process lock only
+    fcntl = None
+
+# Without flock every lock degrades to one thread lock per lock file, which
+# still keeps the threads of a single server process apart
+_thread_locks = {}
+_thread_locks_guard = threading.Lock()
+
+# Lock file -> [acquisitions, contended acquisitions, seconds spent waiting,
+# longest wait], counted by file_lock since the last reset_lock_stats()
+lock_stats = {}
+_lock_stats_guard = threading.Lock()
+
+
+def _thread_lock(path):
+    with _thread_locks_guard:
+        lock = _thread_locks.get(path)
+        if lock is None:
+            lock = _thread_locks[path] = threading.RLock()
+        return lock
+
+
+def _count_acquisition(path, waited):
+    with _lock_stats_guard:
+        stats = lock_stats.get(path)
+        if stats is None:
+            stats = lock_stats[path] = [0, 0, 0.0, 0.0]
+        stats[0] += 1
+        if waited is not None:
+            stats[1] += 1
+            stats[2] += waited
+            stats[3] = max(stats[3], waited)
+
+
+def reset_lock_stats():
+    with _lock_stats_guard:
+        lock_stats.clear()
+
+
+# Hold an advisory lock on `path` for the duration of the block.
+# Shared locks let several writers append concurrently; exclusive locks are
+# used by maintenance steps such as compaction that move data between files.
+@contextmanager
+def file_lock(path, exclusive=True):
+    path = os.path.abspath(path)
+    if fcntl is None:
+        lock = _thread_lock(path)
+        waited = None
+        if not lock.acquire(blocking=False):
+            start = time.perf_counter()
+            lock.acquire()
+            waited = time.perf_counter() - start
+        _count_acquisition(path, waited)
+        try:
+            yield
+        finally:
+            lock.release()
+        return
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    mode = fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH
+    try:
+        # Try without blocking first, so waits behind another holder can be counted
+        try:
+            fcntl.flock(fd, mode | fcntl.LOCK_NB)
+            waited = None
+        except BlockingIOError:
+            start = time.perf_counter()
+            fcntl.flock(fd, mode)
+            waited = time.perf_counter() - start
+        _count_acquisition(path, waited)
+        yield
+    finally:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
@@ -0,0 +1,212 @@
+import csv
+import io
+import os
+import threading
+
+import pandas as pd
+
+from brewmate.journal import _complete_rows, _fsync_dir, file_fingerprint
+from brewmate.leaderboard import CustomerIndex, Leaderboard
+from brewmate.locking import file_lock
+
+LOYALTY_COLUMNS = ["Customer", "Points"]
+
+
+# Loyalty points in loyalty_points.csv, kept as an append-only list of deltas.
+#
+# Adding points appends one fsync'd "Customer,Points" row under an exclusive
+# flock; a customer's total is the sum of their rows.  Each process keeps the
+# totals in memory and, before answering, applies the rows other processes
+# appended since its last read, so the cost of an update does not depend on
+# the number of customers.  Once as many rows have been appended as there are
+# customers (at least `compact_rows`), the file is rewritten with one row per
+# customer, which keeps it in the original format and at most about twice
+# its compacted size; other processes see the new file and re-read it.
+#
+# top() and search() answer from a Leaderboard and a CustomerIndex over the
+# in-memory totals, built on first use and then updated with each delta.
+class FileLoyaltyLedger:
+    def __init__(self, path, compact_rows=1000):
+        self.path = path
+        self.lock_path = path + ".lock"
+        self.compact_rows = compact_rows
+        self.version = 0
+        self._lock = threading.Lock()
+        self._totals = {}
+        self._position = None
+        self._appended = 0  # rows added since the file was last compacted
+        self._leaderboard = None
+        self._customers = None
+
+    # Points added after `position` as {customer: points}, the new position,
+    # and whether the whole file was read (then the points are totals)
+    def load_since(self, position=None):
+        with file_lock(self.lock_path, exclusive=False):
+            return self._load_since_locked(position)
+
+    def _load_since_locked(self, position):
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            return {}, None, True
+        with f:
+            size = os.fstat(f.fileno()).st_size
+            full = position is None or position["size"] > size or file_fingerprint(f, position["size"]) != position
+            start = 0 if full else position["size"]
+            f.seek(start)
+            data = f.read(size - start)
+            data = data[:data.rfind(b"\n") + 1]
+            position = file_fingerprint(f, start + len(data))
+        if full:
+            loyalty_df = pd.read_csv(io.BytesIO(data), dtype={"Customer": object}) if data.strip() else None
+        else:
+            rows = _complete_rows(data, LOYALTY_COLUMNS)
+            loyalty_df = pd.read_csv(io.StringIO(",".join(LOYALTY_COLUMNS) + "\n" + rows), dtype={"Customer": object}) if rows else None
+        if loyalty_df is None or loyalty_df.empty:
+            return {}, position, full
+        points = loyalty_df.groupby("Customer", sort=False)["Points"].sum()
+        return dict(zip(points.index.tolist(), points.tolist())), position, full
+
+    # Start from totals read earlier (e.g. from a state snapshot) at `position`
+    def restore(self, totals, position):
+        with self._lock:
+            self._totals = totals
+            self._position = position
+            self._leaderboard = self._customers = None
+            self.version += 1
+
+    def _apply(self, points, position, full):
+        if full:
+            self._totals = points
+            self._appended = 0
+            self._leaderboard = self._customers = None
+        else:
+            for customer, delta in points.items():
+                self._credit(customer, delta)
+        if points or full:
+            self.version += 1
+        self._position = position
+
+    def _credit(self, customer, points):
+        if customer not in self._totals and self._customers is not None:
+            self._customers.add(customer)
+        total = self._totals[customer] = self._totals.get(customer, 0) + points
+        if self._leaderboard is not None:
+            self._leaderboard.changed(customer)
+        return total
+
+    def _sync(self, exclusive=False):
+        with file_lock(self.lock_path, exclusive=exclusive):
+            self._apply(*self._load_since_locked(self._position))
+
+    # Current totals as {customer: points} (a copy)
+    def totals(self):
+        with self._lock:
+            self._sync()
+            return dict(self._totals)
+
+    def get(self, customer):
+        with self._lock:
+            self._sync()
+            return self._totals.get(customer, 0)
+
+    # The k customers with the most points as [(customer, points)]
+    def top(self, k):
+        with self._lock:
+            self._sync()
+            if self._leaderboard is None:
+                self._leaderboard = Leaderboard(self._totals)
+            return self._leaderboard.top(k)
+
+    # Customers whose name starts with `prefix` (ignoring case) as [(customer, points)]
+    def search(self, prefix, limit=20):
+        with self._lock:
+            self._sync()
+            if self._customers is None:
+                self._customers = CustomerIndex(self._totals)
+            return [(customer, self._totals[customer]) for customer in self._customers.search(prefix, limit)]
+
+    # Add points for one customer and return their new total
+    def add(self, customer, points):
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator="\n").writerow([customer, int(points)])
+        with self._lock, file_lock(self.lock_path):
+            self._apply(*self._load_since_locked(self._position))
+            with open(self.path, "ab+") as f:
+                data = buffer.getvalue().encode("utf-8")
+                if f.tell() == 0:
+                    data = (",".join(LOYALTY_COLUMNS) + "\n").encode("utf-8") + data
+                else:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        data = b"\n" + data
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+                self._position = file_fingerprint(f, f.seek(0, os.SEEK_END))
+            total = self._credit(customer, int(points))
+            self._appended += 1
+            self.version += 1
+            if self._appended >= max(self.compact_rows, len(self._totals)):
+                self._compact_locked()
+            return total
+
+    # Rewrite the file with one row per customer
+    def _compact_locked(self):
+        tmp = self.path + ".tmp"
+        pd.DataFrame(list(self._totals.items()), columns=LOYALTY_COLUMNS).to_csv(tmp, index=False)
+        with open(tmp, "rb+") as f:
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        _fsync_dir(self.path)
+        with open(self.path, "rb") as f:
+            self._position = file_fingerprint(f, os.fstat(f.fileno()).st_size)
+        self._appended = 0
+
+
+# Loyalty points in the SQLite backend: one row per customer, updated with an
+# UPSERT, so every connection and process sees the same totals
+class SqliteLoyaltyLedger:
+    def __init__(self, storage):
+        self.storage = storage
+        self.version = 0
+
+    def load_since(self, position=None):
+        return self.totals(), None, True
+
+    def restore(self, totals, position):
+        self.version += 1
+
+    def totals(self):
+        rows = self.storage._connect().execute("SELECT customer, points FROM loyalty_points").fetchall()
+        return {row["customer"]: row["points"] for row in rows}
+
+    def get(self, customer):
+        row = self.storage._connect().execute("SELECT points FROM loyalty_points WHERE customer = ?", (customer,)).fetchone()
+        return row[0] if row else 0
+
+    def top(self, k):
+        rows = self.storage._connect().execute(
+            "SELECT customer, points FROM loyalty_points ORDER BY points DESC, customer LIMIT ?", (k,)
+        ).fetchall()
+        return [(row["customer"], row["points"]) for row in rows]
+
+    # Prefix LIKE on a NOCASE index is a range scan, not a table scan
+    def search(self, prefix, limit=20):
+        pattern = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        rows = self.storage._connect().execute(
+            "SELECT customer, points FROM loyalty_points WHERE customer LIKE ? ESCAPE '\\' "
+            "ORDER BY customer COLLATE NOCASE LIMIT ?", (pattern, limit)
+        ).fetchall()
+        return [(row["customer"], row["points"]) for row in rows]
+
+    def add(self, customer, points):
+        with self.storage._connect() as conn:
+            conn.execute(
+                "INSERT INTO loyalty_points (customer, points) VALUES (?, ?) "
+                "ON CONFLICT (customer) DO UPDATE SET points = points + excluded.points",
+                (customer, int(points)),
+            )
+            total = conn.execute("SELECT points FROM loyalty_points WHERE customer = ?", (customer,)).fetchone()[0]
+        self.version += 1
+        return total
@@ -0,0 +1,24 @@
+# Menu and pricing shared by the app and the kitchen/reporting modules
+menu = {
+    "Americano": 5.00,
+    "Cappuccino": 6.00,
+    "Latte": 6.50,
+    "Caramel Macchiato": 7.00
+}
+
+# Surcharges on top of the menu price
+size_prices = {
+    "Small": 0.00,
+    "Medium": 1.00,
+    "Large": 2.00
+}
+
+add_on_prices = {
+    "Extra sugar": 0.50,
+    "Milk": 0.75
+}
+
+
+# Total price of one drink
+def order_price(coffee_type, size, selected_add_ons):
+    return menu[coffee_type] + size_prices[size] + sum(add_on_prices[add_on] for add_on in selected_add_ons)
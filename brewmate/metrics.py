@@ -0,0 +1,251 @@
+import functools
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Upper bounds (seconds) of the latency histogram buckets; the last bucket is +Inf
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Collection is off unless BREWMATE_METRICS=1 (or an admin switches it on);
+# while it is off every timer and counter returns after one global check
+enabled = os.environ.get("BREWMATE_METRICS", "0") == "1"
+
+
+def enable(on=True):
+    global enabled
+    enabled = on
+
+
+# Latency histogram with fixed buckets, as Prometheus keeps them
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+
+    def observe(self, seconds):
+        i = 0
+        while i < len(BUCKETS) and seconds > BUCKETS[i]:
+            i += 1
+        self.counts[i] += 1
+        self.count += 1
+        self.sum += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    # Estimated q-quantile, interpolated inside the bucket that holds it
+    # (and kept within the smallest and largest values seen)
+    def quantile(self, q):
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = max(BUCKETS[i - 1] if i else 0.0, self.min)
+                upper = min(BUCKETS[i] if i < len(BUCKETS) else self.max, self.max)
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return self.max
+
+
+# Process-wide timers (histograms) and counters, keyed by metric name and labels
+class Registry:
+    def __init__(self):
+        self.timers = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name, seconds, labels=()):
+        key = (name, labels)
+        with self._lock:
+            histogram = self.timers.get(key)
+            if histogram is None:
+                histogram = self.timers[key] = Histogram()
+            histogram.observe(seconds)
+
+    def add(self, name, amount=1, labels=()):
+        key = (name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def reset(self):
+        with self._lock:
+            self.timers.clear()
+            self.counters.clear()
+
+    # One dict per timer: name, labels, count, total/mean/p50/p95/p99 in ms
+    def timer_rows(self):
+        with self._lock:
+            timers = [(name, labels, histogram.count, histogram.sum, [histogram.quantile(q) for q in (0.5, 0.95, 0.99)])
+                      for (name, labels), histogram in sorted(self.timers.items())]
+        return [{"Metric": name, "Labels": _label_text(labels), "Count": count, "Total (ms)": total * 1000,
+                 "Mean (ms)": total * 1000 / count, "p50 (ms)": p50 * 1000, "p95 (ms)": p95 * 1000,
+                 "p99 (ms)": p99 * 1000}
+                for name, labels, count, total, (p50, p95, p99) in timers]
+
+    def counter_rows(self):
+        with self._lock:
+            return [{"Metric": name, "Labels": _label_text(labels), "Value": value}
+                    for (name, labels), value in sorted(self.counters.items())]
+
+    # Everything in the Prometheus text exposition format
+    def prometheus_text(self):
+        lines = []
+        with self._lock:
+            timers = sorted((key, list(h.counts), h.count, h.sum) for key, h in self.timers.items())
+            counters = sorted(self.counters.items())
+        typed = set()
+        for (name, labels), counts, count, total in timers:
+            metric = f"brewmate_{name}_seconds"
+            if metric not in typed:
+                lines.append(f"# TYPE {metric} histogram")
+                typed.add(metric)
+            cumulative = 0
+            for bound, bucket in zip((*BUCKETS, "+Inf"), counts):
+                cumulative += bucket
+                lines.append(f"{metric}_bucket{_prometheus_labels(labels, le=bound)} {cumulative}")
+            lines.append(f"{metric}_sum{_prometheus_labels(labels)} {total}")
+            lines.append(f"{metric}_count{_prometheus_labels(labels)} {count}")
+        for (name, labels), value in counters:
+            metric = f"brewmate_{name}_total"
+            if metric not in typed:
+                lines.append(f"# TYPE {metric} counter")
+                typed.add(metric)
+            lines.append(f"{metric}{_prometheus_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _label_text(labels):
+    return ", ".join(f"{key}={value}" for key, value in labels)
+
+
+def _prometheus_labels(labels, **extra):
+    pairs = [*labels, *extra.items()]
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(pairs, escaped)) + "}"
+
+
+registry = Registry()
+
+
+class _Timer:
+    __slots__ = ("name", "labels", "start")
+
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        registry.observe(self.name, time.perf_counter() - self.start, self.labels)
+
+
+class _NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return None
+
+
+_NULL_TIMER = _NullTimer()
+
+
+# `with timer("persistence", call="save_order"):` records the block's duration
+def timer(name, **labels):
+    if not enabled:
+        return _NULL_TIMER
+    return _Timer(name, tuple(sorted(labels.items())))
+
+
+# Decorator form of timer(), for functions called on every rerun
+def timed(name, **labels):
+    labels = tuple(sorted(labels.items()))
+
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                registry.observe(name, time.perf_counter() - start, labels)
+        return wrapper
+    return decorate
+
+
+def count(name, amount=1, **labels):
+    if enabled:
+        registry.add(name, amount, tuple(sorted(labels.items())))
+
+
+# Consecutive sections of one script run: section("inventory") closes the
+# previous section and starts timing the next, and done() closes the last
+# one and records the whole run under `total`
+class Sections:
+    def __init__(self, name, total=None):
+        self.name = name
+        self.total = total
+        self.current = None
+        self.start = self.started = time.perf_counter()
+
+    def section(self, section):
+        if not enabled:
+            return
+        now = time.perf_counter()
+        if self.current is not None:
+            registry.observe(self.name, now - self.start, (("section", self.current),))
+        self.current, self.start = section, now
+
+    def done(self, **labels):
+        self.section(None)
+        if enabled and self.total is not None:
+            registry.observe(self.total, time.perf_counter() - self.started, tuple(sorted(labels.items())))
+
+
+_last_export = [0.0]
+
+
+# Write the Prometheus text to `path` (via a temp file), at most every `every` seconds
+def export_file(path, every=10.0):
+    if not enabled or time.monotonic() - _last_export[0] < every:
+        return
+    _last_export[0] = time.monotonic()
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        f.write(registry.prometheus_text())
+    os.replace(tmp, path)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = registry.prometheus_text().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+# Serve /metrics on `port` from a daemon thread; returns the server
+def serve(port, host="127.0.0.1"):
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="brewmate-metrics", daemon=True).start()
+    return server
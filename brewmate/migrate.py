@@ -0,0 +1,67 @@
+# Import the CSV data files into a SQLite database for the "sqlite" storage backend.
+#
+#   python -m brewmate.migrate                    # CSVs in the current directory -> brewmate.db
+#   python -m brewmate.migrate --db /data/brewmate.db --replace
+import argparse
+import os
+import sys
+
+import pandas as pd
+
+from brewmate.storage import CsvStorage, SqliteStorage
+
+
+def migrate(source, target, replace=False):
+    conn = target._connect()
+    if replace:
+        with conn:
+            for table in ("orders", "loyalty_points", "ratings", "users", "inventory", "inventory_reservations"):
+                conn.execute(f"DELETE FROM {table}")
+
+    orders = source.load_orders()
+    target.append_orders(orders)
+
+    with conn:
+        conn.executemany(
+            "INSERT INTO loyalty_points (customer, points) VALUES (?, ?) "
+            "ON CONFLICT (customer) DO UPDATE SET points = points + excluded.points",
+            [(customer, int(points)) for customer, points in source.load_loyalty_points().items()],
+        )
+        conn.executemany(
+            "INSERT INTO ratings (customer, rating, feedback) VALUES (?, ?, ?)",
+            [(r["Customer"], int(r["Rating"]), None if pd.isna(r["Feedback"]) else str(r["Feedback"]))
+             for r in source.load_ratings()],
+        )
+        conn.executemany(
+            "INSERT OR REPLACE INTO users (username, password) VALUES (?, ?)",
+            [(str(u), str(p)) for u, p in source.load_users()[["username", "password"]].itertuples(index=False)],
+        )
+        conn.executemany(
+            "INSERT OR REPLACE INTO inventory (item, on_hand) VALUES (?, ?)",
+            list(source.inventory.levels().items()),
+        )
+    return len(orders)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import BrewMate CSV files into SQLite")
+    parser.add_argument("--db", default="brewmate.db", help="SQLite database to create or extend")
+    parser.add_argument("--orders", default="order_history.csv")
+    parser.add_argument("--loyalty", default="loyalty_points.csv")
+    parser.add_argument("--ratings", default="ratings.csv")
+    parser.add_argument("--users", default="users.csv")
+    parser.add_argument("--inventory", default="inventory_ledger.csv")
+    parser.add_argument("--replace", action="store_true", help="empty the database tables before importing")
+    args = parser.parse_args()
+
+    if os.path.exists(args.db) and not args.replace:
+        target = SqliteStorage(args.db)
+        if target._connect().execute("SELECT COUNT(*) FROM orders").fetchone()[0]:
+            sys.exit(f"{args.db} already has orders; pass --replace to overwrite them")
+    source = CsvStorage(args.orders, args.loyalty, args.ratings, args.users, args.inventory)
+    count = migrate(source, SqliteStorage(args.db), replace=args.replace)
+    print(f"Imported {count} orders into {args.db}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+import threading
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from brewmate.journal import ORDER_COLUMNS
+from brewmate.menu import add_on_prices, menu, size_prices
+
+# Small categorical codes for the order fields.  Codes are positions in these
+# lists; coffee types and sizes seen in old data but no longer on the menu are
+# appended by the table that meets them, so existing codes never change.
+COFFEE_TYPES = list(menu)
+SIZES = list(size_prices)
+ADD_ONS = list(add_on_prices)  # bit i of the add-on mask is ADD_ONS[i]
+
+# order_time is stored as int64 microseconds since 1970-01-01 in the shop's
+# local wall-clock time (the CSV timestamps carry no timezone)
+EPOCH = datetime(1970, 1, 1)
+
+
+def to_epoch_us(order_time):
+    if not isinstance(order_time, datetime):
+        order_time = datetime.fromisoformat(str(order_time))
+    delta = order_time - EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def from_epoch_us(value):
+    return EPOCH + timedelta(microseconds=int(value))
+
+
+def add_on_mask(add_ons):
+    if isinstance(add_ons, str):
+        return sum(1 << bit for bit, add_on in enumerate(ADD_ONS) if repr(add_on) in add_ons)
+    return sum(1 << ADD_ONS.index(add_on) for add_on in add_ons)
+
+
+def add_on_names(mask):
+    return [add_on for bit, add_on in enumerate(ADD_ONS) if mask & (1 << bit)]
+
+
+# CSV text of every possible add-on mask, e.g. ADD_ON_LABELS[2] == "['Milk']"
+ADD_ON_LABELS = np.array([str(add_on_names(mask)) for mask in range(1 << len(ADD_ONS))], dtype=object)
+
+
+# Append-friendly columnar table of orders.
+#
+# Each field is a NumPy array (capacity doubles as it fills) and customer
+# names are dictionary-encoded, so a million orders take ~20 MB instead of
+# the ~600 MB of a list of dicts, and reports can work on whole columns.
+# Appends are serialized by a lock; readers get views of the filled part.
+class OrderTable:
+    FIELDS = {
+        "customer": np.int32,
+        "coffee": np.uint8,
+        "size": np.uint8,
+        "add_ons": np.uint8,
+        "price_cents": np.int32,
+        "order_time": np.int64,
+    }
+
+    def __init__(self, capacity=1024):
+        self._columns = {name: np.zeros(capacity, dtype) for name, dtype in self.FIELDS.items()}
+        self._size = 0
+        self.coffee_types = list(COFFEE_TYPES)
+        self.sizes = list(SIZES)
+        self.customers = []        # code -> name
+        self._customer_codes = {}  # name -> code
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._size
+
+    # Filled part of one column (a view; do not modify)
+    def column(self, name):
+        return self._columns[name][:self._size]
+
+    def _code(self, values, index, value):
+        code = index.get(value)
+        if code is None:
+            code = index[value] = len(values)
+            values.append(value)
+        return code
+
+    def _reserve(self, extra):
+        needed = self._size + extra
+        capacity = len(self._columns["order_time"])
+        if needed <= capacity:
+            return
+        capacity = max(capacity, 1024)
+        while capacity < needed:
+            capacity *= 2
+        for name, values in self._columns.items():
+            grown = np.zeros(capacity, values.dtype)
+            grown[:self._size] = values[:self._size]
+            self._columns[name] = grown
+
+    # Append one order given as a dict (CSV row shape or a freshly placed order)
+    def append(self, order):
+        with self._lock:
+            self._reserve(1)
+            i = self._size
+            columns = self._columns
+            columns["customer"][i] = self._code(self.customers, self._customer_codes, order["customer_name"])
+            columns["coffee"][i] = self._category(self.coffee_types, order["coffee_type"])
+            columns["size"][i] = self._category(self.sizes, order["size"])
+            columns["add_ons"][i] = add_on_mask(order["add_ons"])
+            columns["price_cents"][i] = round(float(order["price"]) * 100)
+            columns["order_time"][i] = to_epoch_us(order["order_time"])
+            self._size += 1
+
+    # Append every row of another OrderTable, remapping its dictionary codes
+    def extend(self, other):
+        n = len(other)
+        if not n:
+            return
+        with self._lock:
+            customer_map = np.array([self._code(self.customers, self._customer_codes, name) for name in other.customers],
+                                    dtype=np.int32)
+            coffee_map = np.array([self._category(self.coffee_types, value) for value in other.coffee_types], dtype=np.uint8)
+            size_map = np.array([self._category(self.sizes, value) for value in other.sizes], dtype=np.uint8)
+            self._reserve(n)
+            rows = slice(self._size, self._size + n)
+            columns = self._columns
+            columns["customer"][rows] = customer_map[other.column("customer")]
+            columns["coffee"][rows] = coffee_map[other.column("coffee")]
+            columns["size"][rows] = size_map[other.column("size")]
+            for name in ("add_ons", "price_cents", "order_time"):
+                columns[name][rows] = other.column(name)
+            self._size += n
+
+    # Dictionary code of a customer name, or None if the table has no orders from them
+    def customer_code(self, name):
+        return self._customer_codes.get(name)
+
+    def _category(self, values, value):
+        if value not in values:
+            values.append(value)
+        return values.index(value)
+
+    # Wrap existing column arrays (e.g. memory-mapped archive files) as a table
+    @classmethod
+    def from_columns(cls, columns, customers, coffee_types, sizes):
+        table = cls(capacity=0)
+        table._columns = dict(columns)
+        table._size = len(columns["order_time"])
+        table.customers = list(customers)
+        table._customer_codes = {name: code for code, name in enumerate(table.customers)}
+        table.coffee_types = list(coffee_types)
+        table.sizes = list(sizes)
+        return table
+
+    # Build a table from a DataFrame with the CSV columns, column at a time
+    @classmethod
+    def from_frame(cls, orders_df):
+        table = cls(capacity=max(1024, len(orders_df)))
+        n = len(orders_df)
+        if n == 0:
+            return table
+        columns = table._columns
+        customer_codes, customers = pd.factorize(orders_df["customer_name"].astype(str))
+        columns["customer"][:n] = customer_codes
+        table.customers = list(customers)
+        table._customer_codes = {name: code for code, name in enumerate(table.customers)}
+        for field, source, values in (("coffee", "coffee_type", table.coffee_types), ("size", "size", table.sizes)):
+            for value in pd.unique(orders_df[source]):
+                if value not in values:
+                    values.append(value)
+            columns[field][:n] = pd.Categorical(orders_df[source], categories=values).codes
+        add_ons = orders_df["add_ons"].astype(str)
+        mask = np.zeros(n, np.uint8)
+        for bit, add_on in enumerate(ADD_ONS):
+            mask |= add_ons.str.contains(repr(add_on), regex=False).to_numpy(np.uint8) << bit
+        columns["add_ons"][:n] = mask
+        columns["price_cents"][:n] = np.round(orders_df["price"].to_numpy(float) * 100)
+        order_time = pd.to_datetime(orders_df["order_time"], format="ISO8601")
+        columns["order_time"][:n] = order_time.to_numpy("datetime64[us]").astype(np.int64)
+        table._size = n
+        return table
+
+    # Rows [start:stop] as a DataFrame with the CSV columns; order_time is a
+    # datetime column and coffee_type/size are categoricals
+    def to_frame(self, start=0, stop=None):
+        return self._frame(slice(start, self._size if stop is None else min(stop, self._size)))
+
+    # The rows at the given positions (an integer array) as {CSV column: array},
+    # for gathering a few rows from several tables into one DataFrame
+    def values(self, rows):
+        columns = self._columns
+        rows = np.asarray(rows, dtype=np.intp)
+        return {
+            "customer_name": self._customer_names(rows),
+            "coffee_type": np.asarray(self.coffee_types, dtype=object)[columns["coffee"][rows]],
+            "size": np.asarray(self.sizes, dtype=object)[columns["size"][rows]],
+            "add_ons": ADD_ON_LABELS[columns["add_ons"][rows]],
+            "price": columns["price_cents"][rows] / 100,
+            "order_time": columns["order_time"][rows].astype("datetime64[us]"),
+        }
+
+    def _customer_names(self, rows):
+        codes = self._columns["customer"][rows]
+        if len(codes) < len(self.customers):  # a few rows: look names up instead of converting the whole dictionary
+            return np.array([self.customers[code] for code in codes.tolist()], dtype=object)
+        return np.asarray(self.customers, dtype=object)[codes]
+
+    def _frame(self, rows):
+        columns = self._columns
+        return pd.DataFrame({
+            "customer_name": self._customer_names(rows),
+            "coffee_type": pd.Categorical.from_codes(columns["coffee"][rows], self.coffee_types),
+            "size": pd.Categorical.from_codes(columns["size"][rows], self.sizes),
+            "add_ons": ADD_ON_LABELS[columns["add_ons"][rows]],
+            "price": columns["price_cents"][rows] / 100,
+            "order_time": columns["order_time"][rows].astype("datetime64[us]"),
+        }, columns=ORDER_COLUMNS)
+
+    # Rows as dicts in the CSV row shape
+    def to_dicts(self, start=0, stop=None):
+        return self.to_frame(start, stop).assign(
+            order_time=lambda df: df["order_time"].astype(str)
+        ).to_dict(orient="records")
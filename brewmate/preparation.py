@@ -0,0 +1,120 @@
+import collections
+import itertools
+import queue
+import threading
+import time
+
+from brewmate.kitchen import KitchenScheduler
+
+QUEUED = "queued"
+PREPARING = "preparing"
+READY = "ready"
+
+
+# Background order preparation.
+#
+# Confirmed orders are planned by the KitchenScheduler and handed to the
+# worker thread of the barista it picked, so each order moves through
+# queued -> preparing -> ready at the times that were estimated for it.  The
+# Streamlit script thread returns as soon as the order is placed and the
+# customer page only polls status().  Finished orders are forgotten after
+# `retain_seconds`.
+class PreparationQueue:
+    def __init__(self, scheduler=None, retain_seconds=3600, throughput_window=3600):
+        self.scheduler = scheduler or KitchenScheduler()
+        self.retain_seconds = retain_seconds
+        self.throughput_window = throughput_window
+        self._queues = [queue.Queue() for _ in range(self.scheduler.baristas)]
+        self._jobs = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._counts = {QUEUED: 0, PREPARING: 0, READY: 0}
+        self._recent = collections.deque()  # (ready_at, wait_seconds) of finished orders
+        self._threads = [
+            threading.Thread(target=self._work, args=(barista,), name=f"barista-{barista}", daemon=True)
+            for barista in range(self.scheduler.baristas)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    # Queue an order for preparation and return its order id
+    def submit(self, order):
+        now = time.time()
+        barista, start, ready = self.scheduler.schedule(order, now)
+        with self._lock:
+            order_id = next(self._ids)
+            self._jobs[order_id] = {
+                "order_id": order_id,
+                "order": order,
+                "status": QUEUED,
+                "barista": barista,
+                "queued_at": now,
+                "estimated_start": start,
+                "estimated_ready": ready,
+                "started_at": None,
+                "ready_at": None,
+            }
+            self._counts[QUEUED] += 1
+            self._forget_finished(now)
+        self._queues[barista].put(order_id)
+        return order_id
+
+    # Copy of the job record for `order_id`, or None if unknown or expired
+    def status(self, order_id):
+        with self._lock:
+            job = self._jobs.get(order_id)
+            return dict(job) if job else None
+
+    # Number of orders waiting for a barista
+    def depth(self):
+        return self._counts[QUEUED]
+
+    # Queue depth and throughput figures for the Admin Panel
+    def metrics(self):
+        now = time.time()
+        with self._lock:
+            self._trim_recent(now)
+            waits = [wait for _, wait in self._recent]
+            return {
+                "baristas": self.scheduler.baristas,
+                "queued": self._counts[QUEUED],
+                "preparing": self._counts[PREPARING],
+                "completed": self._counts[READY],
+                "throughput_per_hour": len(self._recent) * 3600 / self.throughput_window,
+                "avg_wait_seconds": sum(waits) / len(waits) if waits else 0.0,
+                "backlog_seconds": self.scheduler.backlog(now),
+            }
+
+    def _trim_recent(self, now):
+        while self._recent and now - self._recent[0][0] > self.throughput_window:
+            self._recent.popleft()
+
+    def _forget_finished(self, now):
+        expired = [
+            order_id for order_id, job in self._jobs.items()
+            if job["status"] == READY and now - job["ready_at"] > self.retain_seconds
+        ]
+        for order_id in expired:
+            del self._jobs[order_id]
+
+    def _set_status(self, job, status, timestamp_field):
+        now = time.time()
+        with self._lock:
+            self._counts[job["status"]] -= 1
+            self._counts[status] += 1
+            job["status"] = status
+            job[timestamp_field] = now
+            if status == READY:
+                self._recent.append((now, job["started_at"] - job["queued_at"]))
+                self._trim_recent(now)
+
+    # Each barista works through the orders the scheduler assigned to them, in order
+    def _work(self, barista):
+        orders = self._queues[barista]
+        while True:
+            job = self._jobs[orders.get()]
+            time.sleep(max(0.0, job["estimated_start"] - time.time()))
+            self._set_status(job, PREPARING, "started_at")
+            time.sleep(max(0.0, job["estimated_ready"] - time.time()))
+            self._set_status(job, READY, "ready_at")
+            orders.task_done()
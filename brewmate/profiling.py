@@ -0,0 +1,214 @@
+import atexit
+import cProfile
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+from collections import Counter
+
+# "off", "cprofile" (every call, written as pstats .prof files) or "sample"
+# (the script thread's stack every INTERVAL seconds, written as collapsed
+# stacks for flamegraph.pl, speedscope or inferno)
+MODES = ("off", "cprofile", "sample")
+mode = "off"
+DIRECTORY = os.environ.get("BREWMATE_PROFILE_DIR", "profiles")
+INTERVAL = float(os.environ.get("BREWMATE_PROFILE_INTERVAL", "0.005"))
+# A page's files are rewritten at most this often (and once more at exit)
+WRITE_EVERY = 10.0
+
+# Script thread id -> capture of the rerun running on it
+_active = {}
+# Page -> PageProfile, everything captured since the last reset()
+pages = {}
+_lock = threading.Lock()
+_sampler = None
+_labels = {}
+
+
+def set_mode(new_mode):
+    global mode
+    if new_mode not in MODES:
+        raise ValueError(f"unknown profiling mode {new_mode!r}, expected one of {', '.join(MODES)}")
+    mode = new_mode
+    if mode == "sample":
+        _start_sampler()
+
+
+# What the reruns of one page have cost so far
+class PageProfile:
+    def __init__(self, page):
+        self.page = page
+        self.reruns = 0
+        self.seconds = 0.0
+        self.stacks = Counter()
+        self.stats = None
+        self.written = 0.0
+
+    def file_stem(self):
+        return os.path.join(DIRECTORY, f"{re.sub(r'[^a-z0-9]+', '_', self.page.lower()).strip('_')}.{os.getpid()}")
+
+    def write(self):
+        os.makedirs(DIRECTORY, exist_ok=True)
+        stem = self.file_stem()
+        if self.stacks:
+            with open(stem + ".collapsed.tmp", "w") as f:
+                for stack, count in sorted(self.stacks.items()):
+                    f.write(f"{stack} {count}\n")
+            os.replace(stem + ".collapsed.tmp", stem + ".collapsed")
+        if self.stats is not None:
+            self.stats.dump_stats(stem + ".prof.tmp")
+            os.replace(stem + ".prof.tmp", stem + ".prof")
+        self.written = time.monotonic()
+
+
+class _Capture:
+    def __init__(self, thread_id, script):
+        self.thread_id = thread_id
+        self.script = script
+        self.mode = mode
+        self.page = None
+        self.samples = Counter()
+        self.profile = None
+        self.started = time.perf_counter()
+        if self.mode == "cprofile":
+            self.profile = cProfile.Profile()
+            try:
+                self.profile.enable()
+            except ValueError:  # Python 3.12+ allows one cProfile per process; this run goes unprofiled
+                self.profile = None
+
+
+# Start profiling the rest of this script run (the caller's frame is the root
+# of the sampled stacks).  A capture left open by a run that never reached
+# finish() -- st.rerun(), an exception -- is closed first.
+def start():
+    if mode == "off" and not _active:
+        return
+    thread_id = threading.get_ident()
+    live = sys._current_frames()
+    with _lock:
+        leftovers = [capture for ident, capture in _active.items() if ident == thread_id or ident not in live]
+        for capture in leftovers:
+            del _active[capture.thread_id]
+    for capture in leftovers:
+        _record(capture)
+    if mode == "off":
+        return
+    capture = _Capture(thread_id, sys._getframe(1).f_code.co_filename)
+    with _lock:
+        _active[thread_id] = capture
+
+
+# Name the page this run is showing; its profile is filed under it
+def tag(page):
+    capture = _active.get(threading.get_ident())
+    if capture is not None:
+        capture.page = page
+
+
+def finish():
+    with _lock:
+        capture = _active.pop(threading.get_ident(), None)
+    if capture is not None:
+        _record(capture)
+
+
+def _record(capture):
+    seconds = time.perf_counter() - capture.started
+    stats = None
+    if capture.profile is not None:
+        capture.profile.disable()
+        stats = pstats.Stats(capture.profile)
+    page = capture.page or "unknown"
+    with _lock:
+        profile = pages.get(page)
+        if profile is None:
+            profile = pages[page] = PageProfile(page)
+        profile.reruns += 1
+        profile.seconds += seconds
+        profile.stacks.update(capture.samples)
+        if stats is not None:
+            if profile.stats is None:
+                profile.stats = stats
+            else:
+                profile.stats.add(stats)
+        if time.monotonic() - profile.written >= WRITE_EVERY:
+            profile.write()
+
+
+def write_all():
+    with _lock:
+        for profile in pages.values():
+            profile.write()
+
+
+atexit.register(write_all)
+
+
+def reset():
+    with _lock:
+        pages.clear()
+
+
+# One dict per profiled page, for the admin Performance page
+def summary_rows():
+    with _lock:
+        return [{"Page": profile.page, "Reruns": profile.reruns, "Seconds": profile.seconds,
+                 "Samples": sum(profile.stacks.values()),
+                 "Calls": profile.stats.total_calls if profile.stats is not None else 0,
+                 "Files": profile.file_stem() + ".*"}
+                for profile in sorted(pages.values(), key=lambda profile: -profile.seconds)]
+
+
+def _label(code):
+    label = _labels.get(code)
+    if label is None:
+        filename = code.co_filename
+        if "site-packages" in filename:
+            filename = filename.split("site-packages" + os.sep, 1)[-1]
+        elif os.path.basename(filename) == "__init__.py":
+            filename = os.path.join(os.path.basename(os.path.dirname(filename)), "__init__.py")
+        else:
+            filename = os.path.basename(filename)
+        label = _labels[code] = f"{getattr(code, 'co_qualname', code.co_name)} ({filename}:{code.co_firstlineno})"
+    return label
+
+
+# The stack of `frame` in collapsed form, outermost first, starting at the
+# script's module frame (Streamlit's runner frames below it are dropped)
+def _collapse(frame, script):
+    labels = []
+    while frame is not None:
+        code = frame.f_code
+        labels.append(_label(code))
+        if code.co_name == "<module>" and code.co_filename == script:
+            break
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+def _sample_forever():
+    while True:
+        time.sleep(INTERVAL)
+        with _lock:
+            captures = [capture for capture in _active.values() if capture.mode == "sample"]
+        if not captures:
+            continue
+        frames = sys._current_frames()
+        for capture in captures:
+            frame = frames.get(capture.thread_id)
+            if frame is not None:
+                capture.samples[_collapse(frame, capture.script)] += 1
+
+
+def _start_sampler():
+    global _sampler
+    with _lock:
+        if _sampler is None:
+            _sampler = threading.Thread(target=_sample_forever, name="brewmate-profiler", daemon=True)
+            _sampler.start()
+
+
+set_mode(os.environ.get("BREWMATE_PROFILE", "off"))
@@ -0,0 +1,89 @@
+import numpy as np
+
+from brewmate.orders import ADD_ONS, COFFEE_TYPES, SIZES, add_on_mask
+
+# Ingredients used by one Small drink, in the inventory's units
+# (coffee_beans and sugar in grams, milk in ml, cups as a count)
+drink_ingredients = {
+    "Americano": {"coffee_beans": 10, "cups": 1},
+    "Cappuccino": {"coffee_beans": 10, "milk": 60, "cups": 1},
+    "Latte": {"coffee_beans": 10, "milk": 100, "cups": 1},
+    "Caramel Macchiato": {"coffee_beans": 10, "milk": 80, "sugar": 10, "cups": 1}
+}
+
+# Larger sizes scale every ingredient except the cup
+size_scale = {
+    "Small": 1.0,
+    "Medium": 1.25,
+    "Large": 1.5
+}
+
+UNSCALED_INGREDIENTS = {"cups"}
+
+add_on_ingredients = {
+    "Extra sugar": {"sugar": 5},
+    "Milk": {"milk": 30}
+}
+
+
+# Bill of materials for every drink the menu can produce.
+#
+# Each (coffee type, size, add-on mask) combination is worked out once into
+# `matrix`, one row per combination and one column per ingredient, indexed by
+# the same codes the OrderTable stores.  Looking up an order's ingredients is
+# then a dict hit, and the consumption of a whole table of orders is one
+# bincount over the combination codes times the matrix.
+class RecipeBook:
+    def __init__(self, drinks=None, sizes=None, add_ons=None):
+        self.drinks = dict(drink_ingredients if drinks is None else drinks)
+        self.sizes = dict(size_scale if sizes is None else sizes)
+        self.add_ons = dict(add_on_ingredients if add_ons is None else add_ons)
+        self.coffee_types = list(COFFEE_TYPES) + [name for name in self.drinks if name not in COFFEE_TYPES]
+        self.size_names = list(SIZES) + [name for name in self.sizes if name not in SIZES]
+        names = [*self.drinks.values(), *self.add_ons.values()]
+        self.ingredients = list(dict.fromkeys(item for recipe in names for item in recipe))
+        self.masks = 1 << len(ADD_ONS)
+        self.matrix = np.zeros((len(self.coffee_types) * len(self.size_names) * self.masks, len(self.ingredients)))
+        self._lookup = {}
+        for coffee, coffee_type in enumerate(self.coffee_types):
+            for size, size_name in enumerate(self.size_names):
+                for mask in range(self.masks):
+                    quantities = self._build(coffee_type, size_name, mask)
+                    self.matrix[self.combo(coffee, size, mask)] = [quantities.get(item, 0) for item in self.ingredients]
+                    self._lookup[(coffee_type, size_name, mask)] = quantities
+
+    def combo(self, coffee, size, mask):
+        return (coffee * len(self.size_names) + size) * self.masks + mask
+
+    def _build(self, coffee_type, size_name, mask):
+        scale = self.sizes.get(size_name, 1.0)
+        quantities = {}
+        for item, quantity in self.drinks.get(coffee_type, {}).items():
+            quantities[item] = quantity if item in UNSCALED_INGREDIENTS else quantity * scale
+        for bit, add_on in enumerate(ADD_ONS):
+            if mask & (1 << bit):
+                for item, quantity in self.add_ons.get(add_on, {}).items():
+                    quantities[item] = quantities.get(item, 0) + quantity
+        return {item: int(quantity) if float(quantity).is_integer() else quantity
+                for item, quantity in quantities.items()}
+
+    # Ingredients for one drink as {item: quantity}; drinks without a recipe use nothing
+    def ingredients_for(self, coffee_type, size, add_ons):
+        return self._lookup.get((coffee_type, size, add_on_mask(add_ons)), {})
+
+    # Combination code of every order in an OrderTable (-1 for drinks without a recipe)
+    def combo_codes(self, table):
+        coffee_map = np.array([self.coffee_types.index(name) if name in self.drinks else -1
+                               for name in table.coffee_types], dtype=np.int64)
+        size_map = np.array([self.size_names.index(name) if name in self.size_names else 0
+                             for name in table.sizes], dtype=np.int64)
+        coffee = coffee_map[table.column("coffee")]
+        codes = self.combo(coffee, size_map[table.column("size")], table.column("add_ons").astype(np.int64))
+        codes[coffee < 0] = -1
+        return codes
+
+    # Ingredients used by every order in an OrderTable, in one vectorized pass
+    def consumption(self, table):
+        codes = self.combo_codes(table)
+        counts = np.bincount(codes[codes >= 0], minlength=len(self.matrix))
+        return dict(zip(self.ingredients, (counts @ self.matrix).tolist()))
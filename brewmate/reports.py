@@ -0,0 +1,237 @@
+import hashlib
+import json
+import multiprocessing
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from brewmate.archive import OrderArchive, next_month
+from brewmate.export import SalesSummary, export_xlsx, order_chunks
+from brewmate.orders import OrderTable, to_epoch_us
+from brewmate.storage import RATING_COLUMNS, open_storage
+
+# Bump when a builder's output changes, so artifacts cached by older code are not served
+REPORT_FORMAT = 1
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+# Order tables covering start..end as (OrderTable, time_sorted), read by a
+# worker process straight from the archive and the storage backend.  The
+# read never compacts the order journal: a report must not rewrite the app's
+# files, nor change the dataset token its own cache entry is keyed by.
+def _load_parts(storage, archive_dir, start, end):
+    archive = OrderArchive(archive_dir)
+    parts = []
+    for month in archive.months():
+        first = datetime.strptime(month, "%Y-%m")
+        if (end is None or first < end) and (start is None or next_month(first) > start):
+            parts.append((archive.partition(month), True))
+    hot = OrderTable.from_frame(storage.load_orders_frame())
+    parts.append((hot, bool(np.all(np.diff(hot.column("order_time")) >= 0))))
+    return parts
+
+
+def build_sales_workbook(storage, archive_dir, params, f):
+    parts = _load_parts(storage, archive_dir, params["start"], params["end"])
+    with export_xlsx(parts, params["start"], params["end"]) as workbook:
+        shutil.copyfileobj(workbook, f)
+
+
+def build_sales_chart(storage, archive_dir, params, f):
+    import matplotlib  # only worker processes draw charts
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    summary = SalesSummary()
+    for chunk in order_chunks(_load_parts(storage, archive_dir, params["start"], params["end"]),
+                              params["start"], params["end"]):
+        summary.add(chunk)
+    by_day, by_coffee = summary.by_day(), summary.by_coffee()
+    fig, (daily, coffee) = plt.subplots(2, 1, figsize=(10, 8))
+    daily.bar(pd.to_datetime(by_day["Date"]), by_day["Revenue"], color="#6f4e37")
+    daily.set_title("Revenue per Day")
+    daily.set_ylabel("Revenue ($)")
+    coffee.barh(by_coffee["Coffee Type"], by_coffee["Revenue"], color="#c69c6d")
+    coffee.invert_yaxis()
+    coffee.set_title("Revenue by Coffee Type")
+    coffee.set_xlabel("Revenue ($)")
+    fig.tight_layout()
+    fig.savefig(f, format="png", dpi=100)
+    plt.close(fig)
+
+
+def build_ratings_summary(storage, archive_dir, params, f):
+    from openpyxl import Workbook  # only worker processes write workbooks
+    from openpyxl.chart import BarChart, Reference
+
+    ratings = pd.DataFrame(storage.load_ratings(), columns=RATING_COLUMNS)
+    counts = ratings["Rating"].value_counts().reindex(range(1, 6), fill_value=0)
+    workbook = Workbook(write_only=True)
+    summary_sheet = workbook.create_sheet("Summary")
+    summary_sheet.append(["Rating", "Count", "Share"])
+    for rating, count in counts.items():
+        summary_sheet.append([rating, int(count), round(count / max(1, len(ratings)), 4)])
+    summary_sheet.append([])
+    summary_sheet.append(["Ratings", len(ratings)])
+    summary_sheet.append(["Average", round(float(ratings["Rating"].mean()), 2) if len(ratings) else None])
+    chart = BarChart()
+    chart.title = "Ratings"
+    chart.add_data(Reference(summary_sheet, min_col=2, min_row=1, max_row=6), titles_from_data=True)
+    chart.set_categories(Reference(summary_sheet, min_col=1, min_row=2, max_row=6))
+    summary_sheet.add_chart(chart, "E2")
+    ratings_sheet = workbook.create_sheet("Ratings")
+    ratings_sheet.append(RATING_COLUMNS)
+    for row in ratings.itertuples(index=False, name=None):
+        ratings_sheet.append([None if pd.isna(value) else value for value in row])
+    workbook.save(f)
+
+
+# Available reports: title, file suffix, the datasets they read (these make
+# up the cache key) and whether they take a start/end date range
+REPORTS = {
+    "sales_workbook": {"title": "Sales Workbook (Excel)", "suffix": ".xlsx", "datasets": ("orders",),
+                       "dated": True, "build": build_sales_workbook},
+    "sales_chart": {"title": "Sales Charts (PNG)", "suffix": ".png", "datasets": ("orders",),
+                    "dated": True, "build": build_sales_chart},
+    "ratings_summary": {"title": "Ratings Summary (Excel)", "suffix": ".xlsx", "datasets": ("ratings",),
+                        "dated": False, "build": build_ratings_summary},
+}
+
+_worker_storages = {}
+
+
+# Build one report in a worker process and move it into place at `path`
+def run_report(storage_args, archive_dir, report, params, path):
+    storage = _worker_storages.get(storage_args)
+    if storage is None:
+        storage = _worker_storages[storage_args] = open_storage(*storage_args)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            REPORTS[report]["build"](storage, archive_dir, params, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return path
+
+
+# Report builds on a pool of worker processes, with finished files cached on disk.
+#
+# A report is identified by its parameters and the version of the data it
+# reads: the archive months in its date range (their metadata) plus the
+# storage token of the hot orders if the range reaches them, or the ratings
+# token.  Asking again for a report whose data has not changed returns the
+# cached file at once; a change in the data gives a new key and a new build.
+# The pool is started on the first build, uses the "spawn" start method (the
+# Streamlit server is multi-threaded) and by default half the cores, so the
+# script threads keep the rest.  Only the newest `max_artifacts` files are kept.
+class ReportJobs:
+    def __init__(self, store, directory, storage_args, archive_dir, workers=None, max_artifacts=100):
+        self.store = store
+        self.directory = directory
+        self.storage_args = tuple(storage_args)
+        self.archive_dir = archive_dir
+        self.workers = workers or max(1, (os.cpu_count() or 2) // 2)
+        self.max_artifacts = max_artifacts
+        self._executor = None
+        self._jobs = {}  # job id -> {"report", "params", "path", "future", "submitted"}
+        self._lock = threading.Lock()
+
+    def _pool(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._executor
+
+    # Data versions the report depends on
+    def data_token(self, report, params):
+        token = {}
+        if "orders" in REPORTS[report]["datasets"]:
+            start, end = params.get("start"), params.get("end")
+            archive = self.store.archive
+            if archive is not None:
+                token["archive"] = []
+                for month in archive.months():
+                    first = datetime.strptime(month, "%Y-%m")
+                    if (end is None or first < end) and (start is None or next_month(first) > start):
+                        meta = archive.meta(month)
+                        token["archive"].append([month, meta["count"], meta["last_order_time"]])
+            hot_time = self.store.orders.column("order_time")
+            if len(hot_time) == 0 or end is None or to_epoch_us(end) > int(hot_time.min()):
+                token["orders"] = self.store.storage.dataset_token("orders")
+        if "ratings" in REPORTS[report]["datasets"]:
+            token["ratings"] = self.store.storage.dataset_token("ratings")
+        return token
+
+    def cache_key(self, report, params):
+        key = json.dumps({"report": report, "params": params, "data": self.data_token(report, params),
+                          "format": REPORT_FORMAT}, sort_keys=True, default=str)
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+
+    # Start building a report (unless it is cached or already being built) and return its job id
+    def submit(self, report, **params):
+        job_id = self.cache_key(report, params)
+        path = os.path.join(self.directory, f"{report}-{job_id}{REPORTS[report]['suffix']}")
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and self._state(job) in (QUEUED, RUNNING, DONE):
+                return job_id
+            job = {"report": report, "params": params, "path": path, "future": None, "submitted": time.time()}
+            if os.path.exists(path):
+                os.utime(path)  # recently used: keep it through pruning
+            else:
+                os.makedirs(self.directory, exist_ok=True)
+                self._prune()
+                job["future"] = self._pool().submit(run_report, self.storage_args, self.archive_dir, report, params, path)
+            self._jobs[job_id] = job
+        return job_id
+
+    def _state(self, job):
+        future = job["future"]
+        if future is None or (future.done() and future.exception() is None):
+            return DONE if os.path.exists(job["path"]) else FAILED
+        if future.done():
+            return FAILED
+        return RUNNING if future.running() else QUEUED
+
+    # {"report", "params", "status", "path", "error", "seconds"} for a job id, or None
+    def status(self, job_id):
+        job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        state = self._state(job)
+        error = None
+        if state == FAILED:
+            future = job["future"]
+            error = str(future.exception()) if future is not None and future.exception() else "report file was removed"
+        return {"report": job["report"], "params": job["params"], "status": state, "path": job["path"],
+                "error": error, "seconds": time.time() - job["submitted"]}
+
+    # The finished report's bytes
+    def read(self, job_id):
+        with open(self._jobs[job_id]["path"], "rb") as f:
+            return f.read()
+
+    # Delete all but the newest max_artifacts reports
+    def _prune(self):
+        paths = [os.path.join(self.directory, name) for name in os.listdir(self.directory) if not name.endswith(".tmp")]
+        if len(paths) < self.max_artifacts:
+            return
+        paths.sort(key=os.path.getmtime, reverse=True)
+        for path in paths[self.max_artifacts - 1:]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
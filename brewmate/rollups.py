@@ -0,0 +1,158 @@
+import threading
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from brewmate.orders import EPOCH, to_epoch_us
+
+
+# Bucket widths in microseconds.  Order timestamps are wall-clock
+# microseconds, so integer division gives local minute/hour/day buckets.
+BUCKET_WIDTHS = {"minute": 60_000_000, "hour": 3_600_000_000, "day": 86_400_000_000}
+
+
+# Revenue and order counts of an OrderTable per minute, hour, day and coffee
+# type, as plain arrays (this is also what the order archive stores per partition)
+def summarize_table(table):
+    order_time = table.column("order_time")
+    price = table.column("price_cents") / 100
+    summary = {}
+    for level, width in BUCKET_WIDTHS.items():
+        keys, inverse = np.unique(order_time // width, return_inverse=True)
+        summary[f"{level}_keys"] = keys
+        summary[f"{level}_revenue"] = np.bincount(inverse, weights=price, minlength=len(keys))
+        summary[f"{level}_count"] = np.bincount(inverse, minlength=len(keys))
+    coffee = table.column("coffee")
+    count = np.bincount(coffee, minlength=len(table.coffee_types))
+    present = np.flatnonzero(count)
+    summary["coffee_types"] = np.array(table.coffee_types, dtype=object)[present].astype(str)
+    summary["coffee_revenue"] = np.bincount(coffee, weights=price, minlength=len(table.coffee_types))[present]
+    summary["coffee_count"] = count[present]
+    return summary
+
+
+# Pre-aggregated sales figures for the Admin Panel.
+#
+# Revenue and order counts are bucketed per hour and per day (keyed on the
+# naive local datetime of the bucket start), and totalled per coffee type.
+# Per-minute buckets are kept for the last `minute_retention` only, so the
+# start of a recent window is resolved to the minute; older windows are
+# resolved to the hour.  The buckets are built in one vectorized pass when the
+# history is loaded and then updated with add() as orders come in, so the
+# reports take time proportional to the number of buckets in the window, not
+# the number of orders.
+class SalesRollup:
+    def __init__(self, minute_retention=timedelta(days=31)):
+        self.minute_retention = minute_retention
+        self.minutely = {}     # minute start -> [revenue, count], recent minutes only
+        self.hourly = {}       # hour start -> [revenue, count]
+        self.daily = {}        # date -> [revenue, count]
+        self.by_coffee = {}    # coffee type -> [revenue, count]
+        self.total_revenue = 0.0
+        self.total_count = 0
+        self._lock = threading.Lock()
+
+    # Build the buckets from an OrderTable with whole-column NumPy operations
+    @classmethod
+    def from_table(cls, table, now=None):
+        rollup = cls()
+        rollup.add_summary(summarize_table(table), now)
+        return rollup
+
+    # Merge the output of summarize_table() into the buckets
+    def add_summary(self, summary, now=None):
+        recent_from = to_epoch_us((now or datetime.now()) - self.minute_retention) // BUCKET_WIDTHS["minute"]
+        levels = (
+            ("minute", self.minutely, lambda key: EPOCH + timedelta(minutes=key)),
+            ("hour", self.hourly, lambda key: EPOCH + timedelta(hours=key)),
+            ("day", self.daily, lambda key: (EPOCH + timedelta(days=key)).date()),
+        )
+        with self._lock:
+            for level, target, to_key in levels:
+                keys = summary[f"{level}_keys"]
+                revenue = summary[f"{level}_revenue"]
+                count = summary[f"{level}_count"]
+                if level == "minute":
+                    recent = keys >= recent_from
+                    keys, revenue, count = keys[recent], revenue[recent], count[recent]
+                for key, bucket_revenue, bucket_count in zip(keys.tolist(), revenue.tolist(), count.tolist()):
+                    bucket = target.setdefault(to_key(key), [0.0, 0])
+                    bucket[0] += bucket_revenue
+                    bucket[1] += bucket_count
+            for coffee_type, revenue, count in zip(summary["coffee_types"].tolist(), summary["coffee_revenue"].tolist(),
+                                                   summary["coffee_count"].tolist()):
+                bucket = self.by_coffee.setdefault(coffee_type, [0.0, 0])
+                bucket[0] += revenue
+                bucket[1] += count
+            self.total_revenue += float(summary["coffee_revenue"].sum())
+            self.total_count += int(summary["coffee_count"].sum())
+
+    # Count one new order
+    def add(self, coffee_type, price, order_time):
+        if not isinstance(order_time, datetime):
+            order_time = datetime.fromisoformat(str(order_time))
+        price = float(price)
+        minute = order_time.replace(second=0, microsecond=0)
+        hour = minute.replace(minute=0)
+        with self._lock:
+            for target, key in ((self.minutely, minute), (self.hourly, hour), (self.daily, hour.date()), (self.by_coffee, coffee_type)):
+                bucket = target.setdefault(key, [0.0, 0])
+                bucket[0] += price
+                bucket[1] += 1
+            self.total_revenue += price
+            self.total_count += 1
+            if len(self.minutely) > 2 * self.minute_retention.total_seconds() / 60:
+                self._prune_minutes(order_time)
+
+    def _prune_minutes(self, now):
+        cutoff = now - self.minute_retention
+        self.minutely = {minute: bucket for minute, bucket in self.minutely.items() if minute >= cutoff}
+
+    def _sum_range(self, buckets, start, end, step, revenue, count):
+        key = start
+        while key < end:
+            bucket = buckets.get(key)
+            if bucket:
+                revenue += bucket[0]
+                count += bucket[1]
+            key += step
+        return revenue, count
+
+    # Revenue and order count from `since` up to now.  `since` is rounded down
+    # to the minute inside the minute retention window, to the hour before it.
+    def totals_since(self, since, now=None):
+        now = now or datetime.now()
+        revenue, count = 0.0, 0
+        start_hour = since.replace(minute=0, second=0, microsecond=0)
+        next_hour = start_hour + timedelta(hours=1)
+        next_day = datetime.combine(start_hour.date() + timedelta(days=1), datetime.min.time())
+        end = now + timedelta(minutes=1)
+        with self._lock:
+            # Minutes up to the next hour, hours up to the next day, then whole days
+            if since >= now - self.minute_retention:
+                revenue, count = self._sum_range(self.minutely, since.replace(second=0, microsecond=0),
+                                                 min(next_hour, end), timedelta(minutes=1), revenue, count)
+            else:
+                next_hour = start_hour
+            revenue, count = self._sum_range(self.hourly, next_hour, min(next_day, end), timedelta(hours=1), revenue, count)
+            revenue, count = self._sum_range(self.daily, next_day.date(), now.date() + timedelta(days=1),
+                                             timedelta(days=1), revenue, count)
+        return revenue, count
+
+    def revenue_since(self, since, now=None):
+        return self.totals_since(since, now)[0]
+
+    # Orders per coffee type, most sold first (like value_counts())
+    def coffee_counts(self):
+        with self._lock:
+            counts = {coffee_type: bucket[1] for coffee_type, bucket in self.by_coffee.items()}
+        return pd.Series(counts, name="count", dtype="int64").sort_values(ascending=False)
+
+    def best_selling(self):
+        counts = self.coffee_counts()
+        return counts.idxmax() if not counts.empty else None
+
+    def least_selling(self):
+        counts = self.coffee_counts()
+        return counts.idxmin() if not counts.empty else None
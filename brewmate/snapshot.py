@@ -0,0 +1,131 @@
+import hashlib
+import os
+import pickle
+import struct
+import threading
+from datetime import datetime
+
+from brewmate.journal import _fsync_dir
+from brewmate.locking import file_lock
+from brewmate.orders import OrderTable
+
+# File layout: magic, format version, payload length, SHA-256 of the payload,
+# then the pickled state.  The format version changes whenever the state
+# layout does; older snapshots are then ignored and rebuilt.
+SNAPSHOT_MAGIC = b"BREWSNAP"
+SNAPSHOT_FORMAT = 3
+_HEADER = struct.Struct("<8sIQ32s")
+
+
+# Materialized app state (orders table, loyalty points, ratings, users) loaded
+# from `storage`, starting from `snapshot` when it is given and valid.  Only
+# the orders, users and loyalty points added after the snapshot's storage
+# positions are parsed; the ratings are re-read only if their token changed.
+# Returns the state and the number of orders that did not come from the snapshot.
+def load_state(storage, snapshot=None):
+    saved = snapshot.read() if snapshot is not None else None
+    if saved is not None and saved["backend"] != storage.name:
+        saved = None
+    state = {"backend": storage.name}
+    position = saved["orders"]["position"] if saved else None
+    frame, state["orders_position"], full = storage.load_orders_since(position)
+    if full:
+        state["orders"] = OrderTable.from_frame(frame)
+    else:
+        orders = saved["orders"]
+        state["orders"] = OrderTable.from_columns(orders["columns"], orders["customers"], orders["coffee_types"],
+                                                  orders["sizes"])
+        state["orders"].extend(OrderTable.from_frame(frame))
+    position = saved["users"]["position"] if saved else None
+    users, state["users_position"], full = storage.load_users_since(position)
+    state["users"] = users if full else {**saved["users"]["data"], **users}
+    position = saved["loyalty_points"]["position"] if saved else None
+    points, state["loyalty_points_position"], full = storage.loyalty.load_since(position)
+    if not full:
+        totals = saved["loyalty_points"]["data"]
+        for customer, delta in points.items():
+            totals[customer] = totals.get(customer, 0) + delta
+        points = totals
+    state["loyalty_points"] = points
+    # Ratings are kept whole and reused while the backend reports the same
+    # dataset_token().  Take the token before reading, so a concurrent write
+    # makes it stale rather than missed.
+    token = storage.dataset_token("ratings")
+    if saved and token is not None and saved["ratings"]["token"] == token:
+        state["ratings"] = saved["ratings"]["data"]
+    else:
+        state["ratings"] = storage.load_ratings()
+    state["ratings_token"] = token
+    return state, len(frame)
+
+
+# Binary snapshot of the app state, so a cold start reads one file and the
+# orders added since instead of parsing every CSV row.
+#
+# A snapshot is always built from storage (the previous snapshot plus what
+# storage added after it), never from one process's in-memory copy, so orders
+# placed by other server processes are not lost.  The previous file is kept
+# as `<path>.prev` and used if the latest one fails its checksum.
+class StateSnapshot:
+    def __init__(self, path):
+        self.path = path
+        self.lock_path = path + ".lock"
+
+    # The newest snapshot that passes its checks, or None
+    def read(self):
+        for path in (self.path, self.path + ".prev"):
+            state = self._read_file(path)
+            if state is not None:
+                return state
+        return None
+
+    def _read_file(self, path):
+        try:
+            with open(path, "rb") as f:
+                header = f.read(_HEADER.size)
+                if len(header) != _HEADER.size:
+                    return None
+                magic, version, length, checksum = _HEADER.unpack(header)
+                if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_FORMAT:
+                    return None
+                payload = f.read(length)
+        except FileNotFoundError:
+            return None
+        if len(payload) != length or hashlib.sha256(payload).digest() != checksum:
+            return None
+        return pickle.loads(payload)
+
+    # Write `state` (as returned by load_state()) atomically
+    def write(self, state):
+        orders = state["orders"]
+        payload = pickle.dumps({
+            "backend": state["backend"],
+            "created": datetime.now().isoformat(),
+            "orders": {
+                "position": state["orders_position"],
+                "columns": {name: orders.column(name).copy() for name in OrderTable.FIELDS},
+                "customers": list(orders.customers),
+                "coffee_types": list(orders.coffee_types),
+                "sizes": list(orders.sizes),
+            },
+            "users": {"position": state["users_position"], "data": dict(state["users"])},
+            "loyalty_points": {"position": state["loyalty_points_position"], "data": dict(state["loyalty_points"])},
+            "ratings": {"token": state["ratings_token"], "data": state["ratings"]},
+        }, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_FORMAT, len(payload), hashlib.sha256(payload).digest()))
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        with file_lock(self.lock_path):
+            if os.path.exists(self.path):
+                os.replace(self.path, self.path + ".prev")
+            os.replace(tmp, self.path)
+            _fsync_dir(self.path)
+
+    # Bring the snapshot up to date with storage
+    def refresh(self, storage):
+        state, _ = load_state(storage, self)
+        self.write(state)
+        return state
@@ -0,0 +1,398 @@
+import csv
+import io
+import os
+import sqlite3
+import threading
+
+import pandas as pd
+
+from brewmate.inventory import FileInventoryLedger, SqliteInventoryLedger
+from brewmate.journal import ORDER_COLUMNS, OrderJournal, _complete_rows, _fsync_dir, file_fingerprint, order_fields
+from brewmate.locking import file_lock
+from brewmate.loyalty import FileLoyaltyLedger, SqliteLoyaltyLedger
+
+RATING_COLUMNS = ["Customer", "Rating", "Feedback"]
+USER_COLUMNS = ["username", "password"]
+
+
+# Append one fsync'd CSV row to `path` under its lock file, writing the
+# header first when the file is new
+def _append_row(path, columns, row):
+    with file_lock(path + ".lock"):
+        _append_row_locked(path, columns, row)
+
+
+def _append_row_locked(path, columns, row):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    if not os.path.exists(path):
+        writer.writerow(columns)
+    writer.writerow(row)
+    with open(path, "ab+") as f:
+        if f.tell():
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                f.write(b"\n")
+        f.write(buffer.getvalue().encode("utf-8"))
+        f.flush()
+        os.fsync(f.fileno())
+
+
+# Flat-file backend: the original CSV files, with orders going through the
+# append-only journal, loyalty points kept as appended deltas and stock
+# levels kept in an inventory ledger file
+class CsvStorage:
+    name = "csv"
+
+    def __init__(self, order_history_file, loyalty_points_file, ratings_file, users_file,
+                 inventory_file="inventory_ledger.csv"):
+        self.order_history_file = order_history_file
+        self.loyalty_points_file = loyalty_points_file
+        self.ratings_file = ratings_file
+        self.users_file = users_file
+        self.order_journal = OrderJournal(order_history_file)
+        self.inventory = FileInventoryLedger(inventory_file)
+        self.loyalty = FileLoyaltyLedger(loyalty_points_file)
+        self._users_guard = threading.Lock()
+        self._user_names = set()
+        self._user_names_position = None
+
+    # Orders
+    def load_orders(self):
+        return self.order_journal.load()
+
+    def load_orders_frame(self):
+        return self.order_journal.load_frame()
+
+    def append_order(self, order):
+        self.order_journal.append(order)
+
+    # Orders added since `position`; see OrderJournal.load_since()
+    def load_orders_since(self, position=None):
+        return self.order_journal.load_since(position)
+
+    # Drop orders placed before `cutoff` once they have been archived
+    def remove_orders_before(self, cutoff):
+        return self.order_journal.remove_before(cutoff)
+
+    # Loyalty points
+    def load_loyalty_points(self):
+        return self.loyalty.totals()
+
+    # Add points for one customer and return their new total
+    def add_loyalty_points(self, customer_name, points):
+        return self.loyalty.add(customer_name, points)
+
+    # Ratings.  ratings.csv is append-only, one row per rating, so concurrent
+    # sessions never rewrite (or read) a half-written file
+    def load_ratings(self):
+        with file_lock(self.ratings_file + ".lock", exclusive=False):
+            if os.path.exists(self.ratings_file):
+                return pd.read_csv(self.ratings_file).to_dict(orient='records')
+        return []
+
+    def add_rating(self, rating):
+        _append_row(self.ratings_file, RATING_COLUMNS, [rating[column] for column in RATING_COLUMNS])
+
+    # Users.  users.csv is append-only: registrations and password changes
+    # each add a row, and the last row for a username wins.
+    def load_users(self):
+        if os.path.exists(self.users_file):
+            return pd.read_csv(self.users_file, dtype=str, keep_default_na=False)
+        return pd.DataFrame(columns=USER_COLUMNS)
+
+    # Users ({username: password}) added or changed after `position` (from an
+    # earlier call), the new position, and whether the whole file was read
+    # (first call, or the file was replaced)
+    def load_users_since(self, position=None):
+        with file_lock(self.users_file + ".lock", exclusive=False):
+            return self._load_users_since_locked(position)
+
+    def _load_users_since_locked(self, position):
+        try:
+            f = open(self.users_file, "rb")
+        except FileNotFoundError:
+            return {}, None, True
+        with f:
+            size = os.fstat(f.fileno()).st_size
+            full = position is None or position["size"] > size or file_fingerprint(f, position["size"]) != position
+            start = 0 if full else position["size"]
+            f.seek(start)
+            data = f.read(size - start)
+            data = data[:data.rfind(b"\n") + 1]  # leave a torn last line for the next read
+            position = file_fingerprint(f, start + len(data))
+        if full:
+            users_df = pd.read_csv(io.BytesIO(data), dtype=object, keep_default_na=False) if data.strip() else self.load_users()[:0]
+            return dict(zip(users_df["username"].tolist(), users_df["password"].tolist())), position, True
+        rows = csv.reader(io.StringIO(_complete_rows(data, USER_COLUMNS)))
+        return {username: password for username, password in rows}, position, False
+
+    # Append the user unless the name is taken; the check and the append
+    # happen under the users file lock, so two processes cannot both add a
+    # name.  The names seen so far are kept, so the check reads only the
+    # rows appended since the last call.  Returns False if the name is taken.
+    def add_user(self, username, password):
+        with self._users_guard, file_lock(self.users_file + ".lock"):
+            users, self._user_names_position, full = self._load_users_since_locked(self._user_names_position)
+            if full:
+                self._user_names = set(users)
+            else:
+                self._user_names.update(users)
+            if username in self._user_names:
+                return False
+            _append_row_locked(self.users_file, USER_COLUMNS, [username, password])
+            self._user_names.add(username)
+            return True
+
+    def set_password(self, username, password):
+        _append_row(self.users_file, USER_COLUMNS, [username, password])
+
+    # Replace passwords, `changes` being {username: (expected, new)}; a user
+    # whose password is no longer `expected` keeps it.  The file is rewritten
+    # atomically with one row per user, which also drops the rows that
+    # set_password superseded.  Returns how many passwords were replaced.
+    def rewrite_users(self, changes):
+        with self._users_guard, file_lock(self.users_file + ".lock"):
+            users, _, _ = self._load_users_since_locked(None)
+            replaced = 0
+            for username, (expected, new) in changes.items():
+                if users.get(username) == expected:
+                    users[username] = new
+                    replaced += 1
+            tmp = self.users_file + ".tmp"
+            with open(tmp, "w", newline="") as f:
+                writer = csv.writer(f, lineterminator="\n")
+                writer.writerow(USER_COLUMNS)
+                writer.writerows(users.items())
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.users_file)
+            _fsync_dir(self.users_file)
+            self._user_names_position = None
+        return replaced
+
+    # Value that changes whenever "orders" or "ratings" is written (None while
+    # the file does not exist); orders cover the base CSV and its journal files
+    def dataset_token(self, dataset):
+        if dataset == "orders":
+            journal = self.order_journal
+            return [self._file_token(path) for path in (journal.path, journal.journal_path, journal.segment_path)]
+        return self._file_token({"ratings": self.ratings_file}[dataset])
+
+    def _file_token(self, path):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return [stat.st_ino, stat.st_size, stat.st_mtime_ns]
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS orders (
+    id INTEGER PRIMARY KEY,
+    customer_name TEXT NOT NULL,
+    coffee_type TEXT NOT NULL,
+    size TEXT NOT NULL,
+    add_ons TEXT NOT NULL,
+    price REAL NOT NULL,
+    order_time TEXT NOT NULL
+);
+-- Orders are read in id order into the in-memory OrderTable, so the only
+-- search here is remove_orders_before, which the order_time index serves; the
+-- customer and coffee indexes are never used (databases created with them drop them)
+CREATE INDEX IF NOT EXISTS orders_order_time ON orders (order_time);
+DROP INDEX IF EXISTS orders_customer_name;
+DROP INDEX IF EXISTS orders_coffee_type;
+
+CREATE TABLE IF NOT EXISTS loyalty_points (
+    customer TEXT PRIMARY KEY,
+    points INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS loyalty_points_points ON loyalty_points (points DESC, customer);
+CREATE INDEX IF NOT EXISTS loyalty_points_customer_nocase ON loyalty_points (customer COLLATE NOCASE);
+
+CREATE TABLE IF NOT EXISTS ratings (
+    id INTEGER PRIMARY KEY,
+    customer TEXT NOT NULL,
+    rating INTEGER NOT NULL,
+    feedback TEXT
+);
+
+CREATE TABLE IF NOT EXISTS users (
+    username TEXT PRIMARY KEY,
+    password TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS inventory (
+    item TEXT PRIMARY KEY,
+    on_hand REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS inventory_reservations (
+    reservation TEXT NOT NULL,
+    item TEXT NOT NULL,
+    quantity REAL NOT NULL,
+    expires REAL NOT NULL,
+    PRIMARY KEY (reservation, item)
+);
+CREATE INDEX IF NOT EXISTS inventory_reservations_item ON inventory_reservations (item, expires);
+"""
+
+
+# SQLite backend in WAL mode: readers never block the writer, and the
+# username primary key turns logins into index lookups instead of whole-file
+# scans
+class SqliteStorage:
+    name = "sqlite"
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+        self.inventory = SqliteInventoryLedger(self)
+        self.loyalty = SqliteLoyaltyLedger(self)
+
+    # One connection per thread; Streamlit runs each session on its own thread
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # Orders
+    def load_orders(self):
+        return self.load_orders_frame().to_dict(orient='records')
+
+    def load_orders_frame(self):
+        return pd.read_sql_query(f"SELECT {', '.join(ORDER_COLUMNS)} FROM orders ORDER BY id", self._connect())
+
+    def append_order(self, order):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO orders (customer_name, coffee_type, size, add_ons, price, order_time) VALUES (?, ?, ?, ?, ?, ?)",
+                tuple(order_fields(order)),
+            )
+
+    def append_orders(self, orders):
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT INTO orders (customer_name, coffee_type, size, add_ons, price, order_time) VALUES (?, ?, ?, ?, ?, ?)",
+                (tuple(order_fields(order)) for order in orders),
+            )
+
+    # Orders with an id above the position's max_id.  The position also holds
+    # the number of rows up to max_id; if rows were deleted (archived) or the
+    # table was re-imported since, that count no longer matches and every
+    # order is read.
+    def load_orders_since(self, position=None):
+        conn = self._connect()
+        full = position is None or conn.execute(
+            "SELECT COUNT(*) FROM orders WHERE id <= ?", (position["max_id"],)
+        ).fetchone()[0] != position["count"]
+        after = 0 if full else position["max_id"]
+        frame = pd.read_sql_query(
+            f"SELECT id, {', '.join(ORDER_COLUMNS)} FROM orders WHERE id > ? ORDER BY id", conn, params=(after,)
+        )
+        count = len(frame) if full else position["count"] + len(frame)
+        max_id = int(frame["id"].iloc[-1]) if len(frame) else after
+        return frame.drop(columns="id"), {"max_id": max_id, "count": count}, full
+
+    def remove_orders_before(self, cutoff):
+        with self._connect() as conn:
+            return conn.execute("DELETE FROM orders WHERE order_time < ?", (str(cutoff),)).rowcount
+
+    # Loyalty points
+    def load_loyalty_points(self):
+        return self.loyalty.totals()
+
+    def add_loyalty_points(self, customer_name, points):
+        return self.loyalty.add(customer_name, points)
+
+    # Ratings
+    def load_ratings(self):
+        rows = self._connect().execute("SELECT customer, rating, feedback FROM ratings ORDER BY id").fetchall()
+        return [dict(zip(RATING_COLUMNS, row)) for row in rows]
+
+    def add_rating(self, rating):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO ratings (customer, rating, feedback) VALUES (?, ?, ?)",
+                (rating["Customer"], int(rating["Rating"]), rating["Feedback"]),
+            )
+
+    # Users
+    def load_users(self):
+        rows = self._connect().execute("SELECT username, password FROM users").fetchall()
+        return pd.DataFrame([tuple(row) for row in rows], columns=USER_COLUMNS)
+
+    # Users inserted after the position's rowid.  The position also records
+    # the username at that rowid; if it changed, the table was re-imported
+    # and every user is read.
+    def load_users_since(self, position=None):
+        conn = self._connect()
+        full = position is None
+        if not full and position["max_rowid"]:
+            row = conn.execute("SELECT username FROM users WHERE rowid = ?", (position["max_rowid"],)).fetchone()
+            full = row is None or row[0] != position["username"]
+        after = 0 if full else position["max_rowid"]
+        rows = conn.execute("SELECT rowid, username, password FROM users WHERE rowid > ? ORDER BY rowid", (after,)).fetchall()
+        if rows:
+            position = {"max_rowid": rows[-1][0], "username": rows[-1][1]}
+        elif full:
+            position = {"max_rowid": 0, "username": None}
+        return {username: password for _, username, password in rows}, position, full
+
+    # Returns False if the name is taken (the primary key rejects the insert)
+    def add_user(self, username, password):
+        try:
+            with self._connect() as conn:
+                conn.execute("INSERT INTO users (username, password) VALUES (?, ?)", (username, password))
+        except sqlite3.IntegrityError:
+            return False
+        return True
+
+    # Re-insert the row so the change gets a new rowid and load_users_since() sees it
+    def set_password(self, username, password):
+        with self._connect() as conn:
+            self._move_users(conn, [(username, password)])
+
+    # Same as CsvStorage.rewrite_users
+    def rewrite_users(self, changes):
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        with conn:
+            users = dict(conn.execute("SELECT username, password FROM users"))
+            replaced = [(username, new) for username, (expected, new) in changes.items() if users.get(username) == expected]
+            self._move_users(conn, replaced)
+        return len(replaced)
+
+    # Store the (username, password) pairs as new rows after the current last
+    # rowid, so load_users_since sees them as changed.  The rowids are taken
+    # before the old rows go: SQLite would reuse the last row's rowid.
+    def _move_users(self, conn, users):
+        last = conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM users").fetchone()[0]
+        conn.executemany("DELETE FROM users WHERE username = ?", [(username,) for username, _ in users])
+        conn.executemany("INSERT INTO users (rowid, username, password) VALUES (?, ?, ?)",
+                         [(last + i, username, password) for i, (username, password) in enumerate(users, 1)])
+
+    def dataset_token(self, dataset):
+        query = {
+            "orders": "SELECT COUNT(*), MAX(id) FROM orders",
+            "ratings": "SELECT COUNT(*), MAX(id) FROM ratings",
+        }[dataset]
+        return list(self._connect().execute(query).fetchone())
+
+
+# Build the backend selected by name ("csv" or "sqlite")
+def open_storage(backend, order_history_file, loyalty_points_file, ratings_file, users_file, database_file,
+                 inventory_file="inventory_ledger.csv"):
+    if backend == "csv":
+        return CsvStorage(order_history_file, loyalty_points_file, ratings_file, users_file, inventory_file)
+    if backend == "sqlite":
+        return SqliteStorage(database_file)
+    raise ValueError(f"Unknown storage backend: {backend!r} (expected 'csv' or 'sqlite')")
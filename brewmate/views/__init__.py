@@ -0,0 +1,32 @@
+import importlib
+
+from brewmate.views import resources
+
+# The app's pages, in sidebar order.  A page's module is imported the first
+# time the page is shown, and a rerun builds only the shared objects its
+# "needs" lists (see resources.RESOURCES): only the Admin Panel loads the
+# order history, and Order Now just appends to it.  "admin" pages are listed
+# for admins only.  Each module has render(sections, **needs); `sections` is
+# the rerun's metrics.Sections, for pages that time their parts.
+PAGES = {
+    "Home": {"module": "brewmate.views.home", "needs": (), "admin": False},
+    "Order Now": {"module": "brewmate.views.order", "needs": ("orders", "recipes", "inventory", "prep_queue"),
+                  "admin": False},
+    "About Us": {"module": "brewmate.views.about", "needs": (), "admin": False},
+    "Contact Us": {"module": "brewmate.views.contact", "needs": (), "admin": False},
+    "Admin Panel": {"module": "brewmate.views.admin",
+                    "needs": ("store", "recipes", "inventory", "prep_queue", "report_jobs"), "admin": True},
+    "Performance": {"module": "brewmate.views.performance", "needs": (), "admin": True},
+}
+
+
+def page_names(admin):
+    return [name for name, page in PAGES.items() if admin or not page["admin"]]
+
+
+def render(name, sections, admin):
+    page = PAGES[name]
+    if page["admin"] and not admin:
+        return
+    module = importlib.import_module(page["module"])
+    module.render(sections, **resources.load(page["needs"]))
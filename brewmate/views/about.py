@@ -0,0 +1,20 @@
+import streamlit as st
+
+
+def render(sections):
+    # Display Groupmates Names and etc
+    st.title("About BrewMate")
+    st.write("BrewMate is a coffee shop dedicated to providing the best coffee experience. We offer a variety of handcrafted beverages, each made with care and passion. Our goal is to create a welcoming environment for all our customers, where great coffee and community come together.")
+    # Team pictures
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.image('azhar.jpg', caption='Azhar Ali, Founder', use_column_width=True)
+    with col2:
+        st.image('ad.jpg', caption='Adrish Elnes, Co-Founder', use_column_width=True)
+    with col3:
+        st.image('bolo.jpg', caption='Nabilah Shamshir, Accountant', use_column_width=True)
+    col4, col5 = st.columns(2)
+    with col4:
+        st.image('vv.jpg', caption='Vivian Hwong, Manager', use_column_width=True)
+    with col5:
+        st.image('dio.jpg', caption='Diocleciana, Executive Chef', use_column_width=True)
@@ -0,0 +1,278 @@
+import os
+from datetime import datetime, timedelta
+
+import pandas as pd
+import streamlit as st
+
+from brewmate import metrics
+from brewmate.archive import next_month
+from brewmate.export import export_orders_csv, export_summary_csv, export_xlsx
+from brewmate.forecast import DEFAULT_LOOKBACK, DemandForecast
+from brewmate.menu import menu, size_prices
+from brewmate.reports import DONE, FAILED, REPORTS
+from brewmate.views import resources
+
+
+# Function to build a sales export for a download button.  The export is
+# streamed into a spooled temp file; st.download_button needs the finished
+# bytes, so they are read once, when the button is clicked.
+@metrics.timed("persistence", call="export_download")
+def export_download(store, build, start, end):
+    with build(store.order_parts(start), start, end) as f:
+        return f.read()
+
+# Report jobs requested in this session, newest first, with a download button once built
+def render_report_jobs(report_jobs):
+    for job_id in st.session_state["report_jobs"]:
+        job = report_jobs.status(job_id)
+        if job is None:
+            continue
+        label = REPORTS[job["report"]]["title"]
+        if "start" in job["params"]:
+            label += f" for {job['params']['start']:%B %Y}"
+        if job["status"] == DONE:
+            st.download_button(f"Download {label}", lambda job_id=job_id: report_jobs.read(job_id),
+                               file_name=os.path.basename(job["path"]), key=f"report_{job_id}", on_click="ignore")
+        elif job["status"] == FAILED:
+            st.error(f"{label} failed: {job['error']}")
+        else:
+            st.info(f"{label}: {job['status']} ({job['seconds']:.0f} s)...")
+
+def reports_pending(report_jobs):
+    jobs = [report_jobs.status(job_id) for job_id in st.session_state["report_jobs"]]
+    return any(job is not None and job["status"] not in (DONE, FAILED) for job in jobs)
+
+# While reports are being built the list refreshes itself every two seconds,
+# then reruns the page once so the finished list is drawn normally
+@st.fragment(run_every=2)
+def show_pending_report_jobs(report_jobs):
+    render_report_jobs(report_jobs)
+    if not reports_pending(report_jobs):
+        st.rerun()
+
+
+# One page of the orders matching `query`, cached per version of the orders:
+# sales redraws (and other admins' sessions) between two orders reuse it
+@st.cache_data(max_entries=100, show_spinner=False)
+def sales_page(_store, orders_version, start, end, offset, query):
+    return _store.order_page(start, end, offset=offset, **query)
+
+def restock(inventory):
+    item = st.session_state["restock_item"]
+    with metrics.timer("persistence", call="inventory_restock"):
+        inventory.restock(item, st.session_state["restock_amount"])
+    st.session_state["restocked"] = item
+
+
+# Each section of the Admin Panel is a fragment: using a widget in one reruns
+# only that section, and the kitchen and sales sections also redraw on their
+# own timer.  Sections read their data through caches keyed by the dataset's
+# version (store.derived, sales_page), so a redraw with no new orders or
+# ratings recomputes nothing.
+
+@st.fragment
+@metrics.timed("admin_section", section="inventory")
+def inventory_section(store, recipes, inventory):
+    st.subheader("Inventory Management")
+    # Display current inventory levels
+    st.write("Inventory Levels")
+    inventory_levels = inventory.levels()
+    for item, qty in inventory_levels.items():
+        st.write(f"{item.capitalize()}: {qty} units")
+
+    # Low stock alert: time to depletion projected from recent demand through the
+    # recipes (see brewmate/forecast.py); the forecast is refit only after new orders
+    forecast = store.derived("orders", "demand_forecast", lambda: DemandForecast.fit(
+        store.order_tables(datetime.now() - DEFAULT_LOOKBACK), recipes))
+    stock_outlook = forecast.outlook(inventory.available())
+    for alert in forecast.alerts(stock_outlook).to_dict(orient="records"):
+        if alert["Runs Out In (hours)"] == 0:
+            st.warning(f"Low stock alert: {alert['Item']} is out of stock. Suggested reorder: {alert['Reorder']} units")
+        else:
+            st.warning(f"Low stock alert: {alert['Item']} runs out in about {alert['Runs Out In (hours)']:.0f} hours. "
+                       f"Suggested reorder: {alert['Reorder']} units")
+    with st.expander("Stock Outlook"):
+        st.dataframe(stock_outlook)
+
+    # Update inventory (in the button's callback, so this redraw already shows the new level)
+    st.selectbox("Item to Restock", list(inventory_levels.keys()), key="restock_item")
+    st.number_input("Restock Amount", min_value=1, key="restock_amount")
+    st.button("Restock Inventory", on_click=restock, args=(inventory,))
+    restocked = st.session_state.pop("restocked", None)
+    if restocked:
+        st.success(f"{restocked.capitalize()} restocked successfully.")
+
+    # Ingredients used by every order placed so far, per the recipes
+    with st.expander("Ingredient Usage"):
+        st.dataframe(pd.DataFrame(store.consumption.items(), columns=["Ingredient", "Used"]))
+
+
+@st.fragment(run_every=resources.KITCHEN_REFRESH_SECONDS or None)
+@metrics.timed("admin_section", section="kitchen")
+def kitchen_section(prep_queue):
+    st.subheader("Kitchen")
+    kitchen = prep_queue.metrics()
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Queued Orders", kitchen["queued"])
+    col2.metric("Being Prepared", f"{kitchen['preparing']} / {kitchen['baristas']} baristas")
+    col3.metric("Completed (last hour)", round(kitchen["throughput_per_hour"]))
+    col4, col5 = st.columns(2)
+    col4.metric("Average Wait", f"{kitchen['avg_wait_seconds']:.0f} s")
+    col5.metric("Backlog", f"{kitchen['backlog_seconds']:.0f} s")
+
+
+@st.fragment(run_every=resources.SALES_REFRESH_SECONDS or None)
+@metrics.timed("admin_section", section="sales")
+def sales_section(store):
+    st.subheader("Sales Reporting")
+    if store.sales.total_count:
+        # Orders in the chosen date range, filtered and sorted by the store;
+        # only the visible page is fetched and sent to the browser
+        st.write("Total Sales Data")
+        today = datetime.now()
+        date_range = st.date_input("Date Range", (today.replace(day=1).date(), today.date()), key="sales_date_range")
+        col1, col2, col3 = st.columns(3)
+        customer_filter = col1.text_input("Customer", key="sales_customer").strip()
+        coffee_filter = col2.selectbox("Coffee Type", ["All"] + list(menu), key="sales_coffee_type")
+        size_filter = col3.selectbox("Size", ["All"] + list(size_prices), key="sales_size")
+        col1, col2, col3, col4 = st.columns(4)
+        sort_labels = {"Order Time": "order_time", "Customer": "customer_name", "Coffee Type": "coffee_type",
+                       "Size": "size", "Price": "price"}
+        sort_by = col1.selectbox("Sort By", list(sort_labels), key="sales_sort_by")
+        descending = col2.selectbox("Order", ["Descending", "Ascending"], key="sales_order") == "Descending"
+        page_size = col3.selectbox("Rows per Page", [25, 50, 100], key="sales_page_size")
+        page_number = col4.number_input("Page", min_value=1, value=1, step=1, key="sales_page")
+        if len(date_range) == 2:
+            range_start = datetime.combine(date_range[0], datetime.min.time())
+            range_end = datetime.combine(date_range[1], datetime.min.time()) + timedelta(days=1)
+            query = dict(
+                customer=customer_filter or None,
+                coffee_type=None if coffee_filter == "All" else coffee_filter,
+                size=None if size_filter == "All" else size_filter,
+                sort_by=sort_labels[sort_by],
+                descending=descending,
+                limit=page_size,
+            )
+            orders_version = store.version("orders")
+            sales_df, matching = sales_page(store, orders_version, range_start, range_end, (page_number - 1) * page_size, query)
+            pages = max(1, -(-matching // page_size))
+            if page_number > pages:
+                page_number = pages
+                sales_df, matching = sales_page(store, orders_version, range_start, range_end, (pages - 1) * page_size, query)
+            st.dataframe(sales_df, hide_index=True)
+            st.caption(f"{matching} orders, page {page_number} of {pages}")
+
+            # Downloads of the whole date range, built only when a button is clicked
+            export_name = f"sales_{date_range[0]}_{date_range[1]}"
+            col1, col2, col3 = st.columns(3)
+            col1.download_button("Orders (CSV)", lambda: export_download(store, export_orders_csv, range_start, range_end),
+                                 file_name=f"{export_name}_orders.csv", mime="text/csv", on_click="ignore")
+            col2.download_button("Summary (CSV)", lambda: export_download(store, export_summary_csv, range_start, range_end),
+                                 file_name=f"{export_name}_summary.csv", mime="text/csv", on_click="ignore")
+            col3.download_button("Report (Excel)", lambda: export_download(store, export_xlsx, range_start, range_end),
+                                 file_name=f"{export_name}.xlsx", on_click="ignore",
+                                 mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+
+        # Sales Breakdown by Coffee Type (answered from the store's pre-aggregated
+        # rollups, and kept until the next order)
+        sales = store.sales
+        sales_summary, total_sales, best_selling, least_selling = store.derived("orders", "sales_overview", lambda: (
+            sales.coffee_counts(), sales.total_revenue, sales.best_selling(), sales.least_selling()))
+        st.bar_chart(sales_summary, use_container_width=True)
+
+        # Total Profit Calculation (mock example)
+        st.write(f"Total Revenue: ${total_sales:.2f}")
+
+        # Daily, Weekly, and Monthly Profit Calculation with Graphs
+        today = datetime.now()
+
+        daily_profit = sales.revenue_since(today - timedelta(days=1), today)
+        weekly_profit = sales.revenue_since(today - timedelta(weeks=1), today)
+        monthly_profit = sales.revenue_since(today - timedelta(days=30), today)
+
+        profit_data = pd.DataFrame({
+            'Period': ['Daily', 'Weekly', 'Monthly'],
+            'Profit': [daily_profit, weekly_profit, monthly_profit]
+        })
+        st.write(f"Daily Profit: ${daily_profit:.2f}")
+        st.write(f"Weekly Profit: ${weekly_profit:.2f}")
+        st.write(f"Monthly Profit: ${monthly_profit:.2f}")
+        st.bar_chart(profit_data.set_index('Period'), use_container_width=True)
+
+        # Least and Best Selling Product
+        st.subheader("Product Performance")
+        st.write(f"Best Selling Product: {best_selling}")
+        st.write(f"Least Selling Product: {least_selling}")
+        st.bar_chart(sales_summary, use_container_width=True)
+
+
+# Reports: built in the background, served from the cache when the data has not changed
+@st.fragment
+@metrics.timed("admin_section", section="reports")
+def reports_section(store, report_jobs):
+    st.subheader("Reports")
+    report_months = store.months()[::-1]
+    col1, col2 = st.columns(2)
+    report = col1.selectbox("Report", list(REPORTS), format_func=lambda name: REPORTS[name]["title"], key="report_type")
+    report_month = col2.selectbox("Month", report_months, key="report_month", disabled=not REPORTS[report]["dated"])
+    if st.button("Generate Report"):
+        params = {}
+        if REPORTS[report]["dated"]:
+            params["start"] = datetime.strptime(report_month, "%Y-%m")
+            params["end"] = next_month(params["start"])
+        job_id = report_jobs.submit(report, **params)
+        if job_id in st.session_state["report_jobs"]:
+            st.session_state["report_jobs"].remove(job_id)
+        st.session_state["report_jobs"].insert(0, job_id)
+    if reports_pending(report_jobs):
+        show_pending_report_jobs(report_jobs)
+    else:
+        render_report_jobs(report_jobs)
+
+
+# Display loyalty points summary: the top customers and a name search,
+# so the page never copies every member's total (the ledger keeps both
+# current as points are added)
+@st.fragment
+@metrics.timed("admin_section", section="loyalty")
+def loyalty_section(store):
+    st.subheader("Loyalty Points Summary")
+    top_n = st.number_input("Top Customers", min_value=5, max_value=500, value=20, step=5)
+    st.dataframe(pd.DataFrame(store.loyalty.top(int(top_n)), columns=["Customer", "Points"]))
+    customer_prefix = st.text_input("Find Customer", key="loyalty_search")
+    if customer_prefix:
+        matches = store.loyalty.search(customer_prefix, limit=50)
+        if matches:
+            st.dataframe(pd.DataFrame(matches, columns=["Customer", "Points"]))
+        else:
+            st.write("No matching customers.")
+
+
+@st.fragment
+@metrics.timed("admin_section", section="ratings")
+def ratings_section(store):
+    st.subheader("Ratings Summary")
+    if store.ratings:
+        ratings_df = store.derived("ratings", "frame",
+                                   lambda: pd.DataFrame(store.ratings, columns=["Customer", "Rating", "Feedback"]))
+        st.dataframe(ratings_df)
+        avg_rating = ratings_df["Rating"].mean()
+        st.write(f"Average Rating: {avg_rating:.2f} / 5")
+
+
+def render(sections, store, recipes, inventory, prep_queue, report_jobs):
+    if "report_jobs" not in st.session_state:
+        st.session_state["report_jobs"] = []
+
+    st.title("Admin Panel")
+    inventory_section(store, recipes, inventory)
+    sections.section("Admin Panel: kitchen")
+    kitchen_section(prep_queue)
+    sections.section("Admin Panel: sales")
+    sales_section(store)
+    sections.section("Admin Panel: reports")
+    reports_section(store, report_jobs)
+    sections.section("Admin Panel: loyalty")
+    loyalty_section(store)
+    sections.section("Admin Panel: ratings")
+    ratings_section(store)
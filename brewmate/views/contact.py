@@ -0,0 +1,7 @@
+import streamlit as st
+
+
+def render(sections):
+    st.title('Contact Us')
+    st.subheader('Our contact information')
+    st.text('Email us at Azhario123@gmail.com')
@@ -0,0 +1,13 @@
+import streamlit as st
+
+
+def render(sections):
+    st.title("Welcome to BrewMate!")
+    st.subheader("Exclusive Promotions and Benefits!")
+    st.image("https://images.unsplash.com/photo-1511920170033-f8396924c348", use_column_width=True)
+    promotions = ["**Enjoy 10% off on your first order, earn loyalty points for every dollar spent, get exclusive member promotions, a free birthday coffee, and priority customer support!**"]
+    for promotion in promotions:
+        st.markdown(promotion)
+    st.write("Click below to join our membership and start enjoying the benefits!")
+    if st.button("Join Now"):
+        st.success("Thank you for joining! You are now a valued member of our coffee shop family.")
@@ -0,0 +1,168 @@
+import time
+from datetime import datetime
+
+import streamlit as st
+
+from brewmate import metrics
+from brewmate.inventory import OutOfStock, ReservationExpired
+from brewmate.menu import menu, size_prices, add_on_prices, order_price
+from brewmate.preparation import QUEUED, READY
+
+
+# Function to generate an invoice
+def generate_invoice(order):
+    return f"""
+    Invoice
+    ---------
+    Customer Name: {order['customer_name']}
+    Coffee Type: {order['coffee_type']}
+    Size: {order['size']}
+    Add-ons: {', '.join(order['add_ons']) if order['add_ons'] else 'None'}
+    Total Price: ${order['price']:.2f}
+    Order Time: {order['order_time']}
+    """
+
+# Function to save a new order (the CSV backend appends it to the order journal)
+@metrics.timed("persistence", call="save_order_history")
+def save_order_history(store, order):
+    store.append_order(order)
+
+# Function to save a new rating
+@metrics.timed("persistence", call="save_rating")
+def save_rating(store, rating):
+    store.add_rating(rating)
+
+# Function to add loyalty points (returns the customer's new total)
+@metrics.timed("persistence", call="add_loyalty_points")
+def add_loyalty_points(store, customer_name, points):
+    return store.add_loyalty_points(customer_name, points)
+
+# Function to format a wait time for customers
+def format_wait(seconds):
+    seconds = max(1, round(seconds))
+    if seconds < 60:
+        return f"{seconds} seconds"
+    return f"{seconds // 60} min {seconds % 60:02d} s"
+
+# Order status box: refreshes itself every second while the order is being prepared,
+# then reruns the page once so the rating form appears
+@st.fragment(run_every=1)
+def show_order_status(prep_queue, order_id):
+    job = prep_queue.status(order_id)
+    if job is None or job["status"] == READY:
+        st.rerun()
+    remaining = format_wait(job["estimated_ready"] - time.time())
+    if job["status"] == QUEUED:
+        st.info(f"Your order is in the queue ({prep_queue.depth()} orders waiting). Estimated ready in {remaining}...")
+    else:
+        st.info(f"Your order is being prepared and will be ready in {remaining}...")
+
+
+def render(sections, orders, recipes, inventory, prep_queue):
+    if "current_order" not in st.session_state:
+        st.session_state["current_order"] = None
+
+    if "current_order_id" not in st.session_state:
+        st.session_state["current_order_id"] = None
+
+    if "rating_submitted" not in st.session_state:
+        st.session_state["rating_submitted"] = False
+
+    # Display Order Site
+    if st.session_state['logged_in'] and st.session_state["user_role"] == "customer" :
+        # Customer Order Process
+        st.subheader("Place Your Order")
+        customer_name = st.session_state["username"]
+        coffee_type = st.selectbox("Select Coffee Type", list(menu.keys()))
+        coffee_size = st.radio("Choose Size", tuple(size_prices))
+        add_ons = st.multiselect("Add-ons", list(add_on_prices))
+
+        # Calculate Total Price
+        total_price = order_price(coffee_type, coffee_size, add_ons)
+
+        st.write(f"Total Price: ${total_price:.2f}")
+
+        # Payment Integration before Order Placement
+        st.subheader("Payment Integration")
+        payment_method = st.selectbox("Choose Payment Method", ["Credit Card", "PayPal"])
+        reservation = None
+        ingredients = recipes.ingredients_for(coffee_type, coffee_size, add_ons)
+        if st.button("Confirm Payment"):
+            try:
+                # Hold the ingredients first, so two sessions cannot both sell the last cup
+                with metrics.timer("persistence", call="inventory_reserve"):
+                    reservation = inventory.reserve(ingredients)
+            except OutOfStock as shortage:
+                metrics.count("out_of_stock")
+                st.error(f"Sorry, we are out of {', '.join(shortage.items)} right now. Please choose another drink.")
+        if reservation is not None:
+            try:
+                st.success("Payment successful!")
+                order = {
+                    "customer_name": customer_name,
+                    "coffee_type": coffee_type,
+                    "size": coffee_size,
+                    "add_ons": add_ons,
+                    "price": total_price,
+                    "order_time": datetime.now()
+                }
+                st.session_state["current_order"] = order
+                # Record the order before the kitchen starts on it
+                save_order_history(orders, order)
+                st.session_state["current_order_id"] = prep_queue.submit(order)
+                st.success(f"Order placed! Your coffee will be ready shortly. Order: {coffee_type} ({coffee_size})")
+
+                # Display the generated invoice and provide download option
+                st.subheader("Invoice")
+                invoice_text = generate_invoice(order)
+                st.text(invoice_text)
+                st.download_button(label="Download Invoice", data=invoice_text, file_name=f"invoice_{customer_name}.txt", mime="text/plain")
+
+                # Add loyalty points (e.g., 1 point per $1 spent)
+                points_earned = int(order["price"])
+                total_points = add_loyalty_points(orders, customer_name, points_earned)
+                st.info(f"{points_earned} loyalty points added. Total points: {total_points}")
+
+                # Update Inventory: the reserved ingredients are used
+                with metrics.timer("persistence", call="inventory_commit"):
+                    try:
+                        inventory.commit(reservation)
+                    except ReservationExpired:
+                        # Held past its expiry, so the stock may be someone else's now: take it again
+                        try:
+                            reservation = inventory.reserve(ingredients)
+                            inventory.commit(reservation)
+                        except OutOfStock as shortage:
+                            metrics.count("out_of_stock")
+                            st.error(f"We ran out of {', '.join(shortage.items)} while your order was open. Please ask our staff about your order.")
+            except Exception:
+                # The order did not go through: give the held ingredients back
+                inventory.release(reservation)
+                raise
+            metrics.count("orders", coffee_type=coffee_type)
+
+            # Set rating submission flag to False for new rating submission
+            st.session_state["rating_submitted"] = False
+
+        # Order preparation status (the queue runs in the background)
+        order_ready = False
+        if st.session_state["current_order"] and not st.session_state["rating_submitted"]:
+            job = prep_queue.status(st.session_state["current_order_id"])
+            order_ready = job is None or job["status"] == READY
+            if order_ready:
+                st.success(f"{st.session_state['current_order']['customer_name']}, your {st.session_state['current_order']['coffee_type']} is ready!")
+            else:
+                show_order_status(prep_queue, st.session_state["current_order_id"])
+
+        # Collect customer rating and feedback after the coffee is ready
+        if order_ready:
+            st.subheader("Rate Your Experience")
+            rating = st.slider("Rate your coffee (1-5)", min_value=1, max_value=5, key="rating_slider")
+            feedback = st.text_area("Leave your feedback", key="feedback_area")
+            if st.button("Submit Rating"):
+                new_rating = {"Customer": customer_name, "Rating": rating, "Feedback": feedback}
+                save_rating(orders, new_rating)
+                st.success("Thank you for your feedback!")
+                st.session_state["rating_submitted"] = True
+    else:
+        st.text('Access Denied. Please log in to place an order.')
@@ -0,0 +1,55 @@
+import pandas as pd
+import streamlit as st
+
+from brewmate import metrics, profiling
+from brewmate.views import resources
+
+
+def render(sections):
+    # Rerun, section and persistence timings of this server process (see brewmate/metrics.py)
+    st.title("Performance")
+    collect = st.toggle("Collect metrics", value=metrics.enabled, key="collect_metrics",
+                        help="Applies to every session of this server; costs almost nothing while off")
+    if collect != metrics.enabled:
+        metrics.enable(collect)
+    timer_rows = metrics.registry.timer_rows()
+    counter_rows = metrics.registry.counter_rows()
+    if timer_rows:
+        st.subheader("Timings")
+        st.dataframe(pd.DataFrame(timer_rows), hide_index=True)
+    if counter_rows:
+        st.subheader("Counters")
+        st.dataframe(pd.DataFrame(counter_rows), hide_index=True)
+    if not timer_rows and not counter_rows:
+        st.info("No metrics recorded yet. Turn on collection and use the app to see where reruns spend their time.")
+    col1, col2 = st.columns(2)
+    col1.download_button("Prometheus Metrics", metrics.registry.prometheus_text(), file_name="brewmate_metrics.txt",
+                         mime="text/plain")
+    if col2.button("Reset Metrics"):
+        metrics.registry.reset()
+        st.rerun()
+    if resources.METRICS_PORT:
+        st.caption(f"Served for scrapers at http://127.0.0.1:{resources.METRICS_PORT}/metrics")
+    if resources.METRICS_FILE:
+        st.caption(f"Written to {resources.METRICS_FILE} at most every 10 seconds")
+
+    # Profiles of every session's reruns, by page (from the next rerun on)
+    st.subheader("Profiling")
+    profile_mode = st.selectbox("Profiler", profiling.MODES, index=profiling.MODES.index(profiling.mode),
+                                key="profile_mode",
+                                help="cprofile records every call; sample records the stack every few milliseconds "
+                                     "and writes collapsed stacks for flame graphs")
+    if profile_mode != profiling.mode:
+        profiling.set_mode(profile_mode)
+    profile_rows = profiling.summary_rows()
+    if profile_rows:
+        st.dataframe(pd.DataFrame(profile_rows), hide_index=True)
+        st.caption(f"Files are rewritten in {profiling.DIRECTORY} at most every {profiling.WRITE_EVERY:.0f} seconds. "
+                   "Turn .collapsed files into flame graphs with flamegraph.pl or speedscope, and open .prof files "
+                   "with snakeviz or pstats.")
+        col1, col2 = st.columns(2)
+        if col1.button("Write Profiles Now"):
+            profiling.write_all()
+        if col2.button("Reset Profiles"):
+            profiling.reset()
+            st.rerun()
@@ -0,0 +1,125 @@
+import os
+
+import streamlit as st
+
+from brewmate import metrics
+from brewmate.archive import OrderArchive
+from brewmate.auth import UserStore
+from brewmate.datastore import DataStore, OrderWriter
+from brewmate.kitchen import KitchenScheduler
+from brewmate.preparation import PreparationQueue
+from brewmate.recipes import RecipeBook
+from brewmate.snapshot import StateSnapshot
+from brewmate.storage import open_storage
+
+# File paths
+ORDER_HISTORY_FILE = 'order_history.csv'
+LOYALTY_POINTS_FILE = 'loyalty_points.csv'
+RATINGS_FILE = 'ratings.csv'
+USERS_FILE = 'users.csv'
+INVENTORY_FILE = 'inventory_ledger.csv'  # stock levels and reservations shared by all sessions
+ORDER_ARCHIVE_DIR = 'order_archive'  # month partitions written by `python -m brewmate.archive`
+SNAPSHOT_FILE = os.environ.get("BREWMATE_SNAPSHOT", "brewmate_state.snapshot")  # binary copy of the loaded state
+DATABASE_FILE = os.environ.get("BREWMATE_DB", "brewmate.db")
+REPORT_CACHE_DIR = os.environ.get("BREWMATE_REPORTS", "report_cache")  # finished admin reports
+METRICS_FILE = os.environ.get("BREWMATE_METRICS_FILE")  # Prometheus text, rewritten at most every 10 seconds
+METRICS_PORT = os.environ.get("BREWMATE_METRICS_PORT")  # or served at http://127.0.0.1:PORT/metrics
+
+# Storage backend: "csv" keeps the files above, "sqlite" uses DATABASE_FILE
+# (import existing CSVs with `python -m brewmate.migrate`)
+STORAGE_BACKEND = os.environ.get("BREWMATE_STORAGE", "csv")
+
+# Orders are prepared in the background by BARISTAS baristas; prep times are
+# per drink (see brewmate/kitchen.py), multiplied by KITCHEN_TIME_SCALE
+BARISTAS = int(os.environ.get("BREWMATE_BARISTAS", "2"))
+KITCHEN_TIME_SCALE = float(os.environ.get("BREWMATE_KITCHEN_TIME_SCALE", "1"))
+
+# The Admin Panel's kitchen and sales sections redraw themselves this often, in
+# seconds, without rerunning the rest of the page (0 turns the timer off)
+KITCHEN_REFRESH_SECONDS = float(os.environ.get("BREWMATE_KITCHEN_REFRESH", "5"))
+SALES_REFRESH_SECONDS = float(os.environ.get("BREWMATE_SALES_REFRESH", "30"))
+
+# Starting stock for items the inventory ledger has not seen yet (the menu lives in brewmate/menu.py)
+default_inventory = {
+    "coffee_beans": 1000,  # grams
+    "milk": 500,           # ml
+    "sugar": 200,          # grams
+    "cups": 100            # count
+}
+
+# Everything below is built once per server process, the first time a page
+# that needs it is shown, and shared by every session.
+
+@st.cache_resource
+def get_storage():
+    return open_storage(STORAGE_BACKEND, ORDER_HISTORY_FILE, LOYALTY_POINTS_FILE, RATINGS_FILE, USERS_FILE, DATABASE_FILE,
+                        INVENTORY_FILE)
+
+# Ingredients used by each drink, size and add-on, precomputed once (see brewmate/recipes.py)
+@st.cache_resource
+def get_recipe_book():
+    return RecipeBook()
+
+# Registered users, for the sidebar's login and registration forms; reads
+# only the users file, so pages without other data never load the orders
+@st.cache_resource
+def get_user_store():
+    return UserStore(get_storage())
+
+# Order history, loyalty points and ratings, loaded once per server process;
+# writes bump the store's per-dataset versions.  Months the archive CLI has
+# moved out of storage are read from the archive, and a cold start reads
+# SNAPSHOT_FILE plus the orders added since.
+@st.cache_resource
+@metrics.timed("startup", component="data_store")
+def get_data_store():
+    return get_order_writer().attach(
+        lambda: DataStore(get_storage(), OrderArchive(ORDER_ARCHIVE_DIR), StateSnapshot(SNAPSHOT_FILE),
+                          recipes=get_recipe_book(), users=get_user_store()))
+
+# Where Order Now writes orders, loyalty points and ratings: straight to
+# storage until the DataStore is built, then through it (see OrderWriter)
+@st.cache_resource
+def get_order_writer():
+    return OrderWriter(get_storage())
+
+@st.cache_resource
+def get_preparation_queue():
+    return PreparationQueue(KitchenScheduler(baristas=BARISTAS, time_scale=KITCHEN_TIME_SCALE))
+
+# Admin reports are built by worker processes and cached in REPORT_CACHE_DIR,
+# keyed by the data they were built from (see brewmate/reports.py)
+@st.cache_resource
+def get_report_jobs():
+    from brewmate.reports import ReportJobs  # only the Admin Panel builds reports
+
+    storage_args = (STORAGE_BACKEND, ORDER_HISTORY_FILE, LOYALTY_POINTS_FILE, RATINGS_FILE, USERS_FILE, DATABASE_FILE,
+                    INVENTORY_FILE)
+    return ReportJobs(get_data_store(), REPORT_CACHE_DIR, storage_args, ORDER_ARCHIVE_DIR)
+
+# Inventory is one ledger shared by every session and server process (see
+# brewmate/inventory.py); orders reserve their ingredients before payment
+@st.cache_resource
+def get_inventory():
+    ledger = get_storage().inventory
+    ledger.stock_defaults(default_inventory)
+    return ledger
+
+# Metrics endpoint for Prometheus scrapers, started once per server process
+@st.cache_resource
+def get_metrics_server():
+    return metrics.serve(int(METRICS_PORT))
+
+# What a page can list in its "needs" (see brewmate/views/__init__.py)
+RESOURCES = {
+    "store": get_data_store,
+    "orders": get_order_writer,
+    "recipes": get_recipe_book,
+    "inventory": get_inventory,
+    "prep_queue": get_preparation_queue,
+    "report_jobs": get_report_jobs,
+}
+
+
+def load(needs):
+    return {name: RESOURCES[name]() for name in needs}
@@ -0,0 +1,108 @@
+import streamlit as st
+
+from brewmate import metrics
+from brewmate.views import page_names
+
+
+# Session state shared by the sidebar and the pages
+def init_session_state():
+    if "logged_in" not in st.session_state:
+        st.session_state["logged_in"] = False
+
+    if "user_role" not in st.session_state:
+        st.session_state["user_role"] = None
+
+    if "show_register_form" not in st.session_state:
+        st.session_state["show_register_form"] = False
+
+    if "show_login_form" not in st.session_state:
+        st.session_state["show_login_form"] = False
+
+    if "show_admin_login_form" not in st.session_state:
+        st.session_state["show_admin_login_form"] = False
+
+
+def is_admin():
+    return st.session_state["logged_in"] and st.session_state["user_role"] == "admin"
+
+
+# Registration and login forms and the page navigation; returns the chosen page
+def render(users):
+    init_session_state()
+
+    # Registration form
+    if st.sidebar.button("Register New User"):
+        st.session_state["show_register_form"] = not st.session_state["show_register_form"]
+
+    if st.session_state["show_register_form"]:
+        with st.sidebar.form(key="register_form"):
+            st.subheader("Register New User")
+            new_username = st.text_input("Enter Username", key="register_username")
+            new_password = st.text_input("Enter Password", type="password", key="register_password")
+            register_button = st.form_submit_button("Register")
+            if register_button:
+                try:
+                    registered = not users.exists(new_username) and save_user(users, new_username, new_password)
+                except ValueError as error:
+                    st.sidebar.error(str(error))
+                else:
+                    if not registered:
+                        st.sidebar.error("Username already exists. Please choose a different username.")
+                    else:
+                        st.sidebar.success("Registration successful. You can now log in.")
+                        st.session_state["show_register_form"] = False
+
+    # Login form
+    if st.sidebar.button("Login"):
+        st.session_state["show_login_form"] = not st.session_state["show_login_form"]
+
+    if st.session_state["show_login_form"]:
+        with st.sidebar.form(key="login_form"):
+            st.subheader("Login")
+            username = st.text_input("Username", key="login_username")
+            password = st.text_input("Password", type="password", key="login_password")
+            login_button = st.form_submit_button("Login")
+            if login_button:
+                if users.exists(username):
+                    if users.authenticate(username, password):
+                        st.session_state["logged_in"] = True
+                        st.session_state["user_role"] = "customer"
+                        st.session_state["username"] = username
+                        st.sidebar.success("Login successful.")
+                        st.session_state["show_login_form"] = False
+                    else:
+                        st.sidebar.error("Incorrect password. Please try again.")
+                else:
+                    st.sidebar.error("Username not found. Please register first.")
+
+    # Admin login form
+    if st.sidebar.button("Admin"):
+        st.session_state["show_admin_login_form"] = not st.session_state["show_admin_login_form"]
+
+    if st.session_state["show_admin_login_form"]:
+        with st.sidebar.form(key="admin_login_form"):
+            st.subheader("Admin Login")
+            username = st.text_input("Username", key="admin_username")
+            password = st.text_input("Password", type="password", key="admin_password")
+            admin_login_button = st.form_submit_button("Login as Admin")
+            if admin_login_button:
+                if username == "admin" and password == "admin123":
+                    st.session_state["logged_in"] = True
+                    st.session_state["user_role"] = "admin"
+                    st.sidebar.success("Admin Access Granted")
+                    st.session_state["show_admin_login_form"] = False
+                else:
+                    st.sidebar.error("Invalid admin credentials.")
+                    st.session_state["is_admin"] = False  # Reset admin flag if login fails
+
+    # App title
+    st.sidebar.title("BrewMate App Navigation")
+
+    # Sidebar for navigation
+    return st.sidebar.radio("Go to", page_names(is_admin()))
+
+
+# Function to save a new user (the password is stored as a salted hash)
+@metrics.timed("persistence", call="save_user")
+def save_user(users, username, password):
+    return users.register(username, password)
@@ -0,0 +1,35 @@
+# BrewMate: `streamlit run brewmate_app.py`.
+#
+# Every rerun draws the sidebar, then imports and renders only the page that
+# is selected, with only the data that page needs (the page registry is in
+# brewmate/views/__init__.py, the shared objects in brewmate/views/resources.py).
+# openpyxl and the charting libraries load when a feature that needs them
+# runs, so a cold start stays cheap (checked by benchmarks/bench_import.py).
+from brewmate import metrics, profiling, views
+from brewmate.views import resources, sidebar
+
+# Profile this rerun when BREWMATE_PROFILE (or an admin) asks for it; the
+# profile is filed under the page shown (see brewmate/profiling.py)
+profiling.start()
+
+# Timings for this rerun, by section of the script (see brewmate/metrics.py);
+# nothing is recorded unless BREWMATE_METRICS=1 or an admin turns it on
+script_sections = metrics.Sections("rerun_section", total="rerun")
+script_sections.section("setup")
+
+if resources.METRICS_PORT:
+    resources.get_metrics_server()
+
+script_sections.section("sidebar")
+page = sidebar.render(resources.get_user_store())
+script_sections.section(page)
+profiling.tag(page)
+
+views.render(page, script_sections, sidebar.is_admin())
+
+# Close this rerun's timings and profile
+script_sections.done(page=page)
+profiling.finish()
+metrics.count("reruns", page=page)
+if resources.METRICS_FILE:
+    metrics.export_file(resources.METRICS_FILE)
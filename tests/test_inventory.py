@@ -0,0 +1,97 @@
+# Both inventory ledgers against the same cases.  `ledgers` opens another
+# ledger on the same file or database each call, as another server process would.
+import threading
+import time
+
+import pytest
+
+from brewmate.inventory import FileInventoryLedger, OutOfStock, ReservationExpired, SqliteInventoryLedger
+from brewmate.storage import SqliteStorage
+
+
+@pytest.fixture(params=["file", "sqlite"])
+def ledgers(request, tmp_path):
+    def open_ledger(reservation_ttl=900):
+        if request.param == "file":
+            return FileInventoryLedger(str(tmp_path / "inventory_ledger.csv"), reservation_ttl)
+        return SqliteInventoryLedger(SqliteStorage(str(tmp_path / "brewmate.db")), reservation_ttl)
+    return open_ledger
+
+
+def test_reserve_commit_and_release(ledgers):
+    ledger, other = ledgers(), ledgers()
+    ledger.stock_defaults({"milk": 100, "beans": 50})
+
+    committed = ledger.reserve({"milk": 30, "beans": 10})
+    released = ledger.reserve({"milk": 20})
+    assert other.available() == {"milk": 50, "beans": 40}
+    assert other.levels() == {"milk": 100, "beans": 50}
+
+    other.commit(committed)
+    other.release(released)
+    assert ledger.available() == {"milk": 70, "beans": 40}
+    assert ledger.levels() == {"milk": 70, "beans": 40}
+
+
+def test_released_reservation_cannot_be_committed(ledgers):
+    ledger = ledgers()
+    ledger.stock_defaults({"milk": 100})
+    reservation = ledger.reserve({"milk": 30})
+    ledger.release(reservation)
+
+    with pytest.raises(ReservationExpired):
+        ledger.commit(reservation)
+    assert ledger.levels() == {"milk": 100}
+
+
+def test_expired_reservation_stops_counting_and_cannot_be_committed(ledgers):
+    ledger = ledgers(reservation_ttl=0.2)
+    ledger.stock_defaults({"milk": 100})
+    reservation = ledger.reserve({"milk": 80})
+    with pytest.raises(OutOfStock):
+        ledger.reserve({"milk": 30})
+
+    time.sleep(0.3)
+    assert ledger.available() == {"milk": 100}
+    with pytest.raises(ReservationExpired) as raised:
+        ledger.commit(reservation)
+    assert raised.value.reservation == reservation
+    assert ledger.levels() == {"milk": 100}
+
+
+def test_out_of_stock_reports_what_is_left(ledgers):
+    ledger = ledgers()
+    ledger.stock_defaults({"milk": 100, "beans": 5})
+
+    with pytest.raises(OutOfStock) as raised:
+        ledger.reserve({"milk": 10, "beans": 8, "syrup": 1})
+    assert raised.value.items == {"beans": 5, "syrup": 0}
+    assert ledger.available() == {"milk": 100, "beans": 5}
+
+
+def test_concurrent_reservations_never_oversell(ledgers):
+    ledgers().stock_defaults({"milk": 50})
+    results = []
+    start = threading.Barrier(8)
+
+    def order(ledger):
+        start.wait()
+        for _ in range(5):
+            try:
+                results.append(ledger.reserve({"milk": 2}))
+            except OutOfStock:
+                results.append(None)
+
+    threads = [threading.Thread(target=order, args=(ledgers(),)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    reservations = [reservation for reservation in results if reservation is not None]
+    assert len(reservations) == 25
+    assert len(results) - len(reservations) == 15
+    assert ledgers().available() == {"milk": 0}
+    for reservation in reservations:
+        ledgers().commit(reservation)
+    assert ledgers().levels() == {"milk": 0}
@@ -0,0 +1,93 @@
+# Crash recovery of the order journal: each test leaves the files as a crash
+# at some point of a compaction would, then checks what the journal reads back.
+import os
+from datetime import datetime
+
+from brewmate.journal import ORDER_COLUMNS, OrderJournal, format_order_row
+
+HEADER = ",".join(ORDER_COLUMNS) + "\n"
+
+
+def order(customer, minute=0):
+    return {"customer_name": customer, "coffee_type": "Latte", "size": "Small", "add_ons": [],
+            "price": 5.0, "order_time": datetime(2024, 5, 1, 9, minute)}
+
+
+def rows(*customers):
+    return "".join(format_order_row(order(customer, minute)) for minute, customer in enumerate(customers))
+
+
+def customers(journal):
+    return [row["customer_name"] for row in journal.load()]
+
+
+def leftovers(journal):
+    return [path for path in (journal.journal_path, journal.segment_path, journal.marker_path) if os.path.exists(path)]
+
+
+def write(path, text):
+    with open(path, "w", newline="") as f:
+        f.write(text)
+
+
+def test_segment_with_marker_truncates_base_and_folds_again(tmp_path):
+    journal = OrderJournal(str(tmp_path / "order_history.csv"))
+    base = HEADER + rows("ann")
+    segment = rows("bob", "cy")
+    # The crash hit halfway through appending the segment to the base
+    write(journal.path, base + segment[:len(segment) // 2])
+    write(journal.marker_path, str(len(base.encode("utf-8"))))
+    write(journal.segment_path, segment)
+
+    assert customers(journal) == ["ann", "bob", "cy"]
+    assert leftovers(journal) == []
+
+
+def test_segment_with_marker_drops_a_torn_partial_row(tmp_path):
+    journal = OrderJournal(str(tmp_path / "order_history.csv"))
+    base = HEADER + rows("ann")
+    # Only part of the first segment row reached the base, without a newline
+    write(journal.path, base + "bob,Lat")
+    write(journal.marker_path, str(len(base.encode("utf-8"))))
+    write(journal.segment_path, rows("bob"))
+
+    journal.recover()
+
+    with open(journal.path) as f:
+        assert f.read() == HEADER + rows("ann") + format_order_row(order("bob"))
+
+
+def test_segment_without_marker_is_folded(tmp_path):
+    journal = OrderJournal(str(tmp_path / "order_history.csv"))
+    # The crash hit after the journal was sealed, before the fold began
+    write(journal.path, HEADER + rows("ann"))
+    write(journal.segment_path, rows("bob", "cy"))
+
+    assert customers(journal) == ["ann", "bob", "cy"]
+    assert leftovers(journal) == []
+
+
+def test_marker_without_segment_is_removed(tmp_path):
+    journal = OrderJournal(str(tmp_path / "order_history.csv"))
+    base = HEADER + rows("ann")
+    # The fold finished and removed the segment; only the marker was left
+    write(journal.path, base + rows("bob"))
+    write(journal.marker_path, str(len(base.encode("utf-8"))))
+
+    assert customers(journal) == ["ann", "bob"]
+    assert leftovers(journal) == []
+
+
+def test_torn_last_journal_line_is_dropped(tmp_path):
+    journal = OrderJournal(str(tmp_path / "order_history.csv"))
+    journal.append(order("ann"))
+    with open(journal.journal_path, "a") as f:
+        f.write("bob,Latte,Sm")
+
+    assert customers(journal) == ["ann"]
+
+    journal.append(order("cy", 2))
+    journal.compact()
+
+    assert customers(journal) == ["ann", "cy"]
+    assert leftovers(journal) == []